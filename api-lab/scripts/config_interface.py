@@ -1,5 +1,6 @@
 import json
 import logging
+from urllib.parse import quote
 
 import requests
 from requests.auth import HTTPBasicAuth
@@ -13,9 +14,40 @@ logging.basicConfig(
 # Disable SSL warnings for lab use only
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
+LOOPBACK_TYPE = "iana-if-type:softwareLoopback"
+
+# Maximum number of interfaces sent in one PATCH request
+DEFAULT_CHUNK_SIZE = 200
+
+
+def interface_entry(
+    interface_name,
+    ip_address,
+    netmask,
+    interface_type=LOOPBACK_TYPE,
+    description="Configured by RESTCONF",
+    enabled=True,
+):
+    """Returns the ietf-interfaces list entry for an interface with one IPv4 address."""
+    return {
+        "name": interface_name,
+        "description": description,
+        "type": interface_type,
+        "enabled": enabled,
+        "ietf-ip:ipv4": {"address": [{"ip": ip_address, "netmask": netmask}]},
+    }
+
 
 def configure_interface(
-    host, port, username, password, interface_name, ip_address, netmask
+    host,
+    port,
+    username,
+    password,
+    interface_name,
+    ip_address,
+    netmask,
+    session=None,
+    interface_type=LOOPBACK_TYPE,
 ):
     """
     Configures a network interface using RESTCONF.
@@ -28,17 +60,17 @@ def configure_interface(
         interface_name (str): The name of the interface to configure (e.g., "Loopback0").
         ip_address (str): The IP address to assign to the interface.
         netmask (str): The netmask to assign to the interface.
+        session (requests.Session, optional): A keep-alive session to send the request
+                                              on, e.g. from RestconfClient. A one-off
+                                              connection is used if None.
+        interface_type (str): The iana-if-type identity of the interface.
     """
     logging.info(f"Attempting to configure interface {interface_name} on {host}")
 
     payload = {
-        "ietf-interfaces:interface": {
-            "name": interface_name,
-            "description": "Configured by RESTCONF",
-            "type": "iana-if-type:softwareLoopback",
-            "enabled": True,
-            "ietf-ip:ipv4": {"address": [{"ip": ip_address, "netmask": netmask}]},
-        }
+        "ietf-interfaces:interface": interface_entry(
+            interface_name, ip_address, netmask, interface_type=interface_type
+        )
     }
 
     url = f"https://{host}:{port}/restconf/data/ietf-interfaces:interfaces/interface={interface_name}"
@@ -48,7 +80,8 @@ def configure_interface(
     }
 
     try:
-        response = requests.put(
+        http = session if session is not None else requests
+        response = http.put(
             url,
             data=json.dumps(payload),
             auth=HTTPBasicAuth(username, password),
@@ -78,6 +111,163 @@ def configure_interface(
         return False
 
 
+def _error_text(error):
+    """Returns a readable message for one RESTCONF error entry."""
+    return error.get("error-message") or error.get("error-tag", "unknown error")
+
+
+def _edit_errors(response, edit_ids, yang_patch):
+    """
+    Maps every edit of a failed PATCH to the reason it was not applied.
+
+    A YANG Patch reply lists the status of each edit, a plain PATCH reply only has
+    ietf-restconf errors whose error-path may name the failing interface. Both
+    requests are applied all-or-nothing, so edits without an error of their own
+    were rejected because of the others.
+    """
+    try:
+        body = response.json()
+    except ValueError:
+        body = {}
+    fallback = f"Status Code: {response.status_code}"
+    errors = {}
+
+    if yang_patch and "ietf-yang-patch:yang-patch-status" in body:
+        status = body["ietf-yang-patch:yang-patch-status"]
+        for edit in status.get("edit-status", {}).get("edit", []):
+            edit_errors = edit.get("errors", {}).get("error", [])
+            if edit_errors:
+                errors[edit.get("edit-id")] = "; ".join(map(_error_text, edit_errors))
+        global_errors = status.get("global-status", {}).get("errors", {})
+        if global_errors.get("error"):
+            fallback = "; ".join(map(_error_text, global_errors["error"]))
+    else:
+        for error in body.get("ietf-restconf:errors", {}).get("error", []):
+            path = error.get("error-path", "")
+            for edit_id in edit_ids:
+                if f"name='{edit_id}'" in path or f"interface={edit_id}" in path:
+                    errors[edit_id] = _error_text(error)
+                    break
+            else:
+                fallback = _error_text(error)
+
+    if errors and len(errors) < len(edit_ids):
+        fallback = "not applied, the request was rejected because of other interfaces"
+    return {edit_id: errors.get(edit_id, fallback) for edit_id in edit_ids}
+
+
+def _patch_interfaces(http, url, username, password, entries, yang_patch):
+    """Sends one PATCH for a chunk of interface entries; returns (status, errors)."""
+    names = [entry["name"] for entry in entries]
+    if yang_patch:
+        payload = {
+            "ietf-yang-patch:yang-patch": {
+                "patch-id": f"configure-{len(entries)}-interfaces",
+                "edit": [
+                    {
+                        "edit-id": entry["name"],
+                        "operation": "merge",
+                        "target": f"/interface={quote(entry['name'], safe='')}",
+                        "value": {"ietf-interfaces:interface": [entry]},
+                    }
+                    for entry in entries
+                ],
+            }
+        }
+        content_type = "application/yang-patch+json"
+    else:
+        payload = {"ietf-interfaces:interfaces": {"interface": entries}}
+        content_type = "application/yang-data+json"
+    headers = {"Content-Type": content_type, "Accept": "application/yang-data+json"}
+
+    try:
+        response = http.patch(
+            url,
+            data=json.dumps(payload),
+            auth=HTTPBasicAuth(username, password),
+            headers=headers,
+            verify=False,
+            timeout=60,
+        )
+    except requests.exceptions.RequestException as e:
+        return None, {name: f"Request failed: {e}" for name in names}
+
+    if response.status_code in [200, 201, 204]:
+        return response.status_code, {name: None for name in names}
+    return response.status_code, _edit_errors(response, names, yang_patch)
+
+
+def configure_interfaces(
+    host,
+    port,
+    username,
+    password,
+    interfaces,
+    session=None,
+    yang_patch=False,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """
+    Configures many network interfaces with one RESTCONF PATCH instead of a PUT each.
+
+    By default the interfaces are merged into ietf-interfaces:interfaces with a plain
+    PATCH, which the device applies and commits as one edit. With yang_patch=True an
+    RFC 8072 YANG Patch is sent instead, with one edit per interface, so the reply
+    tells which interfaces failed. Requests are split into chunks of chunk_size
+    interfaces, and a chunk the device rejects as too large (413) is halved and
+    retried.
+
+    Args:
+        host (str): The IP address or hostname of the device.
+        port (int): The port number for RESTCONF (e.g., 443).
+        username (str): The username for authentication.
+        password (str): The password for authentication.
+        interfaces (list): Interface specs as dicts of interface_entry arguments, e.g.
+                           {"interface_name": "Loopback1", "ip_address": "10.0.0.1",
+                           "netmask": "255.255.255.255"}, optionally with
+                           "interface_type", "description" and "enabled".
+        session (requests.Session, optional): A keep-alive session to send the requests
+                                              on, e.g. from RestconfClient.
+        yang_patch (bool): If True, send an RFC 8072 YANG Patch instead of a merge.
+        chunk_size (int): Maximum number of interfaces per request.
+
+    Returns:
+        dict: Each interface name mapped to None if it was configured, or to the error
+              that kept it from being configured.
+    """
+    logging.info(f"Attempting to configure {len(interfaces)} interfaces on {host}")
+
+    url = f"https://{host}:{port}/restconf/data/ietf-interfaces:interfaces"
+    http = session if session is not None else requests
+    entries = [interface_entry(**spec) for spec in interfaces]
+    pending = [
+        entries[start : start + chunk_size]
+        for start in range(0, len(entries), chunk_size)
+    ]
+
+    results = {}
+    while pending:
+        chunk = pending.pop(0)
+        status_code, chunk_results = _patch_interfaces(
+            http, url, username, password, chunk, yang_patch
+        )
+        if status_code == 413 and len(chunk) > 1:
+            logging.warning(
+                f"Request for {len(chunk)} interfaces too large for {host}, splitting it"
+            )
+            middle = len(chunk) // 2
+            pending[:0] = [chunk[:middle], chunk[middle:]]
+            continue
+        results.update(chunk_results)
+
+    failed = {name: error for name, error in results.items() if error is not None}
+    for name, error in failed.items():
+        logging.error(f"❌ Failed to configure interface {name}: {error}")
+    if not failed:
+        logging.info(f"✅ {len(results)} interfaces configured successfully on {host}")
+    return results
+
+
 if __name__ == "__main__":
     # Example usage:
     # Device details
@@ -105,3 +295,20 @@ if __name__ == "__main__":
         print(f"Script finished: Interface {INTERFACE_NAME} configuration successful.")
     else:
         print(f"Script finished: Interface {INTERFACE_NAME} configuration failed.")
+
+    # Bulk provisioning: Loopback1-10 in a single request
+    LOOPBACKS = [
+        {
+            "interface_name": f"Loopback{number}",
+            "ip_address": f"172.16.2.{number}",
+            "netmask": "255.255.255.255",
+        }
+        for number in range(1, 11)
+    ]
+    results = configure_interfaces(
+        DEVICE_HOST, DEVICE_PORT, DEVICE_USERNAME, DEVICE_PASSWORD, LOOPBACKS
+    )
+    failed = [name for name, error in results.items() if error is not None]
+    print(
+        f"Script finished: {len(results) - len(failed)} of {len(results)} loopbacks configured."
+    )
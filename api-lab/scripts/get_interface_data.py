@@ -1,3 +1,4 @@
+import contextlib
 import json
 import logging
 from pprint import pprint
@@ -6,6 +7,11 @@ import requests
 from requests.auth import HTTPBasicAuth
 from urllib3.exceptions import InsecureRequestWarning
 
+try:
+    import ijson
+except ImportError:  # ijson is optional, iter_interfaces then parses the whole reply
+    ijson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -15,7 +21,18 @@ logging.basicConfig(
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
 
-def get_interface_data(host, port, username, password, interface_name=None):
+def get_interface_data(
+    host,
+    port,
+    username,
+    password,
+    interface_name=None,
+    session=None,
+    fields=None,
+    depth=None,
+    cache=None,
+    metrics=None,
+):
     """
     Retrieves network interface data using RESTCONF.
 
@@ -26,6 +43,17 @@ def get_interface_data(host, port, username, password, interface_name=None):
         password (str): The password for authentication.
         interface_name (str, optional): The name of a specific interface to retrieve data for.
                                         If None, data for all interfaces will be retrieved.
+        session (requests.Session, optional): A keep-alive session to send the request
+                                              on, e.g. from RestconfClient. A one-off
+                                              connection is used if None.
+        fields (str, optional): RESTCONF fields= selector returning only some leaves,
+                                e.g. "interface(name;enabled;ietf-ip:ipv4/address)".
+        depth (int, optional): RESTCONF depth= limit on how many levels are returned.
+        cache (RestconfCache, optional): Sends conditional requests and reuses the
+                                         cached data when the device answers 304.
+        metrics (optional): An object with a span(host, task, phase) context manager,
+                            such as campus-lab's Metrics, timing the "http_get" and
+                            "decode" phases.
 
     Returns:
         dict or None: A dictionary containing the interface data, or None if the request fails.
@@ -39,21 +67,40 @@ def get_interface_data(host, port, username, password, interface_name=None):
         url = base_url
 
     headers = {"Accept": "application/yang-data+json"}
+    params = {"fields": fields, "depth": depth}
+    if cache is not None:
+        headers.update(cache.conditional_headers(host, url, params))
+
+    def span(phase):
+        if metrics is None:
+            return contextlib.nullcontext({})
+        return metrics.span(host, "get_interface_data", phase)
 
     try:
-        response = requests.get(
-            url,
-            headers=headers,
-            auth=HTTPBasicAuth(username, password),
-            verify=False,
-            timeout=10,
-        )
+        http = session if session is not None else requests
+        with span("http_get") as phase:
+            response = http.get(
+                url,
+                headers=headers,
+                params=params,
+                auth=HTTPBasicAuth(username, password),
+                verify=False,
+                timeout=10,
+            )
+            phase["bytes"] = len(response.content)
 
+        if response.status_code == 304 and cache is not None:
+            logging.info("✅ Interface data not modified, using cached copy.")
+            return cache.not_modified(host, url, params)
         if response.status_code == 200:
             logging.info(
                 f"✅ Successfully retrieved interface data. Status Code: {response.status_code}"
             )
-            return response.json().get("ietf-interfaces:interfaces")
+            with span("decode"):
+                data = response.json().get("ietf-interfaces:interfaces")
+            if cache is not None:
+                cache.store(host, url, response, data, params)
+            return data
         logging.error(
             f"❌ Failed to retrieve interface data. Status Code: {response.status_code}"
         )
@@ -70,6 +117,68 @@ def get_interface_data(host, port, username, password, interface_name=None):
         return None
 
 
+def iter_interfaces(
+    host, port, username, password, session=None, fields=None, depth=None
+):
+    """
+    Yields the interfaces of a device one at a time while the reply is downloaded.
+
+    The reply is parsed as a stream with ijson, so memory use does not grow with the
+    number of interfaces; without ijson installed the whole reply is parsed first.
+
+    Args:
+        host (str): The IP address or hostname of the device.
+        port (int): The port number for RESTCONF (e.g., 443).
+        username (str): The username for authentication.
+        password (str): The password for authentication.
+        session (requests.Session, optional): A keep-alive session to send the request on.
+        fields (str, optional): RESTCONF fields= selector, e.g. "interface(name;enabled)".
+        depth (int, optional): RESTCONF depth= limit on how many levels are returned.
+
+    Yields:
+        dict: One ietf-interfaces interface entry. Nothing is yielded if the request fails.
+    """
+    logging.info(f"Attempting to stream interface data from {host}")
+
+    url = f"https://{host}:{port}/restconf/data/ietf-interfaces:interfaces"
+    headers = {"Accept": "application/yang-data+json"}
+
+    try:
+        http = session if session is not None else requests
+        with http.get(
+            url,
+            headers=headers,
+            params={"fields": fields, "depth": depth},
+            auth=HTTPBasicAuth(username, password),
+            verify=False,
+            timeout=10,
+            stream=True,
+        ) as response:
+            if response.status_code != 200:
+                logging.error(
+                    f"❌ Failed to retrieve interface data. Status Code: {response.status_code}"
+                )
+                logging.error(f"Response: {response.text}")
+                return
+            if ijson is None:
+                interfaces = response.json().get("ietf-interfaces:interfaces", {})
+                yield from interfaces.get("interface", [])
+                return
+            # Let urllib3 undo any Content-Encoding before ijson reads the body
+            response.raw.decode_content = True
+            yield from ijson.items(
+                response.raw,
+                "ietf-interfaces:interfaces.interface.item",
+                use_float=True,
+            )
+    except requests.exceptions.ConnectionError as e:
+        logging.error(f"❌ Connection error to {host}:{port}: {e}")
+    except requests.exceptions.Timeout:
+        logging.error(f"❌ Request timed out for {host}:{port}")
+    except requests.exceptions.RequestException as e:
+        logging.error(f"❌ An error occurred during the request: {e}")
+
+
 if __name__ == "__main__":
     # Example usage:
     # Device details
@@ -99,3 +208,13 @@ if __name__ == "__main__":
         pprint(loopback_interface_data)
     else:
         print("Failed to retrieve Loopback0 interface data.")
+
+    print("\nStreaming name, state and addresses of every interface:")
+    for interface in iter_interfaces(
+        DEVICE_HOST,
+        DEVICE_PORT,
+        DEVICE_USERNAME,
+        DEVICE_PASSWORD,
+        fields="interface(name;enabled;ietf-ip:ipv4/address)",
+    ):
+        print(interface)
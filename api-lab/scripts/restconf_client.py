@@ -0,0 +1,188 @@
+"""Pooled RESTCONF client: one keep-alive HTTPS session per device, many devices in parallel."""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pprint import pprint
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from urllib3.exceptions import InsecureRequestWarning
+
+from get_interface_data import get_interface_data
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Disable SSL warnings for lab use only
+requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
+
+
+class RestconfCache:
+    """
+    Remembers RESTCONF replies with their ETag and Last-Modified validators.
+
+    get_interface_data sends the validators back as If-None-Match/If-Modified-Since
+    and reuses the remembered data when the device answers 304 Not Modified, so an
+    unchanged interface tree is not downloaded and parsed again. Cached data is
+    shared between callers and must not be modified.
+    """
+
+    def __init__(self):
+        self._entries = {}  # (host, url) -> (validator headers, data)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(host, url, params=None):
+        return host, requests.Request("GET", url, params=params).prepare().url
+
+    def conditional_headers(self, host, url, params=None):
+        """Returns the If-None-Match/If-Modified-Since headers for a cached reply."""
+        with self._lock:
+            entry = self._entries.get(self._key(host, url, params))
+        return dict(entry[0]) if entry else {}
+
+    def not_modified(self, host, url, params=None):
+        """Records a 304 reply and returns the cached data."""
+        with self._lock:
+            self.hits += 1
+            return self._entries[self._key(host, url, params)][1]
+
+    def store(self, host, url, response, data, params=None):
+        """Records a 200 reply; it is only kept if the device sent a validator."""
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        with self._lock:
+            self.misses += 1
+            if validators:
+                self._entries[self._key(host, url, params)] = (validators, data)
+
+    def log_stats(self):
+        """Logs how many reads were answered from the cache."""
+        total = self.hits + self.misses
+        logging.info(
+            f"RESTCONF cache: {self.hits} of {total} reads not modified, "
+            f"{self.misses} downloaded"
+        )
+
+
+class RestconfClient:
+    """
+    Keeps one requests.Session per device so every call after the first reuses an
+    established TLS connection instead of doing a new handshake.
+
+    The sessions carry the credentials and TLS settings, so they can be passed as
+    ``session`` to get_interface_data and configure_interface.
+
+    Args:
+        username (str): The username for authentication.
+        password (str): The password for authentication.
+        port (int): The port number for RESTCONF (e.g., 443).
+        max_workers (int): How many devices are talked to at the same time.
+        pool_maxsize (int): Keep-alive connections kept open per device.
+        verify (bool): Whether to verify device certificates.
+    """
+
+    def __init__(
+        self,
+        username,
+        password,
+        port=443,
+        max_workers=32,
+        pool_maxsize=4,
+        verify=False,
+    ):
+        self.username = username
+        self.password = password
+        self.port = port
+        self.max_workers = max_workers
+        self.pool_maxsize = pool_maxsize
+        self.verify = verify
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, host):
+        """Returns the keep-alive session for a device, creating it on first use."""
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                session.auth = HTTPBasicAuth(self.username, self.password)
+                session.verify = self.verify
+                adapter = HTTPAdapter(
+                    pool_connections=1, pool_maxsize=self.pool_maxsize
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def run(self, func, hosts, **kwargs):
+        """
+        Calls a RESTCONF function for many devices concurrently.
+
+        Args:
+            func (callable): A function taking (host, port, username, password, ...,
+                             session=...), such as get_interface_data.
+            hosts (list): The devices to call it for.
+            **kwargs: Extra keyword arguments passed to func.
+
+        Returns:
+            dict: The result of func for each host.
+        """
+
+        def call(host):
+            return func(
+                host,
+                self.port,
+                self.username,
+                self.password,
+                session=self.session(host),
+                **kwargs,
+            )
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return dict(zip(hosts, executor.map(call, hosts)))
+
+    def close(self):
+        """Closes every open session."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == "__main__":
+    # Example usage:
+    # Device details
+    DEVICE_HOSTS = ["172.20.20.2"]  # CSR1000v RESTCONF IPs
+    DEVICE_USERNAME = "admin"
+    DEVICE_PASSWORD = "admin"
+
+    cache = RestconfCache()
+    with RestconfClient(DEVICE_USERNAME, DEVICE_PASSWORD) as client:
+        results = client.run(get_interface_data, DEVICE_HOSTS, cache=cache)
+        # Unchanged devices answer 304 Not Modified the second time
+        results = client.run(get_interface_data, DEVICE_HOSTS, cache=cache)
+    cache.log_stats()
+
+    for host, interfaces_data in results.items():
+        print(f"Interfaces of {host}:")
+        if interfaces_data:
+            pprint(interfaces_data)
+        else:
+            print("Failed to retrieve interface data.")
@@ -0,0 +1,197 @@
+"""State of the simulated devices shared by the SSH, SNMP and RESTCONF emulators."""
+
+import ipaddress
+import time
+
+# Containerlab kinds the emulators can impersonate
+KINDS = ("cisco_iol", "arista_ceos")
+
+# Top-level configuration commands that enter a sub-mode, with the prompt suffix
+MODE_COMMANDS = {
+    "interface": "if",
+    "router": "router",
+    "line": "line",
+    "vlan": "vlan",
+    "ip access-list": "acl",
+    "management": "mgmt",
+}
+
+SYS_DESCR = {
+    "cisco_iol": "Cisco IOS Software, Linux Software (X86_64BI_LINUX-ADVENTERPRISEK9-M), "
+    "Version 17.12.1, RELEASE SOFTWARE (fc5)",
+    "arista_ceos": "Arista Networks EOS version 4.30.0F running on an Arista cEOSLab",
+}
+
+
+def mode_of(line):
+    """Returns the sub-mode a top-level configuration line enters, or None."""
+    for command, mode in MODE_COMMANDS.items():
+        if line == command or line.startswith(f"{command} "):
+            return mode
+    return None
+
+
+class SimulatedDevice:
+    """
+    One simulated IOS or EOS device.
+
+    Holds the running configuration as top-level lines mapped to their indented
+    children, so configuration pushed over SSH shows up in later fetches, plus the
+    interface list and counters served over SNMP and RESTCONF.
+
+    Args:
+        index (int): Position of the device in the fleet, used to derive addresses.
+        name (str): The device hostname.
+        kind (str): The containerlab kind, "cisco_iol" or "arista_ceos".
+        address (str): The loopback address the emulators listen on for it.
+        interfaces (int): Number of Ethernet interfaces.
+    """
+
+    def __init__(self, index, name, kind, address, interfaces=48):
+        if kind not in KINDS:
+            raise ValueError(f"Unsupported kind '{kind}', expected one of {KINDS}")
+        self.index = index
+        self.name = name
+        self.kind = kind
+        self.address = address
+        self.started = time.monotonic()
+        self.interfaces = [
+            {
+                "name": self._interface_name(number),
+                "description": f"link {number} of {name}",
+                "ip": str(
+                    ipaddress.ip_address("10.0.0.0") + (index * 256 + number) * 4 + 1
+                ),
+                "netmask": "255.255.255.252",
+                "enabled": True,
+            }
+            for number in range(interfaces)
+        ]
+        self.config = {}  # top-level line -> list of child lines
+        for parent, children in self.base_config():
+            self.config[parent] = list(children)
+
+    @property
+    def indent(self):
+        return "   " if self.kind == "arista_ceos" else " "
+
+    def _interface_name(self, number):
+        if self.kind == "arista_ceos":
+            return f"Ethernet{number + 1}"
+        return f"Ethernet{number // 4}/{number % 4}"
+
+    def base_config(self):
+        """Returns the initial configuration as (top-level line, children) pairs."""
+        stanzas = [(f"hostname {self.name}", [])]
+        for interface in self.interfaces:
+            children = [f"description {interface['description']}"]
+            if self.kind == "arista_ceos":
+                children += [
+                    "no switchport",
+                    f"ip address {interface['ip']}/30",
+                ]
+            else:
+                children += [
+                    f"ip address {interface['ip']} {interface['netmask']}",
+                    "no shutdown",
+                ]
+            stanzas.append((f"interface {interface['name']}", children))
+        stanzas += [
+            (
+                "router ospf 1",
+                [
+                    f"router-id {self.address}",
+                    "network 10.0.0.0 0.255.255.255 area 0",
+                ],
+            ),
+            ("snmp-server community public RO", []),
+        ]
+        if self.kind == "arista_ceos":
+            stanzas.append(("management api http-commands", ["no shutdown"]))
+        else:
+            stanzas.append(("line vty 0 4", ["login local", "transport input ssh"]))
+        return stanzas
+
+    def config_lines(self):
+        """Returns the running configuration as a list of lines."""
+        lines = []
+        for parent, children in self.config.items():
+            lines.append(parent)
+            lines += [f"{self.indent}{child}" for child in children]
+            lines.append("!")
+        lines.append("end")
+        return lines
+
+    def running_config(self):
+        """Returns the running configuration as the device prints it."""
+        body = "\n".join(self.config_lines())
+        if self.kind == "arista_ceos":
+            header = (
+                "! Command: show running-config\n"
+                f"! device: {self.name} (cEOSLab, EOS-4.30.0F)\n!\n"
+            )
+        else:
+            header = (
+                "Building configuration...\n\n"
+                f"Current configuration : {len(body)} bytes\n!\n"
+            )
+        return header + body
+
+    def configure(self, parent, line):
+        """
+        Applies one configuration line.
+
+        Args:
+            parent (str or None): The top-level line of the current sub-mode.
+            line (str): The stripped configuration line.
+
+        Returns:
+            str or None: The top-level line of the sub-mode active afterwards.
+        """
+        if parent is None:
+            self.config.setdefault(line, [])
+            return line if mode_of(line) else None
+        if line.startswith("no ") and line[3:] in self.config[parent]:
+            self.config[parent].remove(line[3:])
+        elif line not in self.config[parent]:
+            self.config[parent].append(line)
+        return parent
+
+    def uptime(self):
+        """Returns the uptime in hundredths of a second, as sysUpTime counts it."""
+        return int((time.monotonic() - self.started) * 100)
+
+    def octets(self, number, direction):
+        """Returns a steadily increasing octet counter for an interface."""
+        # 1 Mbit/s per interface number and device, a bit more inbound than outbound
+        rate = 125_000 * (number + 1) * (2 if direction == "in" else 1)
+        return int((time.monotonic() - self.started) * rate) + self.index
+
+
+def build_fleet(count, kinds=KINDS, first_address="127.1.0.1", interfaces=48):
+    """
+    Creates the simulated devices of a fleet.
+
+    Devices get consecutive loopback addresses (Linux answers on all of 127.0.0.0/8)
+    and alternate between the given kinds.
+
+    Args:
+        count (int): Number of devices.
+        kinds (tuple): Containerlab kinds assigned round-robin.
+        first_address (str): Address of the first device.
+        interfaces (int): Ethernet interfaces per device.
+
+    Returns:
+        list: The SimulatedDevice objects.
+    """
+    first = ipaddress.ip_address(first_address)
+    return [
+        SimulatedDevice(
+            index,
+            f"dev{index + 1:04d}",
+            kinds[index % len(kinds)],
+            str(first + index),
+            interfaces,
+        )
+        for index in range(count)
+    ]
@@ -0,0 +1,232 @@
+"""Runs SSH, SNMP and RESTCONF emulators for a fleet of simulated devices."""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import logging
+import multiprocessing
+import os
+import ssl
+import tempfile
+
+import asyncssh
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from devices import KINDS, build_fleet
+from restconf_server import start_restconf_server
+from snmp_agent import start_snmp_agent
+from ssh_server import start_ssh_server
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# asyncssh logs every connection at INFO
+logging.getLogger("asyncssh").setLevel(logging.WARNING)
+
+SERVICES = ("ssh", "snmp", "restconf")
+
+
+def self_signed_context(devices):
+    """Returns a server TLS context with a throwaway certificate for the devices."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "bench")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509
+        .CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([
+                x509.IPAddress(ipaddress.ip_address(device.address))
+                for device in devices
+            ]),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    # load_cert_chain only reads files
+    with tempfile.TemporaryDirectory() as directory:
+        cert_file = os.path.join(directory, "cert.pem")
+        key_file = os.path.join(directory, "key.pem")
+        with open(cert_file, "wb") as f:
+            f.write(certificate.public_bytes(serialization.Encoding.PEM))
+        with open(key_file, "wb") as f:
+            f.write(
+                key.private_bytes(
+                    serialization.Encoding.PEM,
+                    serialization.PrivateFormat.PKCS8,
+                    serialization.NoEncryption(),
+                )
+            )
+        context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+async def serve(
+    devices,
+    ssh_port=2222,
+    snmp_port=1161,
+    https_port=8443,
+    latency=0.0,
+    login_latency=0.0,
+    services=SERVICES,
+    ready=None,
+):
+    """
+    Serves the devices until cancelled.
+
+    Every device listens on its own loopback address, on the same ports.
+
+    Args:
+        devices (list): The SimulatedDevice objects to serve.
+        ssh_port (int): TCP port of the SSH servers.
+        snmp_port (int): UDP port of the SNMP responders.
+        https_port (int): TCP port of the RESTCONF servers.
+        latency (float): Seconds each device takes to answer a command or request.
+        login_latency (float): Seconds each device takes to accept an SSH login.
+        services (tuple): Which of "ssh", "snmp" and "restconf" to start.
+        ready (multiprocessing.Event, optional): Set once every server listens.
+    """
+    servers = []
+    transports = []
+    if "ssh" in services:
+        host_key = asyncssh.generate_private_key("ssh-ed25519")
+        for device in devices:
+            servers.append(
+                await start_ssh_server(
+                    device,
+                    ssh_port,
+                    host_key,
+                    latency=latency,
+                    login_latency=login_latency,
+                )
+            )
+    if "snmp" in services:
+        for device in devices:
+            transports.append(
+                await start_snmp_agent(device, snmp_port, latency=latency)
+            )
+    if "restconf" in services:
+        ssl_context = self_signed_context(devices)
+        for device in devices:
+            servers.append(
+                await start_restconf_server(
+                    device, https_port, ssl_context, latency=latency
+                )
+            )
+
+    logging.info(
+        f"Serving {len(devices)} devices ({', '.join(services)}) on "
+        f"{devices[0].address} to {devices[-1].address}"
+    )
+    if ready is not None:
+        ready.set()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for transport in transports:
+            transport.close()
+        for server in servers:
+            server.close()
+
+
+def _run(devices, kwargs):
+    try:
+        asyncio.run(serve(devices, **kwargs))
+    except KeyboardInterrupt:
+        pass
+
+
+class FleetProcess:
+    """
+    Runs serve() in a child process, so the emulators do not compete with the code
+    being measured for the interpreter lock.
+
+    Use as a context manager; the fleet is listening when the block starts and is
+    stopped when it ends.
+
+    Args:
+        devices (list): The SimulatedDevice objects to serve.
+        timeout (float): Seconds to wait for the servers to start.
+        **kwargs: Options passed to serve().
+    """
+
+    def __init__(self, devices, timeout=60, **kwargs):
+        self.devices = devices
+        self.timeout = timeout
+        self.kwargs = kwargs
+        self.process = None
+
+    def __enter__(self):
+        ready = multiprocessing.Event()
+        self.process = multiprocessing.Process(
+            target=_run,
+            args=(self.devices, {**self.kwargs, "ready": ready}),
+            daemon=True,
+        )
+        self.process.start()
+        if not ready.wait(self.timeout):
+            self.process.terminate()
+            raise RuntimeError(
+                f"Simulated devices did not start within {self.timeout}s"
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        self.process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hosts", type=int, default=10, help="Number of devices")
+    parser.add_argument(
+        "--kinds",
+        default=",".join(KINDS),
+        help="Comma-separated containerlab kinds assigned round-robin",
+    )
+    parser.add_argument("--first-address", default="127.1.0.1")
+    parser.add_argument("--interfaces", type=int, default=48)
+    parser.add_argument("--ssh-port", type=int, default=2222)
+    parser.add_argument("--snmp-port", type=int, default=1161)
+    parser.add_argument("--https-port", type=int, default=8443)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Milliseconds per command or request"
+    )
+    parser.add_argument(
+        "--login-latency", type=float, default=0, help="Milliseconds per SSH login"
+    )
+    args = parser.parse_args()
+
+    devices = build_fleet(
+        args.hosts, tuple(args.kinds.split(",")), args.first_address, args.interfaces
+    )
+    try:
+        asyncio.run(
+            serve(
+                devices,
+                ssh_port=args.ssh_port,
+                snmp_port=args.snmp_port,
+                https_port=args.https_port,
+                latency=args.latency / 1000,
+                login_latency=args.login_latency / 1000,
+            )
+        )
+    except KeyboardInterrupt:
+        logging.info("Stopping simulated devices....")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Minimal HTTPS RESTCONF server exposing ietf-interfaces of a simulated device."""
+
+import asyncio
+import base64
+import hashlib
+import json
+import ssl
+from urllib.parse import unquote, urlsplit
+
+INTERFACES_PATH = "/restconf/data/ietf-interfaces:interfaces"
+
+REASONS = {
+    200: "OK",
+    204: "No Content",
+    304: "Not Modified",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    405: "Method Not Allowed",
+}
+
+
+def interface_entry(interface):
+    """Returns the ietf-interfaces representation of a simulated interface."""
+    return {
+        "name": interface["name"],
+        "description": interface["description"],
+        "type": "iana-if-type:ethernetCsmacd",
+        "enabled": interface["enabled"],
+        "ietf-ip:ipv4": {
+            "address": [{"ip": interface["ip"], "netmask": interface["netmask"]}]
+        },
+        "ietf-ip:ipv6": {},
+    }
+
+
+class RestconfHandler:
+    """
+    Serves GET and PATCH on ietf-interfaces:interfaces for one device over HTTP/1.1
+    keep-alive connections.
+
+    GET replies carry an ETag and answer If-None-Match with 304 Not Modified. A merge
+    PATCH updates description and enabled; a YANG Patch (application/yang-patch+json)
+    is accepted and acknowledged with an ok status.
+
+    Args:
+        device (SimulatedDevice): The device to serve.
+        username (str): The accepted username.
+        password (str): The accepted password.
+        latency (float): Seconds the device takes to answer a request.
+    """
+
+    def __init__(self, device, username="admin", password="admin", latency=0.0):
+        self.device = device
+        self.latency = latency
+        token = base64.b64encode(f"{username}:{password}".encode()).decode()
+        self.authorization = f"Basic {token}"
+
+    def _interfaces(self, name=None):
+        if name is None:
+            return {
+                "ietf-interfaces:interfaces": {
+                    "interface": [
+                        interface_entry(interface)
+                        for interface in self.device.interfaces
+                    ]
+                }
+            }
+        for interface in self.device.interfaces:
+            if interface["name"] == name:
+                return {"ietf-interfaces:interface": [interface_entry(interface)]}
+        return None
+
+    def _merge(self, entries):
+        by_name = {interface["name"]: interface for interface in self.device.interfaces}
+        for entry in entries:
+            interface = by_name.get(entry.get("name"))
+            if interface is None:
+                continue
+            for key in ("description", "enabled"):
+                if key in entry:
+                    interface[key] = entry[key]
+
+    def respond(self, method, target, headers, body):
+        """Returns (status, extra headers, body bytes) for one request."""
+        if headers.get("authorization") != self.authorization:
+            return 401, {"WWW-Authenticate": 'Basic realm="restconf"'}, b""
+        path = urlsplit(target).path
+        if not path.startswith(INTERFACES_PATH):
+            return 404, {}, b""
+        name = None
+        if path.startswith(f"{INTERFACES_PATH}/interface="):
+            name = unquote(path.split("=", 1)[1])
+
+        if method == "GET":
+            data = self._interfaces(name)
+            if data is None:
+                return 404, {}, b""
+            payload = json.dumps(data).encode()
+            etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+            if headers.get("if-none-match") == etag:
+                return 304, {"ETag": etag}, b""
+            return (
+                200,
+                {"Content-Type": "application/yang-data+json", "ETag": etag},
+                payload,
+            )
+
+        if method == "PATCH":
+            try:
+                data = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {}, b""
+            if "ietf-yang-patch:yang-patch" in data:
+                patch = data["ietf-yang-patch:yang-patch"]
+                for edit in patch.get("edit", []):
+                    self._merge(
+                        edit.get("value", {}).get("ietf-interfaces:interface", [])
+                    )
+                status = {
+                    "ietf-yang-patch:yang-patch-status": {
+                        "patch-id": patch.get("patch-id"),
+                        "ok": [None],
+                    }
+                }
+                return (
+                    200,
+                    {"Content-Type": "application/yang-data+json"},
+                    json.dumps(status).encode(),
+                )
+            entries = data.get("ietf-interfaces:interfaces", {}).get("interface")
+            if entries is None:
+                entries = data.get("ietf-interfaces:interface", [])
+            self._merge(entries)
+            return 204, {}, b""
+
+        return 405, {"Allow": "GET, PATCH"}, b""
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, extra_headers, payload = self.respond(
+                    method, target, headers, body
+                )
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+                head += [f"{key}: {value}" for key, value in extra_headers.items()]
+                head.append(f"Content-Length: {len(payload)}")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ssl.SSLError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def start_restconf_server(
+    device, port, ssl_context, username="admin", password="admin", latency=0.0
+):
+    """
+    Starts the RESTCONF server for one device on its address.
+
+    Args:
+        device (SimulatedDevice): The device to serve.
+        port (int): The TCP port to listen on.
+        ssl_context (ssl.SSLContext): Server TLS context with the certificate loaded.
+        username (str): The accepted username.
+        password (str): The accepted password.
+        latency (float): Seconds the device takes to answer a request.
+
+    Returns:
+        asyncio.Server: The listening server.
+    """
+    handler = RestconfHandler(device, username, password, latency)
+    return await asyncio.start_server(
+        handler.handle, device.address, port, ssl=ssl_context
+    )
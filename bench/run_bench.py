@@ -0,0 +1,421 @@
+"""Measures devices per second of the lab scripts against simulated devices, without containerlab."""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import io
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import yaml
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [
+    os.path.join(REPO_DIR, "campus-lab", "scripts"),
+    os.path.join(REPO_DIR, "api-lab", "scripts"),
+]
+
+import cpu_pool
+from async_runner import run_async
+from fetch_configs import gather_device_data
+from get_interface_data import get_interface_data
+from lab_nornir import init_nornir
+from metrics import Metrics
+from platforms import PLATFORMS
+from push_configs import push_host_config
+from restconf_client import RestconfClient
+from snmp_client import SnmpClient
+from snmp_if_table import snmp_interface_counters_task
+
+from devices import KINDS, build_fleet
+from fleet import FleetProcess
+
+snmp_get = importlib.import_module("snmp-get")
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+BENCHMARKS = ("push", "fetch", "snmp_get", "snmp_if_table", "restconf_read")
+
+
+@contextlib.contextmanager
+def quiet(verbose=False):
+    """Silences the per-host logs and printed results of the scripts being measured."""
+    if verbose:
+        yield
+        return
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.WARNING)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        root.setLevel(level)
+
+
+class Workspace:
+    """
+    Topology, intended configs and output directories for one benchmark run.
+
+    The topology lists every simulated device with its kind and loopback address, so
+    the scripts load it through ClabInventory exactly like lab.clab.yaml.
+
+    Args:
+        devices (list): The SimulatedDevice objects of the fleet.
+        directory (str): Where the files are written.
+    """
+
+    def __init__(self, devices, directory):
+        self.devices = devices
+        self.topology_file = os.path.join(directory, "bench.clab.yaml")
+        self.config_dir = os.path.join(directory, "configs")
+        self.fetched_dir = os.path.join(directory, "fetched_configs")
+        self.running_dir = os.path.join(directory, "running_configs")
+        for path in (self.config_dir, self.fetched_dir, self.running_dir):
+            os.makedirs(path, exist_ok=True)
+
+        topology = {
+            "name": "bench",
+            "topology": {
+                "nodes": {
+                    device.name: {"kind": device.kind, "mgmt-ipv4": device.address}
+                    for device in devices
+                }
+            },
+        }
+        with open(self.topology_file, "w") as f:
+            yaml.safe_dump(topology, f)
+
+        # The intended config is the device's own config with one changed line
+        for device in devices:
+            lines = device.config_lines()[:-1]
+            lines.insert(1, f"snmp-server location bench-{device.name}")
+            config_file = os.path.join(
+                self.config_dir, f"{device.name}.{PLATFORMS[device.kind].config_ext}"
+            )
+            with open(config_file, "w") as f:
+                f.write("\n".join(lines) + "\n")
+
+    def nornir(self, workers, ssh_port):
+        """Returns a fresh Nornir object for the fleet, so every round logs in again."""
+        nr = init_nornir(
+            config_file="",
+            inventory={
+                "plugin": "ClabInventory",
+                "options": {"topology_file": self.topology_file},
+                "transform_function": "lab_platforms",
+            },
+            runner={"plugin": "LabRunner", "options": {"num_workers": workers}},
+            logging={"enabled": False},
+        )
+        for host in nr.inventory.hosts.values():
+            host.port = ssh_port
+            if host.platform == "arista_ceos":
+                # The simulated devices have no eAPI, NAPALM's EOS driver uses SSH
+                host.connection_options["napalm"].extras = {
+                    "optional_args": {"transport": "ssh"}
+                }
+        return nr
+
+
+def run_push(workspace, args, metrics):
+    nr = workspace.nornir(args.workers, args.ssh_port)
+    try:
+        result = nr.run(
+            task=push_host_config,
+            config_dir=workspace.config_dir,
+            diff_only=args.push_diff,
+            running_config_dir=workspace.running_dir,
+            metrics=metrics,
+        )
+    finally:
+        nr.close_connections()
+    return len(result.failed_hosts)
+
+
+def run_fetch(workspace, args, metrics):
+    nr = workspace.nornir(args.workers, args.ssh_port)
+    try:
+        result = nr.run(
+            task=gather_device_data,
+            getters=["config"],
+            save_to_file=True,
+            output_dir=workspace.fetched_dir,
+            metrics=metrics,
+        )
+    finally:
+        nr.close_connections()
+    return len(result.failed_hosts)
+
+
+def run_snmp(workspace, args, task, per_request_deadline=True, **kwargs):
+    nr = workspace.nornir(args.workers, args.ssh_port)
+
+    async def poll():
+        client = SnmpClient(port=args.snmp_port, timeout=1, retries=2)
+        try:
+            return await run_async(
+                nr,
+                task,
+                concurrency=args.snmp_concurrency,
+                # A walk takes several requests, it is only bounded by their timeouts
+                timeout=client.deadline() if per_request_deadline else None,
+                client=client,
+                **kwargs,
+            )
+        finally:
+            client.close()
+
+    return len(asyncio.run(poll()).failed_hosts)
+
+
+def run_snmp_get(workspace, args, metrics):
+    return run_snmp(
+        workspace,
+        args,
+        snmp_get.snmp_get_task,
+        oid="SNMPv2-MIB,sysDescr,0",
+        metrics=metrics,
+    )
+
+
+def run_snmp_if_table(workspace, args, metrics):
+    return run_snmp(
+        workspace, args, snmp_interface_counters_task, per_request_deadline=False
+    )
+
+
+def run_restconf_read(workspace, args, metrics):
+    hosts = [device.address for device in workspace.devices]
+    with RestconfClient(
+        "admin", "admin", port=args.https_port, max_workers=args.workers
+    ) as client:
+        results = client.run(get_interface_data, hosts, metrics=metrics)
+    return sum(1 for data in results.values() if data is None)
+
+
+RUNNERS = {
+    "push": run_push,
+    "fetch": run_fetch,
+    "snmp_get": run_snmp_get,
+    "snmp_if_table": run_snmp_if_table,
+    "restconf_read": run_restconf_read,
+}
+
+
+def measure(name, workspace, args, metrics=None):
+    """
+    Runs one benchmark for the warm-up and measured rounds.
+
+    Returns:
+        dict: Devices per second of each measured round, their median, minimum and
+              maximum, and the most hosts that failed in a round.
+    """
+    hosts = len(workspace.devices)
+    rates = []
+    failed = 0
+    for round_number in range(args.warmup + args.rounds):
+        warmup = round_number < args.warmup
+        start = time.perf_counter()
+        with quiet(args.verbose):
+            round_failed = RUNNERS[name](workspace, args, None if warmup else metrics)
+        elapsed = time.perf_counter() - start
+        if warmup:
+            continue
+        rates.append(hosts / elapsed)
+        failed = max(failed, round_failed)
+        logging.info(
+            f"{name}: {hosts} devices in {elapsed:.2f}s "
+            f"({rates[-1]:.1f} devices/s, {round_failed} failed)"
+        )
+    return {
+        "hosts": hosts,
+        "devices_per_second": rates,
+        "median": statistics.median(rates),
+        "min": min(rates),
+        "max": max(rates),
+        "failed": failed,
+    }
+
+
+def compare(results, baseline_file, tolerance):
+    """
+    Compares the medians with a previous results file.
+
+    Returns:
+        list: Benchmarks whose median dropped more than ``tolerance`` below the baseline.
+    """
+    with open(baseline_file) as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        reference = baseline[name]["median"]
+        change = result["median"] / reference - 1
+        logging.info(
+            f"{name}: {result['median']:.1f} devices/s vs {reference:.1f} in the "
+            f"baseline ({change:+.0%})"
+        )
+        if change < -tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def print_report(results):
+    print(
+        f"{'benchmark':<15}{'devices':>8}{'median/s':>10}{'min/s':>8}{'max/s':>8}{'failed':>8}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<15}{result['hosts']:>8}{result['median']:>10.1f}"
+            f"{result['min']:>8.1f}{result['max']:>8.1f}{result['failed']:>8}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hosts", type=int, default=50, help="Simulated devices")
+    parser.add_argument(
+        "--kinds",
+        default=",".join(KINDS),
+        help="Comma-separated containerlab kinds assigned round-robin",
+    )
+    parser.add_argument("--interfaces", type=int, default=48)
+    parser.add_argument(
+        "--dead-hosts",
+        type=int,
+        default=0,
+        help="Extra topology nodes nothing listens for, to check failures are counted",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=5,
+        help="Milliseconds a device takes per command or request (default: 5)",
+    )
+    parser.add_argument(
+        "--login-latency",
+        type=float,
+        default=50,
+        help="Milliseconds a device takes per SSH login (default: 50)",
+    )
+    parser.add_argument(
+        "--benchmarks",
+        default=",".join(BENCHMARKS),
+        help=f"Comma-separated benchmarks to run (default: {','.join(BENCHMARKS)})",
+    )
+    parser.add_argument("--rounds", type=int, default=3, help="Measured rounds")
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Rounds run first and not measured"
+    )
+    parser.add_argument("--workers", type=int, default=20, help="Nornir workers")
+    parser.add_argument("--snmp-concurrency", type=int, default=100)
+    parser.add_argument(
+        "--push-diff", action="store_true", help="Push only the changed lines"
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Worker processes for parsing, diffing and rendering (default: 0, inline)",
+    )
+    parser.add_argument("--first-address", default="127.1.0.1")
+    parser.add_argument("--ssh-port", type=int, default=2222)
+    parser.add_argument("--snmp-port", type=int, default=1161)
+    parser.add_argument("--https-port", type=int, default=8443)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument(
+        "--baseline",
+        help="Results file of an earlier run; exit with status 1 on a regression",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed drop of a median below the baseline (default: 0.2)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PREFIX",
+        help="Write phase timings to PREFIX.prom and PREFIX.trace.json",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show the scripts' own output"
+    )
+    args = parser.parse_args()
+
+    names = args.benchmarks.split(",")
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    # Dead hosts get the addresses after the fleet and are left out of FleetProcess
+    devices = build_fleet(
+        args.hosts + args.dead_hosts,
+        tuple(args.kinds.split(",")),
+        args.first_address,
+        args.interfaces,
+    )
+    metrics = Metrics() if args.metrics else None
+    cpu_pool.start(args.processes)
+    results = {}
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        FleetProcess(
+            devices[: args.hosts],
+            ssh_port=args.ssh_port,
+            snmp_port=args.snmp_port,
+            https_port=args.https_port,
+            latency=args.latency / 1000,
+            login_latency=args.login_latency / 1000,
+        ),
+    ):
+        workspace = Workspace(devices, directory)
+        for name in names:
+            logging.info(f"Running {name} against {len(devices)} simulated devices")
+            results[name] = measure(name, workspace, args, metrics)
+
+    print_report(results)
+    if metrics is not None:
+        metrics.log_summary()
+        metrics.write(args.metrics)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "options": {
+                        key: value
+                        for key, value in vars(args).items()
+                        if key not in ("output", "baseline", "metrics", "verbose")
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        logging.info(f"Results written to {args.output}")
+
+    failed = [name for name, result in results.items() if result["failed"]]
+    if failed:
+        logging.error(f"❌ Devices failed in: {', '.join(failed)}")
+    regressions = []
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        if regressions:
+            logging.error(f"❌ Slower than the baseline: {', '.join(regressions)}")
+    if failed or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
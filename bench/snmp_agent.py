@@ -0,0 +1,277 @@
+"""Minimal SNMP v2c responder serving the system group and IF-MIB of a simulated device."""
+
+import asyncio
+import bisect
+
+from devices import SYS_DESCR
+
+SYSTEM = (1, 3, 6, 1, 2, 1, 1)
+IF_NUMBER = (1, 3, 6, 1, 2, 1, 2, 1, 0)
+IF_ENTRY = (1, 3, 6, 1, 2, 1, 2, 2, 1)
+IFX_ENTRY = (1, 3, 6, 1, 2, 1, 31, 1, 1, 1)
+
+SYS_OBJECT_ID = {
+    "cisco_iol": (1, 3, 6, 1, 4, 1, 9, 1, 1208),
+    "arista_ceos": (1, 3, 6, 1, 4, 1, 30065, 1, 3011, 7010, 427, 48),
+}
+
+# BER tags
+INTEGER = 0x02
+OCTET_STRING = 0x04
+OBJECT_IDENTIFIER = 0x06
+SEQUENCE = 0x30
+COUNTER32 = 0x41
+GAUGE32 = 0x42
+TIMETICKS = 0x43
+COUNTER64 = 0x46
+GET_REQUEST = 0xA0
+GET_NEXT_REQUEST = 0xA1
+RESPONSE = 0xA2
+GET_BULK_REQUEST = 0xA5
+NO_SUCH_INSTANCE = b"\x81\x00"
+END_OF_MIB_VIEW = b"\x82\x00"
+
+SNMP_V2C = 1
+
+
+def _tlv(tag, content):
+    length = len(content)
+    if length < 0x80:
+        return bytes((tag, length)) + content
+    size = (length.bit_length() + 7) // 8
+    return bytes((tag, 0x80 | size)) + length.to_bytes(size, "big") + content
+
+
+def _integer(value, tag=INTEGER):
+    # Two's complement; unsigned application types get a leading zero when needed
+    return _tlv(tag, value.to_bytes((value.bit_length() + 8) // 8, "big", signed=True))
+
+
+def _oid(oid):
+    content = bytearray()
+    for arc in (oid[0] * 40 + oid[1], *oid[2:]):
+        chunk = [arc & 0x7F]
+        arc >>= 7
+        while arc:
+            chunk.append(0x80 | (arc & 0x7F))
+            arc >>= 7
+        content += bytes(reversed(chunk))
+    return _tlv(OBJECT_IDENTIFIER, bytes(content))
+
+
+def _read(data, offset=0):
+    """Returns (tag, content, offset after the element) of the BER element at offset."""
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[offset : offset + size], "big")
+        offset += size
+    end = offset + length
+    if end > len(data):
+        raise ValueError("Truncated BER element")
+    return tag, data[offset:end], end
+
+
+def _elements(content):
+    offset = 0
+    while offset < len(content):
+        tag, value, offset = _read(content, offset)
+        yield tag, value
+
+
+def _decode_oid(content):
+    arcs = []
+    value = 0
+    for byte in content:
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            arcs.append(value)
+            value = 0
+    first = min(arcs[0] // 40, 2)
+    return (first, arcs[0] - 40 * first, *arcs[1:])
+
+
+def _encode_value(tag, value):
+    if tag == OCTET_STRING:
+        return _tlv(OCTET_STRING, value.encode())
+    if tag == OBJECT_IDENTIFIER:
+        return _oid(value)
+    return _integer(value, tag)
+
+
+def build_mib(device):
+    """
+    Returns the sorted OIDs of a device and a function computing each value.
+
+    Each function returns a (BER tag, value) pair. Counters and sysUpTime are
+    computed when requested, so successive polls see them increase like on a real
+    device.
+    """
+    values = {
+        SYSTEM + (1, 0): lambda: (OCTET_STRING, SYS_DESCR[device.kind]),
+        SYSTEM + (2, 0): lambda: (OBJECT_IDENTIFIER, SYS_OBJECT_ID[device.kind]),
+        SYSTEM + (3, 0): lambda: (TIMETICKS, device.uptime()),
+        SYSTEM + (4, 0): lambda: (OCTET_STRING, "admin@example.com"),
+        SYSTEM + (5, 0): lambda: (OCTET_STRING, device.name),
+        SYSTEM + (6, 0): lambda: (OCTET_STRING, "Lab"),
+        IF_NUMBER: lambda: (INTEGER, len(device.interfaces)),
+    }
+    for number, interface in enumerate(device.interfaces):
+        index = number + 1
+
+        def status(interface=interface):
+            return (INTEGER, 1 if interface["enabled"] else 2)
+
+        def name(interface=interface):
+            return (OCTET_STRING, interface["name"])
+
+        def in_octets(number=number):
+            return device.octets(number, "in")
+
+        def out_octets(number=number):
+            return device.octets(number, "out")
+
+        columns = {
+            IF_ENTRY + (1,): lambda index=index: (INTEGER, index),
+            IF_ENTRY + (2,): name,
+            IF_ENTRY + (3,): lambda: (INTEGER, 6),  # ethernetCsmacd
+            IF_ENTRY + (5,): lambda: (GAUGE32, 1_000_000_000),
+            IF_ENTRY + (7,): status,
+            IF_ENTRY + (8,): status,
+            IF_ENTRY + (10,): lambda f=in_octets: (COUNTER32, f() % 2**32),
+            IF_ENTRY + (13,): lambda: (COUNTER32, 0),
+            IF_ENTRY + (14,): lambda: (COUNTER32, 0),
+            IF_ENTRY + (16,): lambda f=out_octets: (COUNTER32, f() % 2**32),
+            IF_ENTRY + (19,): lambda: (COUNTER32, 0),
+            IF_ENTRY + (20,): lambda: (COUNTER32, 0),
+            IFX_ENTRY + (1,): name,
+            IFX_ENTRY + (6,): lambda f=in_octets: (COUNTER64, f()),
+            IFX_ENTRY + (10,): lambda f=out_octets: (COUNTER64, f()),
+        }
+        for column, value in columns.items():
+            values[column + (index,)] = value
+    return sorted(values), values
+
+
+class SnmpResponder(asyncio.DatagramProtocol):
+    """
+    Answers SNMP v2c GET, GETNEXT and GETBULK requests for one device.
+
+    Messages are encoded and decoded by hand rather than with pysnmp: pyasn1 needs
+    about 10 ms per GETBULK response, which made the emulator, not the code under
+    test, the bottleneck with a few dozen devices. Requests with another community
+    are dropped, like a device does, so the client times out.
+
+    Args:
+        device (SimulatedDevice): The device to serve.
+        community (str): The accepted community string.
+        latency (float): Seconds the device takes to answer a request.
+        max_varbinds (int): Most varbinds returned in one GETBULK response.
+    """
+
+    def __init__(self, device, community="public", latency=0.0, max_varbinds=250):
+        self.community = community.encode()
+        self.latency = latency
+        self.max_varbinds = max_varbinds
+        self.oids, self.values = build_mib(device)
+        self._encoded_oids = {oid: _oid(oid) for oid in self.oids}
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            response = self.respond(data)
+        except (IndexError, ValueError):
+            return
+        if response is None:
+            return
+        if self.latency:
+            asyncio.get_running_loop().call_later(
+                self.latency, self.transport.sendto, response, addr
+            )
+        else:
+            self.transport.sendto(response, addr)
+
+    def _varbind(self, oid, value):
+        encoded_oid = self._encoded_oids.get(oid) or _oid(oid)
+        return _tlv(SEQUENCE, encoded_oid + value)
+
+    def _get(self, oid):
+        value = self.values.get(oid)
+        if value is None:
+            return oid, self._varbind(oid, NO_SUCH_INSTANCE)
+        return oid, self._varbind(oid, _encode_value(*value()))
+
+    def _next(self, oid):
+        position = bisect.bisect_right(self.oids, oid)
+        if position == len(self.oids):
+            return oid, self._varbind(oid, END_OF_MIB_VIEW)
+        return self._get(self.oids[position])
+
+    def respond(self, data):
+        """Returns the encoded response to an encoded request, or None to drop it."""
+        tag, message, _ = _read(data)
+        if tag != SEQUENCE:
+            return None
+        (_, version), (_, community), (pdu_type, pdu) = list(_elements(message))
+        if int.from_bytes(version, "big") != SNMP_V2C or community != self.community:
+            return None
+
+        fields = list(_elements(pdu))
+        request_id = int.from_bytes(fields[0][1], "big", signed=True)
+        oids = [
+            _decode_oid(next(_elements(varbind))[1])
+            for _, varbind in _elements(fields[3][1])
+        ]
+        if pdu_type == GET_REQUEST:
+            varbinds = [self._get(oid)[1] for oid in oids]
+        elif pdu_type == GET_NEXT_REQUEST:
+            varbinds = [self._next(oid)[1] for oid in oids]
+        elif pdu_type == GET_BULK_REQUEST:
+            non_repeaters = int.from_bytes(fields[1][1], "big")
+            max_repetitions = int.from_bytes(fields[2][1], "big")
+            varbinds = [self._next(oid)[1] for oid in oids[:non_repeaters]]
+            repeaters = oids[non_repeaters:]
+            for _ in range(max_repetitions):
+                if not repeaters or len(varbinds) + len(repeaters) > self.max_varbinds:
+                    break
+                row = [self._next(oid) for oid in repeaters]
+                varbinds += [varbind for _, varbind in row]
+                repeaters = [oid for oid, _ in row]
+        else:
+            return None
+
+        pdu = _tlv(
+            RESPONSE,
+            _integer(request_id)
+            + _integer(0)
+            + _integer(0)
+            + _tlv(SEQUENCE, b"".join(varbinds)),
+        )
+        return _tlv(
+            SEQUENCE, _integer(SNMP_V2C) + _tlv(OCTET_STRING, self.community) + pdu
+        )
+
+
+async def start_snmp_agent(device, port, community="public", latency=0.0):
+    """
+    Starts the SNMP responder for one device on its address.
+
+    Args:
+        device (SimulatedDevice): The device to serve.
+        port (int): The UDP port to listen on.
+        community (str): The accepted community string.
+        latency (float): Seconds the device takes to answer a request.
+
+    Returns:
+        asyncio.DatagramTransport: The listening transport.
+    """
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+        lambda: SnmpResponder(device, community, latency),
+        local_addr=(device.address, port),
+    )
+    return transport
@@ -0,0 +1,202 @@
+"""asyncssh server emulating the IOS and EOS command line closely enough for Netmiko and NAPALM."""
+
+import asyncio
+import functools
+import json
+
+import asyncssh
+
+from devices import SYS_DESCR, mode_of
+
+INVALID_INPUT = {
+    "cisco_iol": "                 ^\n% Invalid input detected at '^' marker.",
+    "arista_ceos": "% Invalid input",
+}
+
+
+class CliSession:
+    """
+    The command line of one SSH session on a simulated device.
+
+    Supports what the lab scripts send: terminal settings, enable, configure terminal
+    with sub-modes, exit/end, show running-config/startup-config, show version
+    (also "| json" for NAPALM's EOS driver over SSH) and show ip interface brief.
+    Other show commands return no output, other exec commands an invalid input error.
+
+    Args:
+        device (SimulatedDevice): The device the session is logged into.
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self.config_mode = False
+        self.parent = None  # top-level line of the current configuration sub-mode
+
+    def prompt(self):
+        if not self.config_mode:
+            return f"{self.device.name}#"
+        if self.parent is None:
+            return f"{self.device.name}(config)#"
+        return f"{self.device.name}(config-{mode_of(self.parent)})#"
+
+    def execute(self, line):
+        """
+        Runs one input line.
+
+        Returns:
+            str or None: The output to print before the next prompt, or None once the
+                         session is closed.
+        """
+        command = line.strip()
+        if self.config_mode:
+            return self._configure(command, indented=line[:1].isspace())
+        if self.device.kind == "arista_ceos" and command.startswith("terminal "):
+            if command.startswith("terminal width"):
+                return f"Width set to {command.split()[-1]} columns."
+            if command.startswith("terminal length"):
+                return "Pagination disabled."
+        if not command or command.startswith(("terminal ", "enable")):
+            return ""
+        if command in ("exit", "logout", "quit"):
+            return None
+        if command in ("configure terminal", "configure", "conf t"):
+            self.config_mode = True
+            if self.device.kind == "cisco_iol":
+                return "Enter configuration commands, one per line.  End with CNTL/Z."
+            return ""
+        if command.startswith(("show running-config", "show startup-config")):
+            return self.device.running_config()
+        if command == "show version | json":
+            return json.dumps({
+                "modelName": "cEOSLab",
+                "version": "4.30.0F",
+                "serialNumber": self.device.name,
+                "uptime": self.device.uptime() / 100,
+            })
+        if command.endswith("| json"):
+            return "{}"
+        if command == "show version":
+            return f"{SYS_DESCR[self.device.kind]}\n{self.device.name} uptime is 1 hour"
+        if command == "show ip interface brief":
+            return self._ip_interface_brief()
+        if command.startswith("show "):
+            return ""
+        if command in ("write memory", "copy running-config startup-config"):
+            return "Building configuration...\n[OK]"
+        return INVALID_INPUT[self.device.kind]
+
+    def _configure(self, command, indented):
+        if not command or command.startswith("!"):
+            return ""
+        if command in ("end", "\x1a"):
+            self.config_mode = False
+            self.parent = None
+        elif command == "exit":
+            if self.parent is None:
+                self.config_mode = False
+            self.parent = None
+        else:
+            if self.parent is not None and not indented:
+                # A top-level command leaves the current sub-mode, as on the device
+                self.parent = None
+            self.parent = self.device.configure(self.parent, command)
+        return ""
+
+    def _ip_interface_brief(self):
+        lines = [
+            "Interface              IP-Address      OK? Method Status                Protocol"
+        ]
+        for interface in self.device.interfaces:
+            status = "up" if interface["enabled"] else "administratively down"
+            lines.append(
+                f"{interface['name']:<23}{interface['ip']:<16}YES manual "
+                f"{status:<22}{'up' if interface['enabled'] else 'down'}"
+            )
+        return "\n".join(lines)
+
+
+class _SshServer(asyncssh.SSHServer):
+    def __init__(self, username, password, login_latency):
+        self.username = username
+        self.password = password
+        self.login_latency = login_latency
+
+    def begin_auth(self, username):
+        return True
+
+    def password_auth_supported(self):
+        return True
+
+    async def validate_password(self, username, password):
+        if self.login_latency:
+            await asyncio.sleep(self.login_latency)
+        return username == self.username and password == self.password
+
+
+async def _shell(device, latency, process):
+    session = CliSession(device)
+    process.stdout.write(session.prompt())
+    line = ""
+    after_cr = False
+    try:
+        while True:
+            data = await process.stdin.read(4096)
+            if not data:
+                break
+            for char in data:
+                if char == "\n" and after_cr:
+                    after_cr = False
+                    continue
+                after_cr = char == "\r"
+                if char not in "\r\n":
+                    line += char
+                    continue
+                # Echo the line like a terminal, then answer after the device latency
+                process.stdout.write(f"{line}\r\n")
+                output = session.execute(line)
+                line = ""
+                if latency:
+                    await asyncio.sleep(latency)
+                if output is None:
+                    process.exit(0)
+                    return
+                if output:
+                    process.stdout.write(output.replace("\n", "\r\n") + "\r\n")
+                process.stdout.write(session.prompt())
+    except (asyncssh.BreakReceived, asyncssh.TerminalSizeChanged, ConnectionError):
+        pass
+    process.exit(0)
+
+
+async def start_ssh_server(
+    device,
+    port,
+    host_key,
+    username="admin",
+    password="admin",
+    latency=0.0,
+    login_latency=0.0,
+):
+    """
+    Starts an SSH server for one device on its address.
+
+    Args:
+        device (SimulatedDevice): The device to emulate.
+        port (int): The TCP port to listen on.
+        host_key (asyncssh.SSHKey): The server host key.
+        username (str): The accepted username.
+        password (str): The accepted password.
+        latency (float): Seconds the device takes to answer each line.
+        login_latency (float): Seconds the device takes to check the password.
+
+    Returns:
+        asyncssh.SSHAcceptor: The listening server.
+    """
+    return await asyncssh.create_server(
+        lambda: _SshServer(username, password, login_latency),
+        device.address,
+        port,
+        server_host_keys=[host_key],
+        process_factory=functools.partial(_shell, device, latency),
+        line_editor=False,
+    )
@@ -0,0 +1,188 @@
+"""Measures how long each campus_lab.py subcommand takes to start, in fresh interpreters."""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(REPO_DIR, "campus-lab", "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+from campus_lab import COMMANDS
+
+from devices import KINDS, build_fleet
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Packages worth knowing about when they are loaded before any device is contacted
+HEAVY_PACKAGES = ("napalm", "netmiko", "paramiko", "pysnmp", "ntc_templates", "jinja2")
+
+# Run in each child: everything a subcommand does before its first connection,
+# importing its script and, for the Nornir ones, loading the inventory
+STARTUP = """
+import json, sys, time
+start = time.perf_counter()
+import campus_lab
+script = campus_lab.load(sys.argv[1])
+if hasattr(script, "init_nornir"):
+    script.init_nornir(
+        config_file="",
+        inventory={
+            "plugin": "ClabInventory",
+            "options": {"topology_file": sys.argv[2]},
+            "transform_function": "lab_platforms",
+        },
+        runner={"plugin": "LabRunner"},
+        logging={"enabled": False},
+    )
+elapsed = time.perf_counter() - start
+with open(sys.argv[4], "w") as f:
+    json.dump(
+        {
+            "seconds": elapsed,
+            "loaded": [name for name in sys.argv[3].split(",") if name in sys.modules],
+        },
+        f,
+    )
+"""
+
+
+def measure(command, topology_file, rounds):
+    """
+    Starts a subcommand ``rounds`` times, each in a new interpreter.
+
+    Returns:
+        dict: Median and minimum milliseconds from process start to a ready Nornir
+              object, the part of it spent importing and initializing, and the
+              heavy packages that were loaded.
+    """
+    totals = []
+    imports = []
+    result_file = f"{topology_file}.{command}.json"
+    for _ in range(rounds):
+        start = time.perf_counter()
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                STARTUP,
+                command,
+                topology_file,
+                ",".join(HEAVY_PACKAGES),
+                result_file,
+            ],
+            cwd=SCRIPTS_DIR,
+            capture_output=True,
+            check=True,
+        )
+        totals.append((time.perf_counter() - start) * 1000)
+        with open(result_file) as f:
+            child = json.load(f)
+        imports.append(child["seconds"] * 1000)
+    return {
+        "median_ms": statistics.median(totals),
+        "min_ms": min(totals),
+        "import_ms": statistics.median(imports),
+        "loaded": child["loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--commands",
+        default=",".join(COMMANDS),
+        help="Comma-separated subcommands to measure (default: all)",
+    )
+    parser.add_argument("--hosts", type=int, default=50, help="Hosts in the inventory")
+    parser.add_argument("--rounds", type=int, default=5, help="Starts per subcommand")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument(
+        "--baseline",
+        help="Results file of an earlier run; exit with status 1 on a regression",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed rise of a median above the baseline (default: 0.2)",
+    )
+    args = parser.parse_args()
+
+    names = args.commands.split(",")
+    unknown = set(names) - set(COMMANDS)
+    if unknown:
+        parser.error(f"unknown commands: {', '.join(sorted(unknown))}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        topology_file = os.path.join(directory, "startup.clab.yaml")
+        topology = {
+            "name": "startup",
+            "topology": {
+                "nodes": {
+                    device.name: {"kind": device.kind, "mgmt-ipv4": device.address}
+                    for device in build_fleet(args.hosts, KINDS)
+                }
+            },
+        }
+        with open(topology_file, "w") as f:
+            yaml.safe_dump(topology, f)
+        for name in names:
+            results[name] = measure(name, topology_file, args.rounds)
+            logging.info(f"{name}: {results[name]['median_ms']:.0f} ms")
+
+    print(f"{'command':<13}{'median ms':>10}{'min ms':>8}{'import ms':>10}  loaded")
+    for name, result in results.items():
+        print(
+            f"{name:<13}{result['median_ms']:>10.0f}{result['min_ms']:>8.0f}"
+            f"{result['import_ms']:>10.0f}  {', '.join(result['loaded']) or '-'}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "options": {"hosts": args.hosts, "rounds": args.rounds},
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        logging.info(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = []
+        for name, result in results.items():
+            if name not in baseline:
+                continue
+            reference = baseline[name]["median_ms"]
+            change = result["median_ms"] / reference - 1
+            logging.info(
+                f"{name}: {result['median_ms']:.0f} ms vs {reference:.0f} ms in the "
+                f"baseline ({change:+.0%})"
+            )
+            if change > args.tolerance:
+                regressions.append(name)
+        if regressions:
+            logging.error(
+                f"❌ Slower to start than the baseline: {', '.join(regressions)}"
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
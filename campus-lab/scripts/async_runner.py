@@ -0,0 +1,76 @@
+"""Runs async Nornir tasks for the whole inventory on a single asyncio event loop."""
+
+import asyncio
+import logging
+import time
+
+from nornir.core.task import AggregatedResult, MultiResult, Result, Task
+
+
+async def _run_host(nr, task, host, semaphore, timeout, kwargs):
+    """Runs one async task against one host under the shared in-flight limit."""
+    nornir_task = Task(
+        task,
+        nr,
+        global_dry_run=nr.data.dry_run,
+        processors=nr.processors,
+        **kwargs,
+    )
+    nornir_task.host = host
+
+    async with semaphore:
+        try:
+            result = await asyncio.wait_for(task(nornir_task, **kwargs), timeout)
+        except asyncio.TimeoutError as e:
+            error_message = f"Timed out after {timeout}s"
+            logging.error(f"❌ {host.name}: {error_message}")
+            result = Result(host=host, result=error_message, failed=True, exception=e)
+        except Exception as e:
+            error_message = f"An unexpected error occurred: {e}"
+            logging.error(f"❌ {host.name}: {error_message}")
+            result = Result(host=host, result=error_message, failed=True, exception=e)
+
+    if result is None:
+        result = Result(host=host)
+    result.name = nornir_task.name
+    multi_result = MultiResult(nornir_task.name)
+    multi_result.append(result)
+    return host.name, multi_result
+
+
+async def run_async(nr, task, concurrency=100, timeout=None, **kwargs):
+    """
+    Runs an async Nornir task against every host of ``nr`` concurrently.
+
+    ``Nornir.run`` is synchronous and hands each host to a thread, so coroutine tasks
+    never share an event loop. This schedules every host on the running loop instead,
+    with at most ``concurrency`` hosts in flight at once.
+
+    Args:
+        nr (nornir.core.Nornir): The (filtered) Nornir object to run against.
+        task (callable): An ``async def`` task taking the Nornir task as first argument.
+        concurrency (int): Maximum number of hosts in flight at once.
+        timeout (float, optional): Per-host deadline in seconds, covering all retries.
+        **kwargs: Parameters passed to the task.
+
+    Returns:
+        nornir.core.task.AggregatedResult: Results keyed by host name, as ``nr.run`` returns.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.monotonic()
+
+    host_results = await asyncio.gather(*[
+        _run_host(nr, task, host, semaphore, timeout, kwargs)
+        for host in nr.inventory.hosts.values()
+    ])
+
+    aggregated = AggregatedResult(task.__name__)
+    for host_name, multi_result in host_results:
+        aggregated[host_name] = multi_result
+
+    elapsed = time.monotonic() - started
+    logging.info(
+        f"Ran {task.__name__} on {len(aggregated)} hosts in {elapsed:.2f}s "
+        f"(concurrency {concurrency})"
+    )
+    return aggregated
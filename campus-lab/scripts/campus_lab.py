@@ -0,0 +1,49 @@
+"""Runs the lab scripts as subcommands of one entry point, e.g. campus_lab.py push --diff."""
+
+import argparse
+import asyncio
+import importlib
+import sys
+
+# Subcommand: (script module, help). A script, and with it Nornir, Netmiko, NAPALM
+# or pysnmp, is only imported once its subcommand runs.
+COMMANDS = {
+    "test": ("test_connection", "Check reachability and interface status"),
+    "push": ("push_configs", "Push the intended configurations"),
+    "fetch": ("fetch_configs", "Fetch and archive the running configurations"),
+    "snmp-enable": ("enable_snmp", "Configure SNMP from the platform templates"),
+    "snmp-get": ("snmp-get", "Poll sysDescr over SNMP"),
+    "workflow": ("workflow", "Run test, push, SNMP and fetch on pooled connections"),
+    "index": ("config_index", "Query the index of fetched and intended configs"),
+    "archive": ("config_archive", "List or show archived configurations"),
+}
+
+
+def load(command):
+    """Imports the script of a subcommand and returns it."""
+    return importlib.import_module(COMMANDS[command][0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n"
+        + "\n".join(f"  {name:<13}{text}" for name, (_, text) in COMMANDS.items())
+        + "\n\nRun 'campus_lab.py <command> --help' for the options of a command.",
+    )
+    parser.add_argument("command", choices=COMMANDS, metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    script = load(args.command)
+    # The scripts parse sys.argv themselves
+    sys.argv = [f"{parser.prog} {args.command}", *args.args]
+    if hasattr(script, "main_async"):
+        asyncio.run(script.main_async())
+    else:
+        script.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Nornir inventory plugin building the inventory straight from the containerlab topology."""
+
+import hashlib
+import logging
+import os
+import pickle
+
+import yaml
+from nornir.core.inventory import (
+    Defaults,
+    Group,
+    Groups,
+    Hosts,
+    Inventory,
+    ParentGroups,
+)
+
+from lab_runner import LabHost
+
+# Bump when the compiled layout changes so old caches are rebuilt
+CACHE_VERSION = 2
+
+# Environment variables setting the login credentials of every host
+USERNAME_ENV = "CAMPUS_LAB_USERNAME"
+PASSWORD_ENV = "CAMPUS_LAB_PASSWORD"
+
+# Fallback when neither the environment nor defaults.yaml set credentials: the
+# factory login of the images each kind boots, which containerlab leaves in place
+DEFAULT_CREDENTIALS = {
+    "cisco_iol": ("admin", "admin"),
+    "arista_ceos": ("admin", "admin"),
+}
+
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def compile_topology(topology):
+    """
+    Turns a parsed containerlab topology into plain inventory dictionaries.
+
+    Like containerlab, a node's kind comes from the node, then its group, then the
+    topology defaults. Hosts are named after the nodes and belong to their
+    containerlab group. They use the node's mgmt-ipv4 address, or for nodes that get
+    theirs from DHCP, the container name containerlab registers in /etc/hosts
+    ("clab-<lab>-<node>" with the default prefix).
+
+    Args:
+        topology (dict): The parsed lab.clab.yaml.
+
+    Returns:
+        dict: {"groups": {name: {...}}, "hosts": {name: {...}}} ready for Nornir.
+    """
+    section = topology.get("topology") or {}
+    defaults = section.get("defaults") or {}
+    clab_groups = section.get("groups") or {}
+    lab_name = topology.get("name")
+    prefix = topology.get("prefix", "clab")
+
+    groups = {
+        name: {"data": {"kind": group.get("kind"), "image": group.get("image")}}
+        for name, group in clab_groups.items()
+    }
+    hosts = {}
+    for name, node in (section.get("nodes") or {}).items():
+        node = node or {}
+        group_name = node.get("group")
+        group = clab_groups.get(group_name) or {}
+        kind = node.get("kind") or group.get("kind") or defaults.get("kind")
+        image = node.get("image") or group.get("image") or defaults.get("image")
+        hostname = node.get("mgmt-ipv4")
+        if hostname is None:
+            if prefix == "":
+                hostname = name
+            elif prefix == "__lab-name":
+                hostname = f"{lab_name}-{name}"
+            else:
+                hostname = f"{prefix}-{lab_name}-{name}"
+            logging.warning(
+                f"{name} has no mgmt-ipv4 in the topology, using its container name "
+                f"{hostname}"
+            )
+        hosts[name] = {
+            "hostname": hostname,
+            "platform": kind,
+            "groups": [group_name] if group_name in groups else [],
+            "data": {"kind": kind, "image": image},
+        }
+    return {"groups": groups, "hosts": hosts}
+
+
+class ClabInventory:
+    """
+    Reads lab.clab.yaml (groups, kinds, mgmt-ipv4) directly, so the scripts work
+    without the nornir-simple-inventory.yml that containerlab generates on deploy.
+
+    The compiled inventory is pickled next to the topology. The cache is reused while
+    the topology file's modification time and size are unchanged; if they changed
+    but its SHA-256 did not (e.g. after a checkout), the cache is still reused and
+    only its stamp is refreshed, so the YAML is parsed only when the lab changes.
+
+    Login credentials come from the CAMPUS_LAB_USERNAME and CAMPUS_LAB_PASSWORD
+    environment variables, then from the "username" and "password" keys of a Nornir
+    defaults.yaml next to the topology, and only then from DEFAULT_CREDENTIALS for
+    the host's kind. They are read on every load and never cached.
+
+    Args:
+        topology_file (str): The containerlab topology file.
+        cache_file (str, optional): Where the compiled inventory is cached; defaults
+                                    to ".<topology file name>.inventory.pickle" next
+                                    to the topology.
+        defaults_file (str, optional): Nornir defaults file; defaults to
+                                       "defaults.yaml" next to the topology.
+    """
+
+    def __init__(
+        self, topology_file="lab.clab.yaml", cache_file=None, defaults_file=None
+    ):
+        self.topology_file = topology_file
+        directory, name = os.path.split(topology_file)
+        if cache_file is None:
+            cache_file = os.path.join(directory, f".{name}.inventory.pickle")
+        self.cache_file = cache_file
+        if defaults_file is None:
+            defaults_file = os.path.join(directory, "defaults.yaml")
+        self.defaults_file = defaults_file
+
+    def credentials(self):
+        """
+        Returns the (username, password) set by the environment or defaults.yaml.
+
+        Either is None when neither sets it, and the host's kind decides.
+        """
+        defaults = {}
+        if os.path.exists(self.defaults_file):
+            with open(self.defaults_file) as f:
+                defaults = yaml.load(f, Loader=YamlLoader) or {}
+        return (
+            os.environ.get(USERNAME_ENV) or defaults.get("username"),
+            os.environ.get(PASSWORD_ENV) or defaults.get("password"),
+        )
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_file, "rb") as f:
+                cache = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+            return None
+        return cache
+
+    def _write_cache(self, cache):
+        tmp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_file, "wb") as f:
+                pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logging.warning(f"Could not write inventory cache {self.cache_file}: {e}")
+
+    def compiled(self):
+        """Returns the compiled inventory dictionaries, from the cache when valid."""
+        stat = os.stat(self.topology_file)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        cache = self._read_cache()
+        if cache is not None and cache["stamp"] == stamp:
+            return cache["inventory"]
+
+        with open(self.topology_file, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if cache is not None and cache["sha256"] == digest:
+            inventory = cache["inventory"]
+        else:
+            logging.info(f"Compiling inventory from {self.topology_file}")
+            inventory = compile_topology(yaml.load(raw, Loader=YamlLoader) or {})
+        self._write_cache({
+            "version": CACHE_VERSION,
+            "stamp": stamp,
+            "sha256": digest,
+            "inventory": inventory,
+        })
+        return inventory
+
+    def load(self):
+        compiled = self.compiled()
+        username, password = self.credentials()
+        defaults = Defaults()
+        groups = Groups({
+            name: Group(name=name, data=dict(group["data"]), defaults=defaults)
+            for name, group in compiled["groups"].items()
+        })
+        hosts = Hosts()
+        for name, host in compiled["hosts"].items():
+            kind_username, kind_password = DEFAULT_CREDENTIALS.get(
+                host["platform"], (None, None)
+            )
+            hosts[name] = LabHost(
+                name=name,
+                hostname=host["hostname"],
+                username=username or kind_username,
+                password=password or kind_password,
+                platform=host["platform"],
+                groups=ParentGroups([groups[group] for group in host["groups"]]),
+                data=dict(host["data"]),
+                defaults=defaults,
+            )
+        return Inventory(hosts=hosts, groups=groups, defaults=defaults)
@@ -0,0 +1,130 @@
+"""Parses show command output with ntc-templates, compiling each TextFSM template once."""
+
+import functools
+import logging
+import os
+import threading
+
+import textfsm
+
+# Compiled templates per worker thread; a TextFSM object keeps parsing state
+_compiled = threading.local()
+
+
+@functools.lru_cache(maxsize=None)
+def template_dir():
+    """
+    Returns the ntc-templates directory: $NTC_TEMPLATES_DIR, as ntc-templates itself
+    honours it, else the templates shipped with the package.
+    """
+    directory = os.environ.get("NTC_TEMPLATES_DIR")
+    if directory is None:
+        import ntc_templates
+
+        directory = os.path.join(os.path.dirname(ntc_templates.__file__), "templates")
+    return directory
+
+
+@functools.lru_cache(maxsize=None)
+def cli_table():
+    """Returns the ntc-templates index, read and compiled once per process."""
+    from textfsm import clitable
+
+    return clitable.CliTable("index", template_dir())
+
+
+@functools.lru_cache(maxsize=None)
+def template_file(platform, command):
+    """
+    Returns the ntc-templates TextFSM template for a command, or None.
+
+    Looked up in the ntc-templates index once per (platform, command); the index
+    accepts abbreviated commands such as "sh ip int br".
+    """
+    index = cli_table().index
+    row = index.GetRowMatch({"Command": command, "Platform": platform})
+    if not row:
+        return None
+    # Commands combining several templates are rare; only the first one is used
+    template_name = index.index[row]["Template"].split(":")[0]
+    return os.path.join(template_dir(), template_name)
+
+
+def _fsm(path):
+    cache = _compiled.__dict__
+    fsm = cache.get(path)
+    if fsm is None:
+        with open(path) as f:
+            fsm = cache[path] = textfsm.TextFSM(f)
+    fsm.Reset()
+    return fsm
+
+
+def parse_rows(platform, command, output):
+    """
+    Parses the output of a show command into a header and rows.
+
+    This compact form is what cpu_pool workers return: the field names travel once
+    per command instead of once per record.
+
+    Args:
+        platform (str): The Netmiko platform the command ran on (e.g., "cisco_ios").
+        command (str): The command that was run.
+        output (str): The command output.
+
+    Returns:
+        tuple or None: (field names in lower case, list of value lists), or None if
+                       there is no template for the command or parsing failed.
+    """
+    path = template_file(platform, command)
+    if path is None:
+        return None
+    try:
+        fsm = _fsm(path)
+        rows = fsm.ParseText(output)
+    except textfsm.TextFSMError as e:
+        logging.warning(f"Could not parse '{command}' output for {platform}: {e}")
+        return None
+    return [name.lower() for name in fsm.header], rows
+
+
+def parse_many(platform, outputs):
+    """
+    Parses the outputs of several show commands of one device.
+
+    Meant for cpu_pool.run(), so a device's outputs travel to a worker and back in
+    one round trip instead of one per command.
+
+    Args:
+        platform (str): The Netmiko platform the commands ran on.
+        outputs (list): (command, output) pairs.
+
+    Returns:
+        list: The parse_rows() result of each pair, in order.
+    """
+    return [parse_rows(platform, command, output) for command, output in outputs]
+
+
+def records(parsed):
+    """Returns the records of a parse_rows() result as dicts, or None."""
+    if parsed is None:
+        return None
+    header, rows = parsed
+    return [dict(zip(header, row)) for row in rows]
+
+
+def parse_output(platform, command, output):
+    """
+    Parses the output of a show command into records.
+
+    Args:
+        platform (str): The Netmiko platform the command ran on (e.g., "cisco_ios").
+        command (str): The command that was run.
+        output (str): The command output.
+
+    Returns:
+        list or None: One dict per record with lower-case field names, as
+                      ntc_templates.parse.parse_output returns them, or None if
+                      there is no template for the command or parsing failed.
+    """
+    return records(parse_rows(platform, command, output))
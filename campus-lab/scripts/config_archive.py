@@ -0,0 +1,313 @@
+"""Deduplicated, compressed history of fetched device configurations."""
+
+import argparse
+import bisect
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, zlib is always available
+    zstandard = None
+
+import cpu_pool
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# One-byte codec marker at the start of every stored chunk
+CODEC_ZSTD = b"Z"
+CODEC_ZLIB = b"z"
+
+
+def _compress(data):
+    if zstandard is not None:
+        return CODEC_ZSTD + zstandard.ZstdCompressor(level=10).compress(data)
+    return CODEC_ZLIB + zlib.compress(data, 9)
+
+
+def _decompress(blob):
+    codec, payload = blob[:1], blob[1:]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this archive")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    return zlib.decompress(payload)
+
+
+# Index record of a stanza in its host's pack: digest, offset and length of the
+# compressed block holding it, offset and length of the stanza in that block
+INDEX_RECORD = struct.Struct("<16sQIII")
+DIGEST_SIZE = 16
+
+
+def iter_stanzas(lines):
+    """
+    Groups configuration lines into top-level stanzas.
+
+    A stanza starts at every non-indented line other than a "!" separator and carries
+    its indented children, so an interface block is one chunk and stays identical
+    across snapshots. Lines are kept exactly as given, line endings included, so the
+    stanzas join back into the original text.
+
+    Args:
+        lines (iterable): Configuration lines with their line endings, as iterating
+                          over a file or str.splitlines(keepends=True) gives them.
+
+    Yields:
+        str: The text of each stanza.
+    """
+    stanza = []
+    for line in lines:
+        if stanza and line[:1] not in ("", " ", "\t", "!", "\r", "\n"):
+            yield "".join(stanza)
+            stanza = []
+        stanza.append(line)
+    if stanza:
+        yield "".join(stanza)
+
+
+def pack_stanzas(config, known=frozenset()):
+    """
+    Splits a configuration into stanzas and compresses the ones not in ``known``.
+
+    Splitting, hashing and compressing is the CPU-heavy part of archiving, so
+    ConfigArchive.store() runs this in a cpu_pool worker; only the config text, the
+    digests and one compressed block cross processes.
+
+    Args:
+        config (str or iterable): The configuration text or its lines.
+        known (frozenset): Digests of the stanzas the host's pack already holds.
+
+    Returns:
+        tuple: (digests, new_digests, new_lengths, block): the digest of each stanza
+               in order, the digests and byte lengths of the stanzas new to the pack,
+               and those stanzas compressed together (b"" if there are none).
+    """
+    if isinstance(config, str):
+        config = config.splitlines(keepends=True)
+    digests, new_digests, new_stanzas = [], [], []
+    seen = set(known)
+    for stanza in iter_stanzas(config):
+        data = stanza.encode()
+        digest = hashlib.sha256(data).digest()[:DIGEST_SIZE]
+        digests.append(digest)
+        if digest not in seen:
+            seen.add(digest)
+            new_digests.append(digest)
+            new_stanzas.append(data)
+    block = _compress(b"".join(new_stanzas)) if new_stanzas else b""
+    return digests, new_digests, [len(data) for data in new_stanzas], block
+
+
+def _runs(ids):
+    # [3, 4, 5, 9] -> [[3, 3], [9, 1]]: snapshots mostly repeat the previous one's
+    # stanzas in order, so the manifest grows with the changes, not the config size
+    runs = []
+    for stanza_id in ids:
+        if runs and runs[-1][0] + runs[-1][1] == stanza_id:
+            runs[-1][1] += 1
+        else:
+            runs.append([stanza_id, 1])
+    return runs
+
+
+class ConfigArchive:
+    """
+    Stores configuration snapshots as deduplicated, compressed stanzas in per-host packs.
+
+    Each host has three append-only files in ``hosts/``:
+
+    - ``<host>.pack``: compressed blocks, one per snapshot that brought new stanzas,
+      holding only those stanzas;
+    - ``<host>.idx``: one fixed-size record per stanza ever seen (a 16-byte SHA-256
+      prefix and where the stanza is in the pack), a stanza's id is its record number;
+    - ``<host>.jsonl``: one line per change, the snapshot timestamp and its stanza ids
+      as [first id, count] runs.
+
+    A stanza is stored once per host however many snapshots contain it, and a
+    snapshot changing one interface adds one small block and a few runs. Snapshots
+    identical to the previous one are not recorded. retrieve() returns the stored
+    text byte for byte, line endings and a missing final newline included.
+
+    A host's manifest and index are read on first use and then kept in memory and
+    appended to, so one ConfigArchive should be the only writer of its directory.
+
+    Args:
+        root (str): Directory holding the archive.
+    """
+
+    def __init__(self, root="config_archive"):
+        self.root = root
+        self._hosts = os.path.join(root, "hosts")
+        self._lock = threading.Lock()
+        self._host_locks = {}
+        # Host name -> its manifest, index and stanza ids, read once and appended to
+        self._loaded = {}
+        os.makedirs(self._hosts, exist_ok=True)
+
+    def _path(self, host_name, extension):
+        return os.path.join(self._hosts, f"{host_name}.{extension}")
+
+    def _read_manifest(self, host_name):
+        path = self._path(host_name, "jsonl")
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _read_index(self, host_name):
+        path = self._path(host_name, "idx")
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            data = f.read()
+        # A record cut short by an interrupted write is ignored
+        usable = len(data) - len(data) % INDEX_RECORD.size
+        return list(INDEX_RECORD.iter_unpack(data[:usable]))
+
+    def _host_lock(self, host_name):
+        with self._lock:
+            return self._host_locks.setdefault(host_name, threading.Lock())
+
+    def _load(self, host_name):
+        # Called with the host lock held
+        loaded = self._loaded.get(host_name)
+        if loaded is None:
+            index = self._read_index(host_name)
+            loaded = self._loaded[host_name] = {
+                "manifest": self._read_manifest(host_name),
+                "index": index,
+                "ids": {record[0]: stanza_id for stanza_id, record in enumerate(index)},
+            }
+        return loaded
+
+    def store(self, host_name, config, timestamp=None):
+        """
+        Archives a configuration snapshot.
+
+        Args:
+            host_name (str): The host the configuration belongs to.
+            config (str or iterable): The configuration text, or an iterable of lines
+                                      with their line endings (e.g. an open file) so
+                                      large configs can be streamed in.
+            timestamp (float, optional): Snapshot time as a Unix timestamp; now if None.
+
+        Returns:
+            bool: True if a new snapshot was recorded, False if it matched the last one.
+        """
+        with self._host_lock(host_name):
+            loaded = self._load(host_name)
+            index, ids = loaded["index"], loaded["ids"]
+            if isinstance(config, str):
+                packed = cpu_pool.run(pack_stanzas, config, frozenset(ids))
+            else:
+                # A stream of lines cannot be sent to a worker without reading it first
+                packed = pack_stanzas(config, frozenset(ids))
+            digests, new_digests, new_lengths, block = packed
+
+            if block:
+                pack_path = self._path(host_name, "pack")
+                with open(pack_path, "ab") as f:
+                    offset = f.tell()
+                    f.write(block)
+                records = []
+                start = 0
+                for digest, length in zip(new_digests, new_lengths):
+                    ids[digest] = len(index) + len(records)
+                    records.append((digest, offset, len(block), start, length))
+                    start += length
+                with open(self._path(host_name, "idx"), "ab") as f:
+                    f.write(b"".join(INDEX_RECORD.pack(*record) for record in records))
+                index.extend(records)
+
+            runs = _runs(ids[digest] for digest in digests)
+            manifest = loaded["manifest"]
+            if manifest and manifest[-1]["stanzas"] == runs:
+                return False
+            entry = {"ts": time.time() if timestamp is None else timestamp}
+            entry["stanzas"] = runs
+            with open(self._path(host_name, "jsonl"), "a") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            manifest.append(entry)
+        return True
+
+    def snapshots(self, host_name):
+        """Returns the timestamps of every recorded snapshot of a host, oldest first."""
+        with self._host_lock(host_name):
+            return [entry["ts"] for entry in self._load(host_name)["manifest"]]
+
+    def retrieve(self, host_name, timestamp=None):
+        """
+        Returns the configuration a host had at a given time.
+
+        Args:
+            host_name (str): The host to look up.
+            timestamp (float, optional): Unix timestamp; the latest snapshot if None.
+
+        Returns:
+            str or None: The configuration exactly as stored, or None if nothing was
+                         archived by then.
+        """
+        with self._host_lock(host_name):
+            loaded = self._load(host_name)
+            manifest, index = list(loaded["manifest"]), list(loaded["index"])
+        if timestamp is None:
+            position = len(manifest)
+        else:
+            position = bisect.bisect_right(
+                [entry["ts"] for entry in manifest], timestamp
+            )
+        if position == 0:
+            return None
+        entry = manifest[position - 1]
+
+        parts = []
+        blocks = {}
+        with open(self._path(host_name, "pack"), "rb") as f:
+            for first, count in entry["stanzas"]:
+                for _, offset, size, start, length in index[first : first + count]:
+                    if offset not in blocks:
+                        f.seek(offset)
+                        blocks[offset] = _decompress(f.read(size))
+                    parts.append(blocks[offset][start : start + length])
+        return b"".join(parts).decode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--root", default="config_archive", help="Archive directory")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    list_parser = subparsers.add_parser("list", help="List snapshots of a host")
+    list_parser.add_argument("host")
+    show_parser = subparsers.add_parser("show", help="Print a host configuration")
+    show_parser.add_argument("host")
+    show_parser.add_argument(
+        "--at", help="ISO timestamp, e.g. 2025-01-31T12:00 (default: latest)"
+    )
+    args = parser.parse_args()
+
+    archive = ConfigArchive(args.root)
+    if args.command == "list":
+        for timestamp in archive.snapshots(args.host):
+            print(datetime.fromtimestamp(timestamp).isoformat(timespec="seconds"))
+    else:
+        timestamp = datetime.fromisoformat(args.at).timestamp() if args.at else None
+        config = archive.retrieve(args.host, timestamp)
+        if config is None:
+            logging.error(f"No archived configuration for {args.host} at that time.")
+        else:
+            print(config, end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Hierarchical parsing and diffing of IOS/EOS style configurations."""
+
+# Lines the devices print around the configuration that are not commands
+IGNORED_PREFIXES = (
+    "!",
+    "Building configuration",
+    "Current configuration",
+    "Last configuration change",
+    "NVRAM config last updated",
+)
+
+# Exec/mode commands found in the config files that are not configuration
+IGNORED_COMMANDS = ("end", "exit", "write", "write memory", "copy running-config")
+
+# Top-level commands that enter a configuration sub-mode
+MODE_COMMANDS = (
+    "interface ",
+    "router ",
+    "vlan ",
+    "line ",
+    "management ",
+    "ip access-list ",
+    "ipv6 access-list ",
+    "route-map ",
+    "class-map ",
+    "policy-map ",
+    "vrf definition ",
+    "vrf instance ",
+    "ip vrf ",
+    "key chain ",
+    "control-plane",
+    "daemon ",
+)
+
+# Defaults the running configuration only shows when they are not in effect
+IMPLIED_DEFAULTS = {"no shutdown": "shutdown"}
+
+
+def parse_config(text):
+    """
+    Parses a configuration into a tree of stanzas.
+
+    Indented lines (as in "show running-config" output) are nested by indentation.
+    Flat command files such as configs/*.ios are nested by mode instead: lines after
+    a mode command like "interface ..." belong to it until the next "!", "exit" or
+    top-level mode command.
+
+    Args:
+        text (str): The configuration text.
+
+    Returns:
+        dict: Each top-level command mapped to a dict of its child commands, nested
+              the same way. Comments, blank lines and exec commands such as "end"
+              or "write memory" are dropped.
+    """
+    root = {}
+    # (indent, children) of every open stanza, outermost first
+    stack = [(-1, root)]
+    # Children of the flat mode stanza lines without indentation belong to
+    mode_children = None
+
+    for raw_line in text.splitlines():
+        line = raw_line.rstrip()
+        command = " ".join(line.split())
+        if not command or command.startswith(IGNORED_PREFIXES):
+            mode_children = None if command.startswith("!") else mode_children
+            continue
+        if command in IGNORED_COMMANDS:
+            mode_children = None
+            continue
+        indent = len(line) - len(line.lstrip())
+
+        if (
+            indent == 0
+            and mode_children is not None
+            and not command.startswith(MODE_COMMANDS)
+        ):
+            mode_children.setdefault(command, {})
+            continue
+
+        while indent <= stack[-1][0]:
+            stack.pop()
+        children = stack[-1][1].setdefault(command, {})
+        stack.append((indent, children))
+        if indent == 0:
+            mode_children = children if command.startswith(MODE_COMMANDS) else None
+
+    return root
+
+
+def diff_config(intended, running):
+    """
+    Returns the commands needed to bring a running configuration to the intended one.
+
+    Stanzas missing from the running configuration are pushed whole; stanzas present
+    on both sides only get their missing child commands, preceded by the parent
+    command to enter the right mode. Commands present only in the running
+    configuration are left alone, no "no ..." commands are generated. Defaults that
+    devices omit from "show running-config" (e.g. "no shutdown") count as present
+    unless the running configuration holds their opposite.
+
+    Args:
+        intended (dict): The parse_config tree of the intended configuration.
+        running (dict): The parse_config tree of the running configuration.
+
+    Returns:
+        list: Configuration commands, indented one space per level.
+    """
+    commands = []
+    _diff_stanza(intended, running, 0, commands)
+    return commands
+
+
+def diff_text(intended_text, running_text):
+    """
+    Returns diff_config() of two configuration texts.
+
+    Parsing dominates the cost of a diff, so this is the function cpu_pool runs in
+    a worker: only the two texts and the resulting commands cross processes.
+    """
+    return diff_config(parse_config(intended_text), parse_config(running_text))
+
+
+def _diff_stanza(intended, running, depth, commands):
+    for command, children in intended.items():
+        if command in IMPLIED_DEFAULTS and IMPLIED_DEFAULTS[command] not in running:
+            continue
+        if command not in running:
+            commands.append(" " * depth + command)
+            _flatten(children, depth + 1, commands)
+            continue
+        child_commands = []
+        _diff_stanza(children, running[command], depth + 1, child_commands)
+        if child_commands:
+            commands.append(" " * depth + command)
+            commands.extend(child_commands)
+
+
+def _flatten(tree, depth, commands):
+    for command, children in tree.items():
+        commands.append(" " * depth + command)
+        _flatten(children, depth + 1, commands)
@@ -0,0 +1,329 @@
+"""SQLite index of fetched and intended configurations for fleet-wide queries."""
+
+import argparse
+import logging
+import os
+import sqlite3
+import time
+
+from config_diff import parse_config
+from state_store import config_hash
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+DEFAULT_INDEX_FILE = ".config_index.db"
+
+# Indexed directories, by the kind of configuration they hold
+DEFAULT_SOURCES = {"running": "fetched_configs", "intended": "configs"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    host TEXT NOT NULL,
+    source TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    parent_id INTEGER,
+    depth INTEGER NOT NULL,
+    parents TEXT NOT NULL,
+    command TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nodes_file ON nodes (file_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS nodes_fts USING fts5 (
+    command, content = 'nodes', content_rowid = 'id'
+);
+"""
+
+# Separator of the parent commands shown for a match
+PATH_SEPARATOR = " > "
+
+
+def _phrase(text):
+    # Match the words of text in order, as one FTS5 phrase
+    return '"' + text.replace('"', '""') + '"'
+
+
+class ConfigIndex:
+    """
+    Full-text index of every command of every configuration file, with its stanza.
+
+    Each file is parsed once with config_diff.parse_config into its stanza tree, and
+    every command is stored with its parent command, so fleet-wide questions such as
+    "which interfaces have switchport access vlan 20" or "which hosts lack an
+    snmp-server community ... RO 99 line" are answered from the FTS5 index in
+    milliseconds instead of re-reading and re-parsing the files.
+
+    update() only re-parses files whose size or modification time changed and whose
+    config_hash differs from the indexed one, and drops files that were removed.
+    Hosts are keyed by the file name without extension, lower-cased, so the fetched
+    RTR.cfg and the intended rtr.ios are the same host.
+
+    Args:
+        path (str): The SQLite database file.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_FILE):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _insert_tree(self, file_id, tree):
+        # Ids are assigned here so a whole file goes in with one executemany
+        next_id = self.db.execute(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM nodes"
+        ).fetchone()[0]
+        rows = []
+        stack = [(tree, None, ())]
+        while stack:
+            children, parent_id, parents = stack.pop()
+            for command, grandchildren in children.items():
+                rows.append((
+                    next_id,
+                    file_id,
+                    parent_id,
+                    len(parents),
+                    PATH_SEPARATOR.join(parents),
+                    command,
+                ))
+                if grandchildren:
+                    stack.append((grandchildren, next_id, (*parents, command)))
+                next_id += 1
+        self.db.executemany(
+            "INSERT INTO nodes (id, file_id, parent_id, depth, parents, command) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        # Filled per file rather than by triggers: one statement per file is about
+        # four times faster than one full-text insert per command
+        self.db.execute(
+            "INSERT INTO nodes_fts (rowid, command) "
+            "SELECT id, command FROM nodes WHERE file_id = ?",
+            (file_id,),
+        )
+
+    def _delete_nodes(self, file_id):
+        self.db.execute(
+            "INSERT INTO nodes_fts (nodes_fts, rowid, command) "
+            "SELECT 'delete', id, command FROM nodes WHERE file_id = ?",
+            (file_id,),
+        )
+        self.db.execute("DELETE FROM nodes WHERE file_id = ?", (file_id,))
+
+    def _index_file(self, file_id, path, source, stat, digest, text):
+        # fetch_configs saves <HOST>.cfg under the inventory name, configs/ holds
+        # <host>.ios, so both sources of a host must share one key
+        host = os.path.splitext(os.path.basename(path))[0].lower()
+        values = (host, source, stat.st_mtime_ns, stat.st_size, digest)
+        if file_id:
+            self._delete_nodes(file_id)
+            self.db.execute(
+                "UPDATE files SET host = ?, source = ?, mtime_ns = ?, size = ?, "
+                "hash = ? WHERE id = ?",
+                (*values, file_id),
+            )
+        else:
+            file_id = self.db.execute(
+                "INSERT INTO files (host, source, mtime_ns, size, hash, path) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (*values, path),
+            ).lastrowid
+        self._insert_tree(file_id, parse_config(text))
+
+    def update(self, sources=None):
+        """
+        Brings the index up to date with the configuration directories.
+
+        Args:
+            sources (dict, optional): Source name mapped to a directory of
+                                      configuration files named after their host.
+                                      Defaults to DEFAULT_SOURCES.
+
+        Returns:
+            dict: How many files were "indexed", "unchanged" and "removed".
+        """
+        if sources is None:
+            sources = DEFAULT_SOURCES
+        counts = {"indexed": 0, "unchanged": 0, "removed": 0}
+        indexed = {
+            path: (file_id, mtime_ns, size, digest)
+            for file_id, path, mtime_ns, size, digest in self.db.execute(
+                "SELECT id, path, mtime_ns, size, hash FROM files"
+            )
+        }
+        seen = set()
+
+        with self.db:
+            for source, directory in sources.items():
+                if not os.path.isdir(directory):
+                    continue
+                for entry in os.scandir(directory):
+                    if entry.name.startswith(".") or not entry.is_file():
+                        continue
+                    path = entry.path
+                    seen.add(path)
+                    stat = entry.stat()
+                    known = indexed.get(path)
+                    if known and known[1:3] == (stat.st_mtime_ns, stat.st_size):
+                        counts["unchanged"] += 1
+                        continue
+
+                    with open(path) as f:
+                        text = f.read()
+                    digest = config_hash(text)
+                    if known and known[3] == digest:
+                        # Touched or only volatile header lines changed
+                        self.db.execute(
+                            "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+                            (stat.st_mtime_ns, stat.st_size, known[0]),
+                        )
+                        counts["unchanged"] += 1
+                        continue
+
+                    self._index_file(
+                        known and known[0], path, source, stat, digest, text
+                    )
+                    counts["indexed"] += 1
+
+            for path in indexed.keys() - seen:
+                file_id = indexed[path][0]
+                self._delete_nodes(file_id)
+                self.db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                counts["removed"] += 1
+        return counts
+
+    def find(self, text, under=None, source=None):
+        """
+        Returns the commands containing the words of ``text``, in that order.
+
+        Words are matched whole, so "vlan 20" matches "switchport access vlan 20"
+        but not "vlan 200".
+
+        Args:
+            text (str): The words to look for.
+            under (str, optional): Only commands whose parent command contains these
+                                   words, e.g. "interface".
+            source (str, optional): Only files of this source, e.g. "running".
+
+        Returns:
+            list: One dict per match with "host", "source", "parents" (the parent
+                  commands joined by " > ") and "command", sorted by host.
+        """
+        query = (
+            "SELECT files.host, files.source, nodes.parents, nodes.command "
+            "FROM nodes_fts JOIN nodes ON nodes.id = nodes_fts.rowid "
+            "JOIN files ON files.id = nodes.file_id "
+        )
+        params = [_phrase(text)]
+        conditions = ["nodes_fts MATCH ?"]
+        if under is not None:
+            # Parents are nodes too, look them up in the same index
+            conditions.append(
+                "nodes.parent_id IN (SELECT rowid FROM nodes_fts WHERE nodes_fts MATCH ?)"
+            )
+            params.append(_phrase(under))
+        if source is not None:
+            conditions.append("files.source = ?")
+            params.append(source)
+        query += "WHERE " + " AND ".join(conditions)
+        query += " ORDER BY files.host, files.source, nodes.id"
+        return [
+            {
+                "host": host,
+                "source": file_source,
+                "parents": parents,
+                "command": command,
+            }
+            for host, file_source, parents, command in self.db.execute(query, params)
+        ]
+
+    def missing(self, text, under=None, source=None):
+        """
+        Returns the hosts having no command that find() would match.
+
+        Args:
+            text (str): The words to look for.
+            under (str, optional): Only count commands under a matching parent.
+            source (str, optional): Only files of this source.
+
+        Returns:
+            list: (host, source) pairs, sorted, with lower-case host names.
+        """
+        found = {
+            (match["host"], match["source"]) for match in self.find(text, under, source)
+        }
+        query = "SELECT host, source FROM files"
+        params = []
+        if source is not None:
+            query += " WHERE source = ?"
+            params.append(source)
+        return sorted(set(self.db.execute(query, params)) - found)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--index", default=DEFAULT_INDEX_FILE, help="Index database")
+    parser.add_argument(
+        "--source",
+        choices=sorted(DEFAULT_SOURCES),
+        help="Only query running (fetched_configs) or intended (configs) files",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("update", help="Index new and changed configuration files")
+    find_parser = subparsers.add_parser(
+        "find", help='Print commands containing words, e.g. "switchport access vlan 20"'
+    )
+    missing_parser = subparsers.add_parser(
+        "missing", help="Print hosts without a command containing words"
+    )
+    for query_parser in (find_parser, missing_parser):
+        query_parser.add_argument("text")
+        query_parser.add_argument(
+            "--under", help='Only commands in a stanza matching words, e.g. "interface"'
+        )
+    args = parser.parse_args()
+
+    index = ConfigIndex(args.index)
+    try:
+        start = time.perf_counter()
+        counts = index.update()
+        logging.info(
+            f"Index updated in {(time.perf_counter() - start) * 1000:.1f} ms: "
+            f"{counts['indexed']} files indexed, {counts['unchanged']} unchanged, "
+            f"{counts['removed']} removed"
+        )
+        if args.command == "update":
+            return
+
+        start = time.perf_counter()
+        if args.command == "find":
+            matches = index.find(args.text, args.under, args.source)
+            for match in matches:
+                path = PATH_SEPARATOR.join(
+                    part for part in (match["parents"], match["command"]) if part
+                )
+                print(f"{match['host']} ({match['source']}): {path}")
+        else:
+            matches = index.missing(args.text, args.under, args.source)
+            for host, source in matches:
+                print(f"{host} ({source})")
+        logging.info(
+            f"{len(matches)} results in {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Array-backed counter store computing per-second rates between SNMP polls."""
+
+import numpy as np
+
+# sysUpTime is reported in hundredths of a second
+TICKS_PER_SECOND = 100
+COUNTER32_MASK = np.uint64(0xFFFFFFFF)
+
+
+class CounterRates:
+    """
+    Keeps the previous sample of every (host, ifIndex) row and turns new samples into rates.
+
+    Samples live in preallocated NumPy arrays (one row per (host, ifIndex), one column
+    per counter), so a poll cycle is a handful of vectorised operations regardless of
+    how many interfaces it covers. Rows are found by looking up a packed
+    (host id, ifIndex) uint64 key in a sorted key array with np.searchsorted; the only
+    Python objects kept are the host ids. Counter32 and Counter64 wraps are handled
+    with modular arithmetic; a sysUpTime that went backwards (agent restart, counters
+    reset) or a first sample yields NaN instead of a bogus rate.
+
+    Every counter keeps the sysUpTime of its own last sample, so a counter missing
+    from one poll (masked in ``samples``) gets NaN for that poll and its next rate is
+    computed against the last value actually received.
+
+    Args:
+        columns (list): Counter names, one array column each.
+        widths (dict, optional): Counter name mapped to 32 or 64 bits. Defaults to 64.
+        capacity (int): Initial number of rows; the store grows as needed.
+    """
+
+    def __init__(self, columns, widths=None, capacity=4096):
+        widths = widths or {}
+        self.columns = list(columns)
+        self._is_counter32 = np.array([
+            widths.get(column, 64) == 32 for column in self.columns
+        ])
+        self._host_ids = {}
+        # Sorted (host id << 32 | ifIndex) keys and the storage row of each
+        self._keys = np.empty(0, dtype=np.uint64)
+        self._key_rows = np.empty(0, dtype=np.intp)
+        shape = (capacity, len(self.columns))
+        self._values = np.zeros(shape, dtype=np.uint64)
+        self._uptimes = np.zeros(shape, dtype=np.uint64)
+        self._seen = np.zeros(shape, dtype=bool)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _grow(self, size):
+        # Doubling keeps appends amortized, and also works from a capacity of 0
+        capacity = max(size, 2 * len(self._values))
+        extra = ((capacity - len(self._values)), len(self.columns))
+        self._values = np.concatenate([self._values, np.zeros(extra, np.uint64)])
+        self._uptimes = np.concatenate([self._uptimes, np.zeros(extra, np.uint64)])
+        self._seen = np.concatenate([self._seen, np.zeros(extra, dtype=bool)])
+
+    def _row_keys(self, hosts, if_indexes):
+        names, inverse = np.unique(np.asarray(hosts), return_inverse=True)
+        host_ids = np.fromiter(
+            (
+                self._host_ids.setdefault(name, len(self._host_ids))
+                for name in names.tolist()
+            ),
+            dtype=np.uint64,
+            count=len(names),
+        )
+        return (host_ids[inverse.ravel()] << np.uint64(32)) | np.asarray(
+            if_indexes, dtype=np.uint64
+        )
+
+    def _row_indexes(self, keys):
+        positions = np.searchsorted(self._keys, keys)
+        found = positions < len(self._keys)
+        found[found] = self._keys[positions[found]] == keys[found]
+        if not found.all():
+            new_keys = np.unique(keys[~found])
+            first = len(self._keys)
+            if first + len(new_keys) > len(self._values):
+                self._grow(first + len(new_keys))
+            keys_so_far = np.concatenate([self._keys, new_keys])
+            order = np.argsort(keys_so_far, kind="stable")
+            self._keys = keys_so_far[order]
+            self._key_rows = np.concatenate([
+                self._key_rows,
+                np.arange(first, first + len(new_keys), dtype=np.intp),
+            ])[order]
+            positions = np.searchsorted(self._keys, keys)
+        return self._key_rows[positions]
+
+    def update(self, hosts, if_indexes, samples, uptimes):
+        """
+        Stores a poll cycle and returns the per-second rate of every counter.
+
+        Args:
+            hosts (array-like): Host name of each row.
+            if_indexes (array-like): ifIndex of each row.
+            samples (array-like): Counter values, shape (rows, len(columns)); a
+                                  numpy.ma.MaskedArray marks counters missing from
+                                  this poll.
+            uptimes (array-like): sysUpTime (in ticks) at which each row was read.
+
+        Returns:
+            numpy.ndarray: float64 rates with the shape of ``samples``; NaN where no
+                           rate can be computed yet, the counter is missing or the
+                           counters were reset.
+        """
+        samples = np.ma.asarray(samples).reshape(-1, len(self.columns))
+        present = ~np.ma.getmaskarray(samples)
+        values = samples.filled(0).astype(np.uint64)
+        uptimes = np.asarray(uptimes, dtype=np.uint64)[:, np.newaxis]
+        rows = self._row_indexes(self._row_keys(hosts, if_indexes))
+
+        previous = self._values[rows]
+        previous_uptimes = self._uptimes[rows]
+
+        # uint64 subtraction wraps modulo 2**64, masking folds Counter32 wraps
+        deltas = values - previous
+        deltas = np.where(self._is_counter32, deltas & COUNTER32_MASK, deltas)
+
+        continuous = present & self._seen[rows] & (uptimes > previous_uptimes)
+        elapsed = np.where(
+            continuous, (uptimes - previous_uptimes) / TICKS_PER_SECOND, np.nan
+        )
+        rates = deltas / elapsed
+
+        # Missing counters keep their last sample and its sysUpTime
+        self._values[rows] = np.where(present, values, previous)
+        self._uptimes[rows] = np.where(present, uptimes, previous_uptimes)
+        self._seen[rows] |= present
+        return rates
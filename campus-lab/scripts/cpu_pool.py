@@ -0,0 +1,77 @@
+"""Optional process pool for the CPU-heavy steps of large runs: parsing, diffing and rendering."""
+
+import atexit
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+_executor = None
+
+
+def start(processes=None):
+    """
+    Starts the worker processes used by run() and starmap().
+
+    Nornir runs tasks in threads, so Python code parsing, diffing or rendering for
+    thousands of hosts shares a single core.
+    Once started, the helpers below hand that work to worker processes; the calling
+    thread waits without holding the GIL, so network I/O keeps flowing meanwhile.
+    Arguments and results are pickled, so only plain strings, lists, tuples and dicts
+    are passed, never Nornir or pysnmp objects.
+
+    Without start(), or with processes=0, the helpers call the function in place.
+
+    Args:
+        processes (int, optional): Worker processes; defaults to the number of CPUs.
+    """
+    global _executor
+    stop()
+    if processes == 0:
+        return
+    # Workers are started on demand from Nornir threads, forking there is unsafe
+    method = (
+        "forkserver"
+        if "forkserver" in multiprocessing.get_all_start_methods()
+        else "spawn"
+    )
+    processes = processes or os.cpu_count()
+    _executor = ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context(method)
+    )
+    logging.info(f"Parsing, diffing and rendering in {processes} processes")
+
+
+def stop():
+    """Shuts the worker processes down."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+atexit.register(stop)
+
+
+def run(func, *args):
+    """Returns func(*args), computed in a worker process if the pool is started."""
+    if _executor is None:
+        return func(*args)
+    return _executor.submit(func, *args).result()
+
+
+def starmap(func, args_list, chunksize=64):
+    """
+    Returns [func(*args) for args in args_list], spread over the worker processes.
+
+    Args:
+        func (callable): A module-level function.
+        args_list (list): One tuple of arguments per call.
+        chunksize (int): Calls sent to a worker at once, to amortise pickling.
+
+    Returns:
+        list: The results, in order.
+    """
+    if _executor is None:
+        return [func(*args) for args in args_list]
+    return list(_executor.map(func, *zip(*args_list), chunksize=chunksize))
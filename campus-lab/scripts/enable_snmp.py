@@ -1,59 +1,168 @@
-"""Configures SNMP on network devices using Nornir and Netmiko."""
+"""Configures SNMP on network devices from Jinja2 templates using Nornir and Netmiko."""
 
+import argparse
+import functools
 import logging
+import os
 
-from nornir import InitNornir
-from nornir_netmiko.tasks import netmiko_send_config
+import jinja2
 from nornir_utils.plugins.functions import print_result
 
+import cpu_pool
+from lab_nornir import init_nornir
+from metrics import Metrics, connect, span
+from platforms import is_supported
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+TEMPLATE_DIR = "templates"
+
+# Template variables used unless the host or its groups define them
+SNMP_DEFAULTS = {
+    "snmp_community": "public",
+    "snmp_acl": 99,
+    "snmp_managers": ["192.168.122.1"],  # Hosts allowed to poll SNMP
+    "snmp_location": "Lab",
+    "snmp_contact": "admin@example.com",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _environment(template_dir):
+    # One environment per directory, so each template is compiled once per run
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_dir),
+        undefined=jinja2.StrictUndefined,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+
+
+def render_commands(template_dir, template_name, context):
+    """
+    Renders a template into configuration commands, skipping blank lines.
+
+    Takes only picklable arguments, so cpu_pool can run it in a worker process.
+
+    Args:
+        template_dir (str): Directory holding the templates.
+        template_name (str): Template path relative to template_dir.
+        context (dict): The template variables.
+
+    Returns:
+        list: The configuration commands.
+    """
+    template = _environment(template_dir).get_template(template_name)
+    return [line for line in template.render(context).splitlines() if line.strip()]
+
+
+def _context(host):
+    # Plain data only: the Host object itself cannot be sent to a worker process
+    return {
+        **SNMP_DEFAULTS,
+        **host.extended_data(),
+        "host": {
+            "name": host.name,
+            "hostname": host.hostname,
+            "platform": host.platform,
+        },
+    }
+
+
+def render_snmp_config(host, template_dir=TEMPLATE_DIR):
+    """
+    Renders the SNMP configuration commands of one host from its platform template.
+
+    Template variables come from SNMP_DEFAULTS, overridden by the host's group and
+    host data (e.g. "snmp_community" or "snmp_managers"). The host's name, hostname
+    and platform are available as ``host.name`` etc.
+
+    Args:
+        host (nornir.core.inventory.Host): The host to render for.
+        template_dir (str): Directory holding the templates.
 
-def configure_snmp(task):
+    Returns:
+        list or None: The configuration commands, or None if the host's platform
+                      has no SNMP template.
+    """
+    template_name = host.get("snmp_template")
+    if not template_name:
+        return None
+    return render_commands(template_dir, template_name, _context(host))
+
+
+def render_snmp_configs(nr, template_dir=TEMPLATE_DIR):
+    """
+    Renders the SNMP configuration of every host of ``nr`` in one pass.
+
+    Doing this before configure_snmp runs keeps template errors from surfacing
+    half-way through a push and keeps rendering off the connection threads. With
+    cpu_pool started, the templates are rendered by the worker processes.
+
+    Args:
+        nr (nornir.core.Nornir): The hosts to render for.
+        template_dir (str): Directory holding the templates.
+
+    Returns:
+        dict: Host name mapped to its list of commands; hosts without a template
+              are left out.
+    """
+    # Workers may not share the current directory
+    template_dir = os.path.abspath(template_dir)
+    names = []
+    jobs = []
+    for host in nr.inventory.hosts.values():
+        template_name = host.get("snmp_template")
+        if template_name:
+            names.append(host.name)
+            jobs.append((template_dir, template_name, _context(host)))
+    configs = {
+        name: commands
+        for name, commands in zip(names, cpu_pool.starmap(render_commands, jobs))
+        if commands
+    }
+    logging.info(f"Rendered SNMP configuration for {len(configs)} devices")
+    return configs
+
+
+def configure_snmp(task, snmp_configs=None, template_dir=TEMPLATE_DIR, metrics=None):
     """
     Configures SNMP on a network device.
-    Assumes SNMP configuration commands are available in task.host["snmp_config"].
+
+    Args:
+        task (nornir.core.task.Task): The Nornir task object.
+        snmp_configs (dict, optional): Commands per host from render_snmp_configs.
+                                       If None, the host's template is rendered here.
+        template_dir (str): Directory holding the templates.
+        metrics (Metrics, optional): Records connect and push timings.
     """
-    logging.info(f"Attempting to configure SNMP on {task.host.name}")
+    # Imported here so rendering alone does not load Netmiko
+    from nornir_netmiko.tasks import netmiko_send_config
 
-    # Ensure platform is set for Netmiko
-    platform_map = {"arista_ceos": "arista_eos", "cisco_iol": "cisco_ios"}
-    raw_platform = task.host.get("platform")
-    if raw_platform not in platform_map:
-        logging.warning(
-            f"[SKIPPED] {task.host.name}: Unsupported platform '{raw_platform}' for SNMP configuration."
-        )
-        return
+    logging.info(f"Attempting to configure SNMP on {task.host.name}")
 
-    task.host.platform = platform_map[raw_platform]
-
-    # SNMP configuration commands - these could also be in a file or Jinja template
-    # For this example, we'll assume they are part of the host data if needed,
-    # or use a default set for Cisco IOS.
-    # The original script had hardcoded SNMP config, so we'll use that as a default
-    # for Cisco IOS devices.
-    if task.host.platform == "cisco_ios":
-        snmp_config = [
-            "access-list 99 permit 192.168.122.1",  # Host allowed to poll SNMP
-            "snmp-server community public RO 99",  # Bind SNMP to ACL
-            "snmp-server location Lab",
-            "snmp-server contact admin@example.com",
-        ]
+    if snmp_configs is None:
+        snmp_config = render_snmp_config(task.host, template_dir)
     else:
+        snmp_config = snmp_configs.get(task.host.name)
+    if not snmp_config:
         logging.info(
             f"No specific SNMP configuration defined for {task.host.name} ({task.host.platform}). Skipping."
         )
         return
 
     try:
-        result = task.run(
-            task=netmiko_send_config,
-            config_commands=snmp_config,
-            severity_level=logging.DEBUG,
-        )
+        connect(task, metrics=metrics)
+        with span(metrics, task.host.name, task.name, "command") as phase:
+            phase["bytes"] = sum(len(command) + 1 for command in snmp_config)
+            result = task.run(
+                task=netmiko_send_config,
+                config_commands=snmp_config,
+                severity_level=logging.DEBUG,
+            )
         logging.info(f"✅ SNMP configuration applied successfully on {task.host.name}")
         print_result(result)
     except Exception as e:
@@ -61,18 +170,40 @@ def configure_snmp(task):
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--metrics",
+        metavar="PREFIX",
+        help="Write phase timings to PREFIX.prom and PREFIX.trace.json",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Render templates in this many worker processes (default: 0, inline)",
+    )
+    args = parser.parse_args()
+
     logging.info("Starting SNMP Configuration....")
     logging.info("=" * 40)
-    nr = InitNornir(config_file="config.yaml")
+    cpu_pool.start(args.processes)
+    nr = init_nornir()
 
-    # Filter to only run on devices that support SNMP configuration (e.g., Cisco IOS)
-    # In this lab, RTR, ACCESS1, ACCESS2 are Cisco IOL
-    cisco_devices = nr.filter(platform="cisco_iol")
+    # Filter to only run on devices with an SNMP template (Cisco IOS and Arista EOS)
+    snmp_devices = nr.filter(filter_func=is_supported)
 
-    if cisco_devices.inventory.hosts:
-        cisco_devices.run(task=configure_snmp)
+    if snmp_devices.inventory.hosts:
+        # Render everything first, then push to all devices in parallel
+        snmp_configs = render_snmp_configs(snmp_devices)
+        metrics = Metrics() if args.metrics else None
+        snmp_devices.run(
+            task=configure_snmp, snmp_configs=snmp_configs, metrics=metrics
+        )
+        if metrics is not None:
+            metrics.log_summary()
+            metrics.write(args.metrics)
     else:
-        logging.warning("No Cisco IOL devices found in inventory to configure SNMP.")
+        logging.warning("No supported devices found in inventory to configure SNMP.")
 
 
 if __name__ == "__main__":
@@ -1,23 +1,33 @@
 """Gathers configurations and facts from network devices using Nornir and NAPALM."""
 
+import argparse
 import logging
 import os
 
-from nornir import InitNornir
-from nornir_napalm.plugins.tasks import napalm_get
+from nornir.core.task import Result
 from nornir_utils.plugins.functions import print_result
 
+import cpu_pool
+from config_archive import ConfigArchive
+from lab_nornir import init_nornir
+from metrics import Metrics, connect, span
+from platforms import is_supported
+from state_store import StateStore, config_hash
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-# Map Containerlab platform to NAPALM-supported values
-PLATFORM_MAP = {"arista_ceos": "eos", "cisco_iol": "ios"}
-
 
 def gather_device_data(
-    task, getters=None, save_to_file=False, output_dir="fetched_configs"
+    task,
+    getters=None,
+    save_to_file=False,
+    output_dir="fetched_configs",
+    state=None,
+    archive=None,
+    metrics=None,
 ):
     """
     Gathers specified data (facts, config, etc.) from a network device using NAPALM.
@@ -28,26 +38,33 @@ def gather_device_data(
                                   Defaults to ["facts"] if None.
         save_to_file (bool): If True, saves the fetched configuration to a file.
         output_dir (str): Directory to save fetched configurations.
+        state (StateStore, optional): Records fetched config hashes; files whose
+                                      content did not change are not rewritten.
+        archive (ConfigArchive, optional): Keeps a history of fetched configurations.
+        metrics (Metrics, optional): Records connect, command, file write and archive
+                                     timings.
     """
+    # Imported here, NAPALM and its drivers take about half a second to load
+    from nornir_napalm.plugins.tasks import napalm_get
+
     if getters is None:
         getters = ["facts"]
 
-    raw_platform = task.host.get("platform")
-
-    if raw_platform not in PLATFORM_MAP:
+    if not is_supported(task.host):
         logging.warning(
-            f"[SKIPPED] {task.host.name}: Unsupported platform '{raw_platform}' for NAPALM."
+            f"[SKIPPED] {task.host.name}: Unsupported platform '{task.host.platform}' for NAPALM."
         )
         return
 
-    # Set NAPALM-compatible platform name
-    task.host.platform = PLATFORM_MAP[raw_platform]
-
     logging.info(f"Gathering {', '.join(getters)} from {task.host.name}")
     try:
-        result = task.run(
-            task=napalm_get, getters=getters, severity_level=logging.DEBUG
-        )
+        connect(task, "napalm", metrics=metrics)
+        with span(metrics, task.host.name, task.name, "command") as phase:
+            result = task.run(
+                task=napalm_get, getters=getters, severity_level=logging.DEBUG
+            )
+            running = result[0].result.get("config", {}).get("running")
+            phase["bytes"] = len(running or "")
         print_result(result)
 
         if save_to_file and "config" in getters:
@@ -56,11 +73,35 @@ def gather_device_data(
             if config_data:
                 os.makedirs(output_dir, exist_ok=True)
                 filename = os.path.join(output_dir, f"{task.host.name}.cfg")
-                with open(filename, "w") as f:
-                    f.write(config_data)
-                logging.info(
-                    f"✅ Saved configuration for {task.host.name} to {filename}"
-                )
+                running_hash = config_hash(config_data)
+                if (
+                    state is not None
+                    and state.get(task.host.name, "running") == running_hash
+                    and os.path.exists(filename)
+                ):
+                    logging.info(
+                        f"✅ Configuration for {task.host.name} unchanged, keeping {filename}"
+                    )
+                    # The file is still current: push_configs --diff reuses it
+                    # only while its modification time is recent
+                    os.utime(filename)
+                else:
+                    with span(
+                        metrics, task.host.name, task.name, "file_write"
+                    ) as phase:
+                        with open(filename, "w") as f:
+                            f.write(config_data)
+                        phase["bytes"] = len(config_data)
+                    logging.info(
+                        f"✅ Saved configuration for {task.host.name} to {filename}"
+                    )
+                if state is not None:
+                    state.record_fetch(task.host.name, running_hash)
+                if archive is not None:
+                    with span(metrics, task.host.name, task.name, "archive"):
+                        archived = archive.store(task.host.name, config_data)
+                    if archived:
+                        logging.info(f"✅ Archived configuration for {task.host.name}")
             else:
                 logging.warning(
                     f"No running configuration found for {task.host.name} to save."
@@ -68,29 +109,54 @@ def gather_device_data(
 
     except Exception as e:
         logging.error(f"❌ {task.host.name}: Failed to retrieve data - {e}")
+        # Reported as failed so callers see the host in result.failed_hosts
+        return Result(host=task.host, failed=True, exception=e)
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--metrics",
+        metavar="PREFIX",
+        help="Write phase timings to PREFIX.prom and PREFIX.trace.json",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Archive configurations in this many worker processes (default: 0, inline)",
+    )
+    args = parser.parse_args()
+
     logging.info("Starting Configuration and Fact Gathering....")
     logging.info("=" * 40)
-    nr = InitNornir(config_file="config.yaml")
+    cpu_pool.start(args.processes)
+    nr = init_nornir()
 
     # Filter hosts based on supported platforms before running the task
-    supported_hosts = nr.filter(
-        filter_func=lambda host: host.get("platform") in PLATFORM_MAP
-    )
+    supported_hosts = nr.filter(filter_func=is_supported)
 
     if supported_hosts.inventory.hosts:
         # Example: Gather running configuration and save to files
         logging.info(
             "Gathering running configurations and saving to 'fetched_configs' directory."
         )
+        state = StateStore()
+        archive = ConfigArchive("config_archive")
+        metrics = Metrics() if args.metrics else None
         results = supported_hosts.run(
             task=gather_device_data,
             getters=["config"],
             save_to_file=True,
             output_dir="fetched_configs",
+            state=state,
+            archive=archive,
+            metrics=metrics,
         )
+        state.save()
+        if metrics is not None:
+            metrics.log_summary()
+            metrics.write(args.metrics)
         # You can also gather facts:
         # logging.info("\nGathering device facts:")
         # results = supported_hosts.run(task=gather_device_data, getters=["facts"])
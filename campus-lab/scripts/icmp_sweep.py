@@ -0,0 +1,209 @@
+"""Concurrent ICMP reachability sweep with RTT and loss per host."""
+
+import asyncio
+import itertools
+import logging
+import os
+import re
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+# "64 bytes from 127.0.0.1: icmp_seq=1 ttl=64 time=0.045 ms"
+PING_RTT_RE = re.compile(r"time[=<]([\d.]+) ?ms")
+
+# Echo identifiers handed out to raw-socket probes, which all see every reply;
+# starting from the pid keeps concurrent sweeps in different processes apart
+_identifiers = itertools.count(os.getpid() << 4)
+
+
+@dataclass
+class PingResult:
+    """Outcome of pinging one address."""
+
+    address: str
+    sent: int = 0
+    rtts: list = field(default_factory=list)  # milliseconds, one per reply
+
+    @property
+    def received(self):
+        return len(self.rtts)
+
+    @property
+    def reachable(self):
+        return self.received > 0
+
+    @property
+    def loss(self):
+        """Fraction of echo requests without a reply (0.0 - 1.0)."""
+        return 1.0 - self.received / self.sent if self.sent else 1.0
+
+    @property
+    def avg_rtt(self):
+        return sum(self.rtts) / len(self.rtts) if self.rtts else None
+
+
+def _checksum(data):
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _echo_request(identifier, sequence):
+    payload = struct.pack("!d", time.monotonic()).ljust(56, b"\x00")
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, identifier, sequence)
+    checksum = _checksum(header + payload)
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, checksum, identifier, sequence)
+    return header + payload
+
+
+def open_icmp_socket():
+    """
+    Opens a non-blocking ICMP socket, or returns None if the process may not.
+
+    Unprivileged ICMP datagram sockets are tried first (Linux, allowed by
+    net.ipv4.ping_group_range), then raw sockets (root or CAP_NET_RAW).
+    """
+    for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+        try:
+            sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+        except (PermissionError, OSError):
+            continue
+        sock.setblocking(False)
+        return sock
+    return None
+
+
+async def _ping_socket(address, count, timeout):
+    """Pings an address with echo requests sent from a dedicated ICMP socket."""
+    loop = asyncio.get_running_loop()
+    result = PingResult(address)
+    sock = open_icmp_socket()
+    if sock is None:
+        # Out of descriptors or the permission went away mid-sweep
+        return await _ping_subprocess(address, count, timeout)
+
+    try:
+        infos = await loop.getaddrinfo(address, None, family=socket.AF_INET)
+        target = infos[0][4][0]
+        raw = sock.type == socket.SOCK_RAW
+        # Datagram sockets get their identifier rewritten by the kernel and only
+        # receive replies carrying it
+        identifier = next(_identifiers) & 0xFFFF if raw else 0
+
+        for sequence in range(1, count + 1):
+            await loop.sock_sendto(
+                sock, _echo_request(identifier, sequence), (target, 0)
+            )
+            result.sent += 1
+            started = time.monotonic()
+            deadline = started + timeout
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    data, (source, _) = await asyncio.wait_for(
+                        loop.sock_recvfrom(sock, 1024), remaining
+                    )
+                except asyncio.TimeoutError:
+                    break
+                if raw:
+                    # Raw sockets see every ICMP packet, IP header included
+                    data = data[(data[0] & 0x0F) * 4 :]
+                if len(data) < 8 or source != target:
+                    continue
+                icmp_type, _, _, reply_id, reply_sequence = struct.unpack(
+                    "!BBHHH", data[:8]
+                )
+                if icmp_type != ICMP_ECHO_REPLY:
+                    continue
+                # Replies to other probes, and late replies to this probe's
+                # earlier requests, are skipped
+                if reply_sequence != sequence or (raw and reply_id != identifier):
+                    continue
+                result.rtts.append((time.monotonic() - started) * 1000)
+                break
+    except OSError as e:
+        # Unresolvable names, no route to host, ...
+        logging.debug(f"{address}: {e}")
+    finally:
+        sock.close()
+    return result
+
+
+async def _ping_subprocess(address, count, timeout):
+    """Pings an address by running the system ping command."""
+    result = PingResult(address, sent=count)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "ping",
+            "-n",
+            "-c",
+            str(count),
+            "-W",
+            str(max(1, round(timeout))),
+            address,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError as e:
+        logging.error(f"Could not run ping for {address}: {e}")
+        return result
+    stdout, _ = await process.communicate()
+    result.rtts = [float(rtt) for rtt in PING_RTT_RE.findall(stdout.decode())]
+    return result
+
+
+async def ping_sweep_async(addresses, workers=64, count=1, timeout=2, backend="auto"):
+    """
+    Pings many addresses concurrently.
+
+    Args:
+        addresses (list): IP addresses or hostnames to ping.
+        workers (int): Maximum number of addresses probed at once.
+        count (int): Echo requests per address.
+        timeout (float): Seconds to wait for each reply.
+        backend (str): "socket" for in-process ICMP sockets, "subprocess" for the
+                       system ping command, or "auto" to use sockets when permitted.
+                       "socket" falls back to "subprocess", with a warning, when the
+                       process may not open ICMP sockets.
+
+    Returns:
+        dict: Address mapped to its PingResult.
+    """
+    if backend in ("auto", "socket"):
+        sock = open_icmp_socket()
+        if sock:
+            sock.close()
+        elif backend == "socket":
+            logging.warning(
+                "ICMP sockets are not permitted (allow the group in "
+                "net.ipv4.ping_group_range or grant CAP_NET_RAW), using the system "
+                "ping command instead"
+            )
+        backend = "socket" if sock else "subprocess"
+    ping = _ping_socket if backend == "socket" else _ping_subprocess
+    logging.debug(f"Pinging {len(addresses)} addresses with the {backend} backend")
+
+    semaphore = asyncio.Semaphore(workers)
+
+    async def bounded(address):
+        async with semaphore:
+            return await ping(address, count, timeout)
+
+    results = await asyncio.gather(*[bounded(address) for address in addresses])
+    return {result.address: result for result in results}
+
+
+def ping_sweep(addresses, workers=64, count=1, timeout=2, backend="auto"):
+    """Synchronous wrapper around ping_sweep_async, for use outside an event loop."""
+    return asyncio.run(
+        ping_sweep_async(
+            addresses, workers=workers, count=count, timeout=timeout, backend=backend
+        )
+    )
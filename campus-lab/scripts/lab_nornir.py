@@ -0,0 +1,79 @@
+"""Creates the lab's Nornir object with the lab's inventory plugins registered."""
+
+from importlib import metadata
+
+from nornir import InitNornir
+from nornir.core.plugins.connections import (
+    CONNECTIONS_PLUGIN_PATH,
+    ConnectionPluginRegister,
+)
+from nornir.core.plugins.inventory import (
+    InventoryPluginRegister,
+    TransformFunctionRegister,
+)
+from nornir.core.plugins.runners import RunnersPluginRegister
+
+from clab_inventory import ClabInventory
+from lab_runner import LabRunner
+from platforms import apply_platform
+
+InventoryPluginRegister.register("ClabInventory", ClabInventory)
+TransformFunctionRegister.register("lab_platforms", apply_platform)
+RunnersPluginRegister.register("LabRunner", LabRunner)
+
+
+class LazyConnectionPlugin:
+    """
+    Stands in for a connection plugin class until a host opens such a connection.
+
+    InitNornir loads every installed connection plugin up front, which imports
+    NAPALM with all its drivers and Netmiko (about 0.7 s) even for SNMP-only runs.
+    Nornir only ever calls the registered class to create a connection, so this
+    imports the plugin on that first call instead.
+
+    Args:
+        entry_point (importlib.metadata.EntryPoint): The plugin's entry point.
+    """
+
+    def __init__(self, entry_point):
+        self.entry_point = entry_point
+
+    def __call__(self):
+        return self.entry_point.load()()
+
+
+def register_connection_plugins():
+    """Registers the installed connection plugins without importing them."""
+    for entry_point in metadata.entry_points(group=CONNECTIONS_PLUGIN_PATH):
+        if entry_point.name not in ConnectionPluginRegister.available:
+            ConnectionPluginRegister.register(
+                entry_point.name, LazyConnectionPlugin(entry_point)
+            )
+
+
+def init_nornir(config_file="config.yaml", dry_run=False, **kwargs):
+    """
+    Initializes Nornir from the lab configuration.
+
+    Use this instead of importing InitNornir directly so the plugins named in
+    config.yaml, the "ClabInventory" inventory, the "lab_platforms" transform
+    function and the "LabRunner" runner, are registered first, and connection
+    plugins are registered with register_connection_plugins(), so Netmiko and
+    NAPALM are only imported by runs that connect to devices.
+
+    Args:
+        config_file (str): The Nornir configuration file.
+        dry_run (bool): Whether to simulate changes.
+        **kwargs: Overrides of the configuration file settings.
+
+    Returns:
+        nornir.core.Nornir: The initialized Nornir object.
+    """
+    # InitNornir calls ConnectionPluginRegister.auto_register(), which loads every
+    # installed connection plugin; register them lazily instead for this call only
+    ConnectionPluginRegister.auto_register = register_connection_plugins
+    try:
+        return InitNornir(config_file=config_file, dry_run=dry_run, **kwargs)
+    finally:
+        # Drops the instance attribute, the register's own method is used again
+        del ConnectionPluginRegister.auto_register
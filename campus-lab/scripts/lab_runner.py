@@ -0,0 +1,209 @@
+"""Nornir runner with per-group worker limits, a login rate limit and rolling batches."""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from nornir.core.inventory import Host
+from nornir.core.task import AggregatedResult, MultiResult, Result
+
+# The LabRunner running a task in the current thread, for LabHost.open_connection
+_current = threading.local()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing ``rate`` acquisitions per second on average,
+    with bursts of up to ``burst``.
+
+    Args:
+        rate (float): Tokens added per second.
+        burst (int): Maximum number of tokens that can accumulate.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Takes one token, sleeping until one is available; returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class LabHost(Host):
+    """
+    Nornir host whose new connections wait for the login rate limit of the LabRunner
+    running its task; ClabInventory creates its hosts with this class.
+    """
+
+    __slots__ = ()
+
+    def open_connection(self, *args, **kwargs):
+        runner = getattr(_current, "runner", None)
+        if runner is not None:
+            runner.wait_for_login()
+        return super().open_connection(*args, **kwargs)
+
+
+class LabRunner:
+    """
+    Runs a task over the hosts in threads, like Nornir's ThreadedRunner, with limits
+    that keep large runs from overwhelming the devices and the AAA servers.
+
+    - ``group_workers`` caps how many hosts of a group (e.g. "core", "distribution",
+      "access" from lab.clab.yaml) run at the same time; other hosts keep the free
+      workers busy meanwhile.
+    - ``logins_per_second`` rate-limits the connections the task opens, each of
+      them a new login; hosts whose task reuses an open connection or does not
+      connect at all (e.g. SNMP) are not held back. Only LabHost hosts, the ones
+      ClabInventory creates, are limited.
+    - ``batch_size`` runs the hosts in successive batches; once more than
+      ``max_failure_ratio`` of the hosts run so far failed, the remaining batches
+      are not started and their hosts are reported as failed.
+
+    Each run logs its throughput, and the figures are kept in ``stats``.
+
+    Args:
+        num_workers (int): Maximum number of hosts running at the same time.
+        group_workers (dict, optional): Group name mapped to its maximum number of
+                                        hosts running at the same time, at least 1.
+        logins_per_second (float, optional): Average rate of new logins; unlimited
+                                             if None.
+        login_burst (int): Logins allowed back to back before the rate applies.
+        batch_size (int, optional): Hosts per batch; all hosts at once if None.
+        max_failure_ratio (float): Failed share of the hosts run so far above which
+                                   no further batch is started.
+    """
+
+    def __init__(
+        self,
+        num_workers=20,
+        group_workers=None,
+        logins_per_second=None,
+        login_burst=1,
+        batch_size=None,
+        max_failure_ratio=1.0,
+    ):
+        self.num_workers = num_workers
+        self.group_workers = group_workers or {}
+        for group, limit in self.group_workers.items():
+            # A group without a slot would never start its hosts
+            if limit < 1:
+                raise ValueError(
+                    f"group_workers of '{group}' must be at least 1, got {limit}"
+                )
+        self.login_bucket = (
+            TokenBucket(logins_per_second, login_burst) if logins_per_second else None
+        )
+        self.batch_size = batch_size
+        self.max_failure_ratio = max_failure_ratio
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def _limited_groups(self, host):
+        return [group.name for group in host.groups if group.name in self.group_workers]
+
+    def wait_for_login(self):
+        """Waits until the login rate limit allows a new connection."""
+        if self.login_bucket is not None:
+            waited = self.login_bucket.acquire()
+            with self._lock:
+                self.stats["login_wait"] += waited
+
+    def _start(self, task, host):
+        _current.runner = self
+        try:
+            return task.copy().start(host)
+        finally:
+            _current.runner = None
+
+    def _run_batch(self, task, hosts, pool, result):
+        pending = deque(hosts)
+        running = {}  # future -> host
+        group_running = dict.fromkeys(self.group_workers, 0)
+
+        while pending or running:
+            # Start every pending host whose groups have a free slot
+            for _ in range(len(pending)):
+                if len(running) >= self.num_workers:
+                    break
+                host = pending.popleft()
+                groups = self._limited_groups(host)
+                if any(
+                    group_running[group] >= self.group_workers[group]
+                    for group in groups
+                ):
+                    pending.append(host)
+                    continue
+                for group in groups:
+                    group_running[group] += 1
+                running[pool.submit(self._start, task, host)] = host
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                host = running.pop(future)
+                for group in self._limited_groups(host):
+                    group_running[group] -= 1
+                result[host.name] = future.result()
+
+    def run(self, task, hosts):
+        result = AggregatedResult(task.name)
+        self.stats = {"login_wait": 0.0}
+        start = time.monotonic()
+        batch_size = self.batch_size or len(hosts) or 1
+        batches = [hosts[i : i + batch_size] for i in range(0, len(hosts), batch_size)]
+
+        with ThreadPoolExecutor(self.num_workers) as pool:
+            for number, batch in enumerate(batches):
+                self._run_batch(task, batch, pool, result)
+                failed = len(result.failed_hosts)
+                skipped = [host for rest in batches[number + 1 :] for host in rest]
+                if skipped and failed > self.max_failure_ratio * len(result):
+                    logging.error(
+                        f"❌ {task.name}: {failed} of {len(result)} hosts failed, "
+                        f"not starting the remaining {len(skipped)} hosts"
+                    )
+                    for host in skipped:
+                        multi_result = MultiResult(task.name)
+                        multi_result.append(
+                            Result(
+                                host=host,
+                                result="Not run: too many failures in earlier batches",
+                                failed=True,
+                            )
+                        )
+                        result[host.name] = multi_result
+                    break
+
+        elapsed = time.monotonic() - start
+        self.stats.update(
+            hosts=len(hosts),
+            failed=len(result.failed_hosts),
+            elapsed=elapsed,
+            hosts_per_second=len(hosts) / elapsed if elapsed else 0.0,
+        )
+        logging.info(
+            f"{task.name}: {len(hosts)} hosts in {elapsed:.1f}s "
+            f"({self.stats['hosts_per_second']:.1f} hosts/s), "
+            f"{self.stats['failed']} failed, "
+            f"{self.stats['login_wait']:.1f}s spent waiting for the login rate limit"
+        )
+        return result
@@ -0,0 +1,179 @@
+"""Per-host, per-phase timings exported as Prometheus text and Chrome trace JSON."""
+
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _quantile(sorted_values, q):
+    # Nearest-rank quantile, good enough for latency summaries
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Metrics:
+    """
+    Records how long each phase of each task took on each host.
+
+    Tasks wrap their phases (connect, command, SNMP round trip, file write, ...) in
+    ``span()``; a span can also count the bytes it handled. The recorded spans are
+    exported with write_prometheus() for p50/p90/p99 per task and phase across the
+    fleet, and with write_trace() for a timeline in chrome://tracing or Perfetto.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, host, task, phase, **attrs):
+        """
+        Times the enclosed block as one phase of a task on a host.
+
+        Yields a dict of attributes stored with the span; set "bytes" in it to count
+        the bytes sent, received or written during the phase.
+        """
+        attrs = dict(attrs)
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except BaseException:
+            attrs["failed"] = True
+            raise
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.spans.append({
+                    "host": host,
+                    "task": task,
+                    "phase": phase,
+                    "start": start - self._origin,
+                    "duration": end - start,
+                    "attrs": attrs,
+                })
+
+    def summary(self):
+        """Returns {(task, phase): {"count", "sum", "bytes", quantiles...}}."""
+        durations = defaultdict(list)
+        sizes = defaultdict(int)
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            key = (span["task"], span["phase"])
+            durations[key].append(span["duration"])
+            sizes[key] += span["attrs"].get("bytes", 0)
+
+        summary = {}
+        for key, values in durations.items():
+            values.sort()
+            summary[key] = {
+                "count": len(values),
+                "sum": sum(values),
+                "bytes": sizes[key],
+                **{q: _quantile(values, q) for q in QUANTILES},
+            }
+        return summary
+
+    def write_prometheus(self, path):
+        """Writes the per-phase summaries in the Prometheus text exposition format."""
+        lines = [
+            "# HELP lab_phase_duration_seconds Duration of a task phase on one host.",
+            "# TYPE lab_phase_duration_seconds summary",
+        ]
+        summary = self.summary()
+        for (task, phase), stats in sorted(summary.items()):
+            labels = f'task="{task}",phase="{phase}"'
+            for q in QUANTILES:
+                lines.append(
+                    f'lab_phase_duration_seconds{{{labels},quantile="{q}"}} {stats[q]:.6f}'
+                )
+            lines.append(
+                f"lab_phase_duration_seconds_sum{{{labels}}} {stats['sum']:.6f}"
+            )
+            lines.append(
+                f"lab_phase_duration_seconds_count{{{labels}}} {stats['count']}"
+            )
+        lines += [
+            "# HELP lab_phase_bytes_total Bytes handled by a task phase.",
+            "# TYPE lab_phase_bytes_total counter",
+        ]
+        for (task, phase), stats in sorted(summary.items()):
+            lines.append(
+                f'lab_phase_bytes_total{{task="{task}",phase="{phase}"}} {stats["bytes"]}'
+            )
+        self._write(path, "\n".join(lines) + "\n")
+
+    def write_trace(self, path):
+        """Writes the spans as Chrome trace events, one timeline row per host."""
+        with self._lock:
+            spans = list(self.spans)
+        rows = {}
+        events = []
+        for span in spans:
+            row = rows.setdefault(span["host"], len(rows) + 1)
+            events.append({
+                "name": span["phase"],
+                "cat": span["task"],
+                "ph": "X",
+                "ts": round(span["start"] * 1e6),
+                "dur": round(span["duration"] * 1e6),
+                "pid": 1,
+                "tid": row,
+                "args": span["attrs"],
+            })
+        for host, row in rows.items():
+            events.append({
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": row,
+                "args": {"name": host},
+            })
+        self._write(path, json.dumps({"traceEvents": events}))
+
+    def write(self, prefix):
+        """Writes <prefix>.prom and <prefix>.trace.json."""
+        self.write_prometheus(f"{prefix}.prom")
+        self.write_trace(f"{prefix}.trace.json")
+        logging.info(f"Metrics written to {prefix}.prom and {prefix}.trace.json")
+
+    @staticmethod
+    def _write(path, text):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{path}.tmp"
+        with open(tmp_file, "w") as f:
+            f.write(text)
+        os.replace(tmp_file, path)
+
+    def log_summary(self):
+        """Logs p50/p99 and bytes for every task phase."""
+        for (task, phase), stats in sorted(self.summary().items()):
+            logging.info(
+                f"{task}/{phase}: {stats['count']} spans, "
+                f"p50 {stats[0.5] * 1000:.1f} ms, p99 {stats[0.99] * 1000:.1f} ms, "
+                f"{stats['bytes']} bytes"
+            )
+
+
+def span(metrics, host, task, phase, **attrs):
+    """Returns metrics.span(...), or a no-op context yielding a dict if metrics is None."""
+    if metrics is None:
+        return contextlib.nullcontext(dict(attrs))
+    return metrics.span(host, task, phase, **attrs)
+
+
+def connect(task, connection="netmiko", metrics=None, task_name=None):
+    """Opens the host's connection if needed, timing it as the "connect" phase."""
+    if connection in task.host.connections:
+        return
+    with span(metrics, task.host.name, task_name or task.name, "connect"):
+        task.host.get_connection(connection, task.nornir.config)
@@ -0,0 +1,121 @@
+"""Resolves symbolic OIDs to numeric OIDs once and caches them in memory and on disk."""
+
+import json
+import logging
+import os
+
+from pysnmp.hlapi.v3arch.asyncio import ObjectIdentity
+
+DEFAULT_CACHE_FILE = ".oid_cache.json"
+
+
+def parse_oid(oid):
+    """
+    Splits an OID string into ObjectIdentity arguments.
+
+    Args:
+        oid (str): Either "MIB,name,index" (e.g. "SNMPv2-MIB,sysDescr,0") or a full OID
+                   string (e.g. "1.3.6.1.2.1.1.1.0").
+
+    Returns:
+        tuple: The positional arguments for ObjectIdentity.
+    """
+    oid_parts = oid.split(",")
+    if len(oid_parts) == 3:
+        return oid_parts[0].strip(), oid_parts[1].strip(), int(oid_parts[2].strip())
+    return (oid,)  # Assume it's a full OID string
+
+
+def oid_label(oid):
+    """Returns the display label of an OID string, e.g. "SNMPv2-MIB::sysDescr.0"."""
+    oid_parts = parse_oid(oid)
+    if len(oid_parts) == 3:
+        return f"{oid_parts[0]}::{oid_parts[1]}.{oid_parts[2]}"
+    return oid_parts[0]
+
+
+class OidCache:
+    """
+    Maps OID strings to numeric OID tuples.
+
+    Lookups are served from memory first, then from a JSON file shared between runs.
+    Only OIDs missing from both are resolved against the MIB tree, after which the file
+    is rewritten.
+
+    Args:
+        cache_file (str, optional): JSON file persisting resolved OIDs. None disables
+                                    the on-disk cache.
+    """
+
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE):
+        self.cache_file = cache_file
+        self._numeric = {}
+        self._loaded = False
+
+    def _load(self):
+        self._loaded = True
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                self._numeric.update({
+                    oid: tuple(numeric) for oid, numeric in json.load(f).items()
+                })
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable OID cache {self.cache_file}: {e}")
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        tmp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_file, "w") as f:
+                json.dump(
+                    {oid: list(numeric) for oid, numeric in self._numeric.items()}, f
+                )
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logging.warning(f"Could not write OID cache {self.cache_file}: {e}")
+
+    def cached(self, oids):
+        """
+        Returns the numeric OID tuple of every OID string if all of them are cached.
+
+        Args:
+            oids (list): OID strings in "MIB,name,index" or dotted numeric form.
+
+        Returns:
+            list or None: One numeric OID tuple per input OID, in order, or None if
+                          any of them still has to be resolved against the MIB tree.
+        """
+        if not self._loaded:
+            self._load()
+        if not all(oid in self._numeric for oid in oids):
+            return None
+        return [self._numeric[oid] for oid in oids]
+
+    def resolve(self, oids, mib_view_controller):
+        """
+        Returns the numeric OID tuple of every OID string.
+
+        Args:
+            oids (list): OID strings in "MIB,name,index" or dotted numeric form.
+            mib_view_controller (pysnmp.smi.view.MibViewController): Used for OIDs that
+                                                                     are not cached yet.
+
+        Returns:
+            list: One numeric OID tuple per input OID, in order.
+        """
+        if not self._loaded:
+            self._load()
+
+        missing = [oid for oid in oids if oid not in self._numeric]
+        for oid in missing:
+            object_identity = ObjectIdentity(*parse_oid(oid))
+            object_identity.resolve_with_mib(mib_view_controller)
+            self._numeric[oid] = tuple(object_identity.get_oid())
+        if missing:
+            logging.info(f"Resolved {len(missing)} OIDs against the MIB tree")
+            self._save()
+
+        return [self._numeric[oid] for oid in oids]
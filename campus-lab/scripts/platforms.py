@@ -0,0 +1,94 @@
+"""Registry of the containerlab kinds the scripts support and how to drive each one."""
+
+from dataclasses import dataclass
+
+from nornir.core.inventory import ConnectionOptions
+
+
+@dataclass(frozen=True)
+class Platform:
+    """Drivers and files used for one containerlab kind."""
+
+    netmiko: str  # Netmiko device_type
+    napalm: str  # NAPALM driver
+    config_ext: str  # Extension of the intended config in configs/
+    snmp_template: str  # SNMP configuration template in templates/
+    health_commands: tuple  # Show commands collected by the health check
+
+
+PLATFORMS = {
+    "cisco_iol": Platform(
+        netmiko="cisco_ios",
+        napalm="ios",
+        config_ext="ios",
+        snmp_template="snmp/ios.j2",
+        health_commands=(
+            "show version",
+            "show ip interface brief",
+            "show interfaces",
+            "show ip route",
+            "show ip ospf neighbor",
+            "show cdp neighbors",
+            "show vlan brief",
+            "show interfaces trunk",
+            "show spanning-tree",
+            "show processes cpu",
+            "show logging",
+            "show inventory",
+        ),
+    ),
+    "arista_ceos": Platform(
+        netmiko="arista_eos",
+        napalm="eos",
+        config_ext="cfg",
+        snmp_template="snmp/eos.j2",
+        health_commands=(
+            "show version",
+            "show ip interface brief",
+            "show interfaces",
+            "show ip route",
+            "show ip ospf neighbor",
+            "show lldp neighbors",
+            "show vlan",
+            "show interfaces trunk",
+            "show spanning-tree",
+            "show vrrp",
+            "show processes top once",
+            "show inventory",
+        ),
+    ),
+}
+
+
+def is_supported(host):
+    """Returns True if the host's containerlab kind is in the registry."""
+    return host.platform in PLATFORMS
+
+
+def apply_platform(host):
+    """
+    Nornir transform function resolving a host's containerlab kind once at load time.
+
+    host.platform keeps the containerlab kind so hosts can still be filtered by it.
+    The Netmiko and NAPALM platforms go into the host's connection options, and the
+    config file extension, SNMP template and health check commands into its data
+    as "config_ext", "snmp_template" and "health_commands", so tasks no longer look
+    them up or change host.platform.
+
+    Args:
+        host (nornir.core.inventory.Host): The host being loaded.
+    """
+    platform = PLATFORMS.get(host.platform)
+    if platform is None:
+        return
+
+    for connection, driver in (
+        ("netmiko", platform.netmiko),
+        ("napalm", platform.napalm),
+    ):
+        options = host.connection_options.setdefault(connection, ConnectionOptions())
+        if options.platform is None:
+            options.platform = driver
+    host.data.setdefault("config_ext", platform.config_ext)
+    host.data.setdefault("snmp_template", platform.snmp_template)
+    host.data.setdefault("health_commands", list(platform.health_commands))
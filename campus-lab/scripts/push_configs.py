@@ -1,47 +1,104 @@
 """Pushes configurations to network devices using Nornir and Netmiko."""
 
+import argparse
 import logging
+import time
 from pathlib import Path
 
-from nornir import InitNornir
-from nornir_netmiko.tasks import netmiko_send_config
+from nornir.core.task import Result
 from nornir_utils.plugins.functions import print_result
 
+import cpu_pool
+from config_diff import diff_text
+from lab_nornir import init_nornir
+from lab_runner import LabRunner
+from metrics import Metrics, connect, span
+from platforms import is_supported
+from state_store import StateStore, config_hash
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
-# Containerlab → Netmiko platform mapping
-PLATFORM_MAP = {"arista_ceos": "arista_eos", "cisco_iol": "cisco_ios"}
 
+def get_running_config(
+    task, running_config_dir="fetched_configs", max_age=300, metrics=None
+):
+    """
+    Returns the running configuration of a device, preferring a fresh local copy.
+
+    Args:
+        task (nornir.core.task.Task): The Nornir task object.
+        running_config_dir (str): Directory where fetch_configs.py saves configurations.
+        max_age (float): Maximum age in seconds of a saved configuration to reuse it.
+        metrics (Metrics, optional): Records the "running_config" phase.
 
-def push_host_config(task, config_dir="configs"):
+    Returns:
+        str: The running configuration.
+    """
+    cached_file = Path(running_config_dir) / f"{task.host.name}.cfg"
+    if cached_file.exists() and time.time() - cached_file.stat().st_mtime <= max_age:
+        logging.info(
+            f"Using running configuration of {task.host.name} from {cached_file}"
+        )
+        with span(
+            metrics, task.host.name, task.name, "running_config", source="file"
+        ) as phase:
+            running_config = cached_file.read_text()
+            phase["bytes"] = len(running_config)
+        return running_config
+
+    # Imported here, Netmiko is only loaded once a device has to be contacted
+    from nornir_netmiko.tasks import netmiko_send_command
+
+    logging.info(f"Retrieving running configuration from {task.host.name}")
+    connect(task, metrics=metrics)
+    with span(
+        metrics, task.host.name, task.name, "running_config", source="device"
+    ) as phase:
+        result = task.run(
+            task=netmiko_send_command,
+            command_string="show running-config",
+            severity_level=logging.DEBUG,
+        )
+        phase["bytes"] = len(result[0].result)
+    return result[0].result
+
+
+def push_host_config(
+    task,
+    config_dir="configs",
+    diff_only=False,
+    running_config_dir="fetched_configs",
+    running_config_max_age=300,
+    state=None,
+    metrics=None,
+):
     """
     Pushes configuration from a file to a network device.
 
     Args:
         task (nornir.core.task.Task): The Nornir task object.
         config_dir (str): The directory where configuration files are located.
+        diff_only (bool): If True, compares the file with the running configuration
+                          and only pushes the stanzas that are missing or changed.
+        running_config_dir (str): Directory with configurations saved by fetch_configs.py,
+                                  reused for diff_only when fresh enough.
+        running_config_max_age (float): Maximum age in seconds of a saved configuration
+                                        to reuse it instead of asking the device.
+        state (StateStore, optional): Records pushed config hashes; hosts whose
+                                      intended and running configs are unchanged
+                                      since the last push are skipped.
+        metrics (Metrics, optional): Records read, connect, diff and push timings.
     """
-    raw_platform = task.host.get("platform")
+    from nornir_netmiko.tasks import netmiko_send_config
 
-    if raw_platform not in PLATFORM_MAP:
+    # Config file extension resolved from platforms.PLATFORMS at inventory load
+    file_extension = task.host.get("config_ext")
+    if file_extension is None:
         logging.warning(
-            f"[SKIPPED] {task.host.name}: Unsupported platform '{raw_platform}' for configuration push."
-        )
-        return
-
-    task.host.platform = PLATFORM_MAP[raw_platform]
-
-    # Determine config file extension based on platform
-    if task.host.platform == "cisco_ios":
-        file_extension = "ios"
-    elif task.host.platform == "arista_eos":
-        file_extension = "cfg"  # or .conf, .txt
-    else:
-        logging.warning(
-            f"[SKIPPED] {task.host.name}: Unknown file extension for platform '{task.host.platform}'."
+            f"[SKIPPED] {task.host.name}: Unsupported platform '{task.host.platform}' for configuration push."
         )
         return
 
@@ -53,31 +110,126 @@ def push_host_config(task, config_dir="configs"):
         )
         return
 
-    logging.info(f"Pushing configuration from {config_file} to {task.host.name}")
-    try:
-        result = task.run(
-            task=netmiko_send_config,
-            config_file=str(config_file),
-            severity_level=logging.DEBUG,
+    with span(metrics, task.host.name, task.name, "read_intended") as phase:
+        intended_config = config_file.read_text()
+        phase["bytes"] = len(intended_config)
+    intended_hash = config_hash(intended_config)
+    if state is not None and state.in_sync(task.host.name, intended_hash):
+        logging.info(
+            f"✅ {task.host.name}: {config_file} and running config unchanged since "
+            f"last push, skipping."
         )
+        return Result(host=task.host, changed=False)
+
+    try:
+        if diff_only:
+            running_config = get_running_config(
+                task, running_config_dir, running_config_max_age, metrics=metrics
+            )
+            with span(metrics, task.host.name, task.name, "diff"):
+                commands = cpu_pool.run(diff_text, intended_config, running_config)
+            if not commands:
+                logging.info(f"✅ {task.host.name} already matches {config_file}")
+                if state is not None:
+                    state.record_push(task.host.name, intended_hash)
+                return Result(host=task.host, changed=False)
+            logging.info(
+                f"Pushing {len(commands)} changed lines from {config_file} to {task.host.name}"
+            )
+            connect(task, metrics=metrics)
+            with span(metrics, task.host.name, task.name, "command") as phase:
+                phase["bytes"] = sum(len(command) + 1 for command in commands)
+                result = task.run(
+                    task=netmiko_send_config,
+                    config_commands=commands,
+                    severity_level=logging.DEBUG,
+                )
+        else:
+            logging.info(
+                f"Pushing configuration from {config_file} to {task.host.name}"
+            )
+            connect(task, metrics=metrics)
+            with span(metrics, task.host.name, task.name, "command") as phase:
+                phase["bytes"] = len(intended_config)
+                result = task.run(
+                    task=netmiko_send_config,
+                    config_file=str(config_file),
+                    severity_level=logging.DEBUG,
+                )
         logging.info(f"✅ Configuration applied successfully on {task.host.name}")
         print_result(result)
+        if state is not None:
+            state.record_push(task.host.name, intended_hash)
     except Exception as e:
         logging.error(f"❌ Failed to push configuration to {task.host.name}: {e}")
+        # Reported as failed so LabRunner can stop a rollout with too many failures
+        return Result(host=task.host, failed=True, exception=e)
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Only push stanzas that differ from the running configuration",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Push to this many devices at a time (default: config.yaml, else all at once)",
+    )
+    parser.add_argument(
+        "--max-failure-ratio",
+        type=float,
+        default=None,
+        help="Stop starting new batches once this share of devices failed "
+        "(default: config.yaml, else 0.1)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PREFIX",
+        help="Write phase timings to PREFIX.prom and PREFIX.trace.json",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Diff configurations in this many worker processes (default: 0, inline)",
+    )
+    args = parser.parse_args()
+
     logging.info("Starting Configuration Push....")
     logging.info("=" * 40)
-    nr = InitNornir(config_file="config.yaml")
+    cpu_pool.start(args.processes)
+    nr = init_nornir()
+
+    # The runner options of config.yaml, overridden by the options given here
+    runner_options = {"max_failure_ratio": 0.1, **nr.config.runner.options}
+    if args.batch_size is not None:
+        runner_options["batch_size"] = args.batch_size
+    if args.max_failure_ratio is not None:
+        runner_options["max_failure_ratio"] = args.max_failure_ratio
 
     # Filter hosts based on supported platforms
-    supported_hosts = nr.filter(
-        filter_func=lambda host: host.get("platform") in PLATFORM_MAP
+    supported_hosts = nr.filter(filter_func=is_supported).with_runner(
+        LabRunner(**runner_options)
     )
 
     if supported_hosts.inventory.hosts:
-        supported_hosts.run(task=push_host_config, config_dir="configs")
+        state = StateStore()
+        metrics = Metrics() if args.metrics else None
+        supported_hosts.run(
+            task=push_host_config,
+            config_dir="configs",
+            diff_only=args.diff,
+            state=state,
+            metrics=metrics,
+        )
+        state.save()
+        if metrics is not None:
+            metrics.log_summary()
+            metrics.write(args.metrics)
     else:
         logging.warning(
             "No supported devices found in inventory for configuration push."
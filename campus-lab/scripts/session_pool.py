@@ -0,0 +1,106 @@
+"""Keeps Nornir device connections warm across task runs, with health checks and idle eviction."""
+
+import logging
+import threading
+import time
+
+
+def _is_alive(connection):
+    """Returns whether an open Netmiko or NAPALM connection still answers."""
+    try:
+        alive = connection.is_alive()
+    except Exception:
+        return False
+    # NAPALM drivers return {"is_alive": bool}, Netmiko returns a bool
+    if isinstance(alive, dict):
+        return bool(alive.get("is_alive"))
+    return bool(alive)
+
+
+class SessionPool:
+    """
+    Nornir processor that lets task runs share authenticated connections.
+
+    Nornir caches connections on each host for as long as the Nornir object lives, so
+    running several tasks on the same object already skips the SSH handshake and login.
+    This processor makes that safe for a long-running worker: before a host starts a
+    task, connections idle for longer than ``health_check_after`` are probed and dead
+    ones dropped so the connection plugin reopens them, and ``evict_idle`` closes
+    connections nobody used for ``idle_timeout`` seconds.
+
+    Args:
+        health_check_after (float): Idle seconds after which a connection is probed
+                                    before being reused.
+        idle_timeout (float): Idle seconds after which evict_idle closes a connection.
+    """
+
+    def __init__(self, health_check_after=30, idle_timeout=300):
+        self.health_check_after = health_check_after
+        self.idle_timeout = idle_timeout
+        self._last_used = {}  # (host name, connection name) -> monotonic time
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.dropped = 0
+
+    def _idle_for(self, host, connection_name, now):
+        with self._lock:
+            last_used = self._last_used.get((host.name, connection_name), now)
+        return now - last_used
+
+    def _close(self, host, connection_name, reason):
+        logging.info(f"Closing {connection_name} connection to {host.name}: {reason}")
+        try:
+            host.close_connection(connection_name)
+        except Exception as e:
+            # The session is gone either way, only the goodbye failed
+            logging.debug(f"{host.name}: error closing {connection_name}: {e}")
+            host.connections.pop(connection_name, None)
+        with self._lock:
+            self._last_used.pop((host.name, connection_name), None)
+
+    def task_started(self, task):
+        pass
+
+    def task_completed(self, task, result):
+        pass
+
+    def task_instance_started(self, task, host):
+        now = time.monotonic()
+        for connection_name, plugin in list(host.connections.items()):
+            if self._idle_for(host, connection_name, now) < self.health_check_after:
+                self.reused += 1
+            elif _is_alive(plugin.connection):
+                self.reused += 1
+            else:
+                self.dropped += 1
+                self._close(host, connection_name, "failed health check")
+
+    def task_instance_completed(self, task, host, result):
+        now = time.monotonic()
+        with self._lock:
+            for connection_name in host.connections:
+                self._last_used[(host.name, connection_name)] = now
+
+    def subtask_instance_started(self, task, host):
+        pass
+
+    def subtask_instance_completed(self, task, host, result):
+        pass
+
+    def evict_idle(self, nr):
+        """Closes every connection of ``nr`` idle for longer than idle_timeout."""
+        now = time.monotonic()
+        for host in nr.inventory.hosts.values():
+            for connection_name in list(host.connections):
+                if self._idle_for(host, connection_name, now) >= self.idle_timeout:
+                    self._close(host, connection_name, "idle timeout")
+
+    def log_stats(self, nr):
+        """Logs how many connections are open and how often they were reused."""
+        open_connections = sum(
+            len(host.connections) for host in nr.inventory.hosts.values()
+        )
+        logging.info(
+            f"Session pool: {open_connections} open connections, "
+            f"{self.reused} reuses, {self.dropped} dropped after failed health checks"
+        )
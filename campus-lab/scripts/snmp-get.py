@@ -1,19 +1,15 @@
 """Retrieves SNMP data from network devices using Nornir and pysnmp."""
 
+import argparse
 import asyncio
 import logging
 
-from nornir import InitNornir
 from nornir.core.task import Result
-from pysnmp.hlapi.v3arch.asyncio import (
-    CommunityData,
-    ContextData,
-    ObjectIdentity,
-    ObjectType,
-    SnmpEngine,
-    UdpTransportTarget,
-    get_cmd,
-)
+
+from async_runner import run_async
+from lab_nornir import init_nornir
+from metrics import Metrics, span
+from snmp_client import SnmpClient, to_native
 
 # Configure logging
 logging.basicConfig(
@@ -21,7 +17,9 @@ logging.basicConfig(
 )
 
 
-async def snmp_get_task(task, oid, community="public"):
+async def snmp_get_task(
+    task, oid, community="public", client=None, output="text", metrics=None
+):
     """
     Nornir task to perform an SNMP GET operation.
 
@@ -29,6 +27,11 @@ async def snmp_get_task(task, oid, community="public"):
         task (nornir.core.task.Task): The Nornir task object.
         oid (str): The OID to retrieve (e.g., "SNMPv2-MIB", "sysDescr", 0).
         community (str): The SNMP community string.
+        client (SnmpClient, optional): A shared SNMP client. If None, a client is
+                                       created for this call and closed afterwards.
+        output (str): "text" for newline-joined "oid = value" lines, or "typed" for a
+                      dict of OID string to native value (int, str or None).
+        metrics (Metrics, optional): Records the SNMP round trip as "snmp_get".
 
     Returns:
         nornir.core.task.Result: The result of the SNMP GET operation.
@@ -36,27 +39,19 @@ async def snmp_get_task(task, oid, community="public"):
     logging.info(
         f"Attempting SNMP GET for OID {oid} on {task.host.name} ({task.host.hostname})"
     )
-    snmp_engine = SnmpEngine()
+    own_client = client is None
+    if own_client:
+        client = SnmpClient()
 
     try:
-        transport = await UdpTransportTarget.create((task.host.hostname, 161))
-
-        # Parse OID string into ObjectIdentity
-        oid_parts = oid.split(",")
-        if len(oid_parts) == 3:
-            object_identity = ObjectIdentity(
-                oid_parts[0].strip(), oid_parts[1].strip(), int(oid_parts[2].strip())
+        # The OID is resolved once per client, polls only reuse the numeric varbind
+        with span(metrics, task.host.name, "snmp_get_task", "snmp_get"):
+            result = await client.get(
+                task.host.hostname,
+                client.object_types([oid]),
+                community=community,
+                lookup_mib=False,
             )
-        else:
-            object_identity = ObjectIdentity(oid)  # Assume it's a full OID string
-
-        result = await get_cmd(
-            snmp_engine,
-            CommunityData(community, mpModel=1),  # SNMP v2c
-            transport,
-            ContextData(),
-            ObjectType(object_identity),
-        )
 
         error_indication, error_status, error_index, var_binds = result
 
@@ -70,9 +65,12 @@ async def snmp_get_task(task, oid, community="public"):
             )
             logging.error(f"❌ {task.host.name}: {error_message}")
             return Result(host=task.host, result=error_message, failed=True)
-        output = "\n".join([
-            " = ".join([x.prettyPrint() for x in var_bind]) for var_bind in var_binds
-        ])
+        # One OID was asked for, so there is exactly one varbind
+        value = var_binds[0][1]
+        if output == "typed":
+            output = {oid: to_native(value)}
+        else:
+            output = f"{client.label(oid)} = {value.prettyPrint()}"
         logging.info(f"✅ {task.host.name}: SNMP GET successful.")
         return Result(host=task.host, result=output)
     except Exception as e:
@@ -80,28 +78,52 @@ async def snmp_get_task(task, oid, community="public"):
         logging.error(f"❌ {task.host.name}: {error_message}")
         return Result(host=task.host, result=error_message, failed=True)
     finally:
-        snmp_engine.close_dispatcher()
+        if own_client:
+            client.close()
 
 
 async def main_async():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--metrics",
+        metavar="PREFIX",
+        help="Write phase timings to PREFIX.prom and PREFIX.trace.json",
+    )
+    args = parser.parse_args()
+
     logging.info("Starting SNMP GET Operation....")
     logging.info("=" * 40)
-    nr = InitNornir(config_file="config.yaml")
+    nr = init_nornir()
 
     # Filter to only run on devices where SNMP is expected to be enabled (e.g., Cisco IOL)
     # In this lab, RTR, ACCESS1, ACCESS2 are Cisco IOL
     snmp_devices = nr.filter(platform="cisco_iol")
 
     if snmp_devices.inventory.hosts:
+        # One engine and one transport per device, all hosts polled on one event loop
+        client = SnmpClient(timeout=1, retries=2)
+        metrics = Metrics() if args.metrics else None
         # Example: Get sysDescr (1.3.6.1.2.1.1.1.0)
-        result = await snmp_devices.run(
-            task=snmp_get_task, oid="SNMPv2-MIB,sysDescr,0", community="public"
+        result = await run_async(
+            snmp_devices,
+            snmp_get_task,
+            oid="SNMPv2-MIB,sysDescr,0",
+            concurrency=100,
+            timeout=client.deadline(),
+            community="public",
+            client=client,
+            metrics=metrics,
         )
         for host_name, host_result in result.items():
             if host_result.failed:
                 logging.error(f"Result for {host_name}: {host_result.result}")
             else:
                 logging.info(f"Result for {host_name}:\n{host_result.result}")
+        client.log_stats()
+        client.close()
+        if metrics is not None:
+            metrics.log_summary()
+            metrics.write(args.metrics)
     else:
         logging.warning("No Cisco IOL devices found in inventory for SNMP GET.")
 
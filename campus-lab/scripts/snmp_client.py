@@ -0,0 +1,300 @@
+"""Long-lived SNMP client shared by the SNMP polling scripts."""
+
+import logging
+import time
+
+from pyasn1.type import univ
+from pysnmp.hlapi.v3arch.asyncio import (
+    CommunityData,
+    ContextData,
+    ObjectIdentity,
+    ObjectType,
+    SnmpEngine,
+    UdpTransportTarget,
+    bulk_cmd,
+    get_cmd,
+)
+from pysnmp.hlapi.varbinds import CommandGeneratorVarBinds
+from pysnmp.proto.rfc1902 import IpAddress
+from pysnmp.proto.rfc1905 import EndOfMibView, NoSuchInstance, NoSuchObject
+from pysnmp.smi.builder import MibBuilder
+from pysnmp.smi.view import MibViewController
+
+from oid_cache import OidCache, oid_label, parse_oid
+
+# Values an agent returns instead of data once a column is exhausted
+END_OF_COLUMN = (EndOfMibView, NoSuchInstance, NoSuchObject)
+
+
+def to_native(value):
+    """
+    Converts a pysnmp value to a plain Python value without going through prettyPrint.
+
+    Integers, counters, gauges and timeticks become int, IP addresses and OIDs become
+    dotted strings, printable octet strings become str and binary ones (e.g. MAC
+    addresses) a colon-separated hex string. Missing values become None.
+    """
+    if isinstance(value, univ.Integer):
+        return int(value)
+    if isinstance(value, IpAddress):
+        return ".".join(str(octet) for octet in value.asNumbers())
+    if isinstance(value, univ.OctetString):
+        raw = value.asOctets()
+        try:
+            text = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            text = None
+        if text is not None and text.isprintable():
+            return text
+        return ":".join(f"{octet:02x}" for octet in raw)
+    if isinstance(value, univ.ObjectIdentifier):
+        return ".".join(str(arc) for arc in value)
+    return None
+
+
+class SnmpClient:
+    """
+    Polls many devices through a single SnmpEngine.
+
+    The engine (and the MIB tree it loads) is created once per client, transports are
+    cached per (host, port) and community data per community string. Every GET issued
+    through the client reuses them instead of building and tearing down an engine.
+
+    Args:
+        port (int): The default SNMP port of the polled devices.
+        timeout (float): Seconds to wait for a response before retrying.
+        retries (int): Number of retries before giving up on a request.
+        oid_cache (OidCache, optional): Resolves OID strings to numeric OIDs. Defaults
+                                        to an OidCache backed by ".oid_cache.json".
+    """
+
+    def __init__(self, port=161, timeout=1, retries=5, oid_cache=None):
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.snmp_engine = SnmpEngine()
+        self.context = ContextData()
+        self.oid_cache = oid_cache or OidCache()
+        self._transports = {}
+        self._communities = {}
+        self._object_types = {}
+        self._labels = {}
+        self._label_view = None
+        self.polls = 0
+        self.started = time.monotonic()
+
+    async def transport(self, host, port=None):
+        """Returns the cached UDP transport for (host, port), creating it on first use."""
+        key = (host, port or self.port)
+        transport = self._transports.get(key)
+        if transport is None:
+            transport = await UdpTransportTarget.create(
+                key, timeout=self.timeout, retries=self.retries
+            )
+            self._transports[key] = transport
+        return transport
+
+    def community(self, community):
+        """Returns the cached SNMP v2c credentials for a community string."""
+        auth = self._communities.get(community)
+        if auth is None:
+            auth = CommunityData(community, mpModel=1)  # SNMP v2c
+            self._communities[community] = auth
+        return auth
+
+    def _mib_view_controller(self):
+        return CommandGeneratorVarBinds.get_mib_view_controller(self.snmp_engine.cache)
+
+    def object_types(self, oids):
+        """
+        Returns numeric ObjectType instances for OID strings.
+
+        Instances are built once per OID from its numeric form and reused by every
+        later poll. The MIB tree is only consulted for OIDs missing from the OID
+        cache; send the instances with lookup_mib=False and use label() for text.
+
+        Args:
+            oids (list): OID strings in "MIB,name,index" or dotted numeric form.
+
+        Returns:
+            list: One ObjectType per OID, in order.
+        """
+        missing = [oid for oid in oids if oid not in self._object_types]
+        if missing:
+            numeric_oids = self.oid_cache.cached(missing)
+            if numeric_oids is None:
+                numeric_oids = self.oid_cache.resolve(
+                    missing, self._mib_view_controller()
+                )
+            for oid, numeric_oid in zip(missing, numeric_oids):
+                self._object_types[oid] = ObjectType(ObjectIdentity(numeric_oid))
+        return [self._object_types[oid] for oid in oids]
+
+    def label(self, oid):
+        """
+        Returns the label of an OID string in text output, as pysnmp names it.
+
+        "MIB,name,index" strings are labelled without the MIB tree (e.g.
+        "SNMPv2-MIB::sysDescr.0"); numeric ones are looked up on first use in a MIB
+        view of their own (e.g. "SNMPv2-SMI::mib-2.1.1.0"), so the label does not
+        depend on which MIBs earlier requests loaded, and polls whose output is
+        typed never build it.
+
+        Args:
+            oid (str): An OID string in "MIB,name,index" or dotted numeric form.
+
+        Returns:
+            str: The label, cached for later polls.
+        """
+        label = self._labels.get(oid)
+        if label is None:
+            if len(parse_oid(oid)) == 3:
+                label = oid_label(oid)
+            else:
+                if self._label_view is None:
+                    self._label_view = MibViewController(MibBuilder())
+                label = (
+                    ObjectIdentity(oid).resolve_with_mib(self._label_view).prettyPrint()
+                )
+            self._labels[oid] = label
+        return label
+
+    async def get(
+        self, host, object_types, community="public", port=None, lookup_mib=True
+    ):
+        """
+        Performs an SNMP GET against a device.
+
+        Args:
+            host (str): The IP address or hostname of the device.
+            object_types (list): The ObjectType instances to retrieve.
+            community (str): The SNMP community string.
+            port (int, optional): The SNMP port, defaults to the client port.
+            lookup_mib (bool): Resolve response OIDs back to MIB names. Disable when
+                               the caller already knows what it asked for.
+
+        Returns:
+            tuple: (error_indication, error_status, error_index, var_binds) as returned by get_cmd.
+        """
+        transport = await self.transport(host, port)
+        result = await get_cmd(
+            self.snmp_engine,
+            self.community(community),
+            transport,
+            self.context,
+            *object_types,
+            lookupMib=lookup_mib,
+        )
+        self.polls += 1
+        return result
+
+    async def bulk_walk(
+        self,
+        host,
+        columns,
+        community="public",
+        max_repetitions=25,
+        port=None,
+        non_repeaters=(),
+    ):
+        """
+        Walks one or more table columns with GETBULK.
+
+        All columns are requested side by side, so a table with N rows takes about
+        N / max_repetitions round-trips instead of one GETNEXT per cell. Responses are
+        not resolved against the MIB tree.
+
+        Args:
+            host (str): The IP address or hostname of the device.
+            columns (list): Numeric column OIDs as tuples (e.g. (1, 3, 6, 1, 2, 1, 2, 2, 1, 2)).
+            community (str): The SNMP community string.
+            max_repetitions (int): Rows requested per column in each GETBULK.
+            port (int, optional): The SNMP port, defaults to the client port.
+            non_repeaters (list, optional): OIDs fetched with GETNEXT semantics as
+                                            GETBULK non-repeaters in every request,
+                                            e.g. sysUpTime (1, 3, 6, 1, 2, 1, 1, 3)
+                                            for sysUpTime.0.
+
+        Returns:
+            tuple: (error_indication, error_status, error_index, table) where table maps
+                   each column OID to a dict of {index suffix tuple: value}, and each
+                   non-repeater OID to a dict of {index suffix tuple: value} giving its
+                   value in the response that carried that row.
+        """
+        transport = await self.transport(host, port)
+        columns = [tuple(column) for column in columns]
+        non_repeaters = [tuple(oid) for oid in non_repeaters]
+        table = {oid: {} for oid in (*columns, *non_repeaters)}
+        pending = {column: column for column in columns}
+
+        while pending:
+            requested = list(pending)
+            error_indication, error_status, error_index, var_binds = await bulk_cmd(
+                self.snmp_engine,
+                self.community(community),
+                transport,
+                self.context,
+                len(non_repeaters),
+                max_repetitions,
+                *[ObjectType(ObjectIdentity(oid)) for oid in non_repeaters],
+                *[ObjectType(ObjectIdentity(pending[column])) for column in requested],
+                lookupMib=False,
+            )
+            self.polls += 1
+            if error_indication or error_status:
+                return error_indication, error_status, error_index, table
+
+            # Non-repeaters come first, then the rows, one varbind per requested column
+            scalars = [
+                (oid, value)
+                for oid, (_, value) in zip(non_repeaters, var_binds)
+                if not isinstance(value, END_OF_COLUMN)
+            ]
+            var_binds = var_binds[len(non_repeaters) :]
+            if not var_binds:
+                break
+
+            finished = set()
+            for position, (name, value) in enumerate(var_binds):
+                column = requested[position % len(requested)]
+                if column in finished:
+                    continue
+                oid = tuple(name)
+                if (
+                    isinstance(value, END_OF_COLUMN)
+                    or oid[: len(column)] != column
+                    or oid <= pending[column]
+                ):
+                    finished.add(column)
+                    continue
+                index = oid[len(column) :]
+                table[column][index] = value
+                for scalar, scalar_value in scalars:
+                    table[scalar][index] = scalar_value
+                pending[column] = oid
+
+            for column in finished:
+                del pending[column]
+
+        return None, 0, 0, table
+
+    def deadline(self):
+        """Returns the worst-case seconds a single request can take, retries included."""
+        return self.timeout * (self.retries + 1)
+
+    def polls_per_second(self):
+        """Returns the request rate achieved since the client was created."""
+        elapsed = time.monotonic() - self.started
+        return self.polls / elapsed if elapsed > 0 else 0.0
+
+    def log_stats(self):
+        """Logs how many requests the client issued and at which rate."""
+        logging.info(
+            f"SNMP client issued {self.polls} requests over {len(self._transports)} "
+            f"transports ({self.polls_per_second():.1f} polls/s)"
+        )
+
+    def close(self):
+        """Closes the engine dispatcher and drops the cached transports."""
+        self._transports.clear()
+        self.snmp_engine.close_dispatcher()
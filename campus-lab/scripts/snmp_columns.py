@@ -0,0 +1,82 @@
+"""Turns a poll cycle of typed SNMP results into per-OID NumPy columns."""
+
+import numpy as np
+
+
+def _column(values):
+    """Builds a masked array from one OID's values across hosts (None = missing)."""
+    mask = np.fromiter(
+        (value is None for value in values), dtype=bool, count=len(values)
+    )
+    present = [value for value in values if value is not None]
+
+    if present and all(isinstance(value, int) for value in present):
+        dtype = np.uint64 if min(present) >= 0 else np.int64
+        data = np.fromiter(
+            (0 if value is None else value for value in values),
+            dtype=dtype,
+            count=len(values),
+        )
+    else:
+        data = np.array(["" if value is None else str(value) for value in values])
+
+    return np.ma.masked_array(data, mask=mask)
+
+
+def to_columns(results, oids):
+    """
+    Converts typed SNMP results into one column per OID across all hosts.
+
+    Integer OIDs (counters, gauges, timeticks) become uint64/int64 arrays, everything
+    else a fixed-width string array. Hosts that failed or lack an OID are masked, so
+    aggregations such as ``columns[oid].sum()`` skip them without any per-row objects.
+
+    Args:
+        results (nornir.core.task.AggregatedResult): Results of a task run with
+                                                     ``output="typed"``.
+        oids (list): The OID strings that were polled.
+
+    Returns:
+        dict: "host" mapped to an array of host names and every OID mapped to a
+              numpy.ma.MaskedArray, all in the same host order.
+    """
+    host_names = list(results)
+    rows = [
+        {} if results[host_name].failed else results[host_name].result
+        for host_name in host_names
+    ]
+
+    columns = {"host": np.array(host_names)}
+    for oid in oids:
+        columns[oid] = _column([row.get(oid) for row in rows])
+    return columns
+
+
+def to_structured_array(columns):
+    """
+    Packs columns from to_columns into a single NumPy structured array.
+
+    Masked entries are filled with 0 or an empty string; a "<oid>_valid" boolean field
+    per OID records which ones are real values.
+
+    Args:
+        columns (dict): The output of to_columns.
+
+    Returns:
+        numpy.ndarray: One record per host.
+    """
+    fields = [("host", columns["host"].dtype)]
+    for oid, column in columns.items():
+        if oid == "host":
+            continue
+        fields.append((oid, column.dtype))
+        fields.append((f"{oid}_valid", bool))
+
+    records = np.zeros(len(columns["host"]), dtype=fields)
+    records["host"] = columns["host"]
+    for oid, column in columns.items():
+        if oid == "host":
+            continue
+        records[oid] = column.filled(column.dtype.type())
+        records[f"{oid}_valid"] = ~np.ma.getmaskarray(column)
+    return records
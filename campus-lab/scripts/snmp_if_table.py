@@ -0,0 +1,137 @@
+"""Collects interface counters from ifTable/ifXTable using SNMP GETBULK."""
+
+import asyncio
+import logging
+
+from nornir.core.task import Result
+
+from async_runner import run_async
+from lab_nornir import init_nornir
+from snmp_client import SnmpClient, to_native
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# IF-MIB columns, indexed by ifIndex
+IF_TABLE_COLUMNS = {
+    "ifDescr": (1, 3, 6, 1, 2, 1, 2, 2, 1, 2),
+    "ifOperStatus": (1, 3, 6, 1, 2, 1, 2, 2, 1, 8),
+    "ifInDiscards": (1, 3, 6, 1, 2, 1, 2, 2, 1, 13),
+    "ifInErrors": (1, 3, 6, 1, 2, 1, 2, 2, 1, 14),
+    "ifOutDiscards": (1, 3, 6, 1, 2, 1, 2, 2, 1, 19),
+    "ifOutErrors": (1, 3, 6, 1, 2, 1, 2, 2, 1, 20),
+    "ifName": (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 1),
+    "ifHCInOctets": (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 6),
+    "ifHCOutOctets": (1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 10),
+}
+
+
+async def snmp_interface_counters_task(
+    task, columns=None, community="public", max_repetitions=25, client=None
+):
+    """
+    Nornir task to walk interface table columns with SNMP GETBULK.
+
+    Args:
+        task (nornir.core.task.Task): The Nornir task object.
+        columns (dict, optional): Column names mapped to numeric column OIDs.
+                                  Defaults to IF_TABLE_COLUMNS.
+        community (str): The SNMP community string.
+        max_repetitions (int): Rows requested per column in each GETBULK.
+        client (SnmpClient, optional): A shared SNMP client. If None, a client is
+                                       created for this call and closed afterwards.
+
+    Returns:
+        nornir.core.task.Result: Rows keyed by ifIndex, e.g.
+                                 {1: {"ifName": "Et0/0", "ifHCInOctets": 1234, ...}}.
+    """
+    if columns is None:
+        columns = IF_TABLE_COLUMNS
+
+    logging.info(
+        f"Attempting SNMP GETBULK of {len(columns)} interface columns on "
+        f"{task.host.name} ({task.host.hostname})"
+    )
+    own_client = client is None
+    if own_client:
+        client = SnmpClient()
+
+    try:
+        error_indication, error_status, error_index, table = await client.bulk_walk(
+            task.host.hostname,
+            list(columns.values()),
+            community=community,
+            max_repetitions=max_repetitions,
+        )
+
+        if error_indication:
+            error_message = f"Error: {error_indication}"
+            logging.error(f"❌ {task.host.name}: {error_message}")
+            return Result(host=task.host, result=error_message, failed=True)
+        if error_status:
+            error_message = (
+                f"SNMP Error: {error_status.prettyPrint()} at index {error_index}"
+            )
+            logging.error(f"❌ {task.host.name}: {error_message}")
+            return Result(host=task.host, result=error_message, failed=True)
+
+        rows = {}
+        for name, column in columns.items():
+            for index, value in table[tuple(column)].items():
+                rows.setdefault(index[0], {})[name] = to_native(value)
+
+        logging.info(
+            f"✅ {task.host.name}: SNMP GETBULK successful for {len(rows)} interfaces."
+        )
+        return Result(host=task.host, result=rows)
+    except Exception as e:
+        error_message = f"An unexpected error occurred: {e}"
+        logging.error(f"❌ {task.host.name}: {error_message}")
+        return Result(host=task.host, result=error_message, failed=True)
+    finally:
+        if own_client:
+            client.close()
+
+
+async def main_async():
+    logging.info("Starting SNMP Interface Counter Collection....")
+    logging.info("=" * 40)
+    nr = init_nornir()
+
+    # Filter to only run on devices where SNMP is expected to be enabled (e.g., Cisco IOL)
+    snmp_devices = nr.filter(platform="cisco_iol")
+
+    if snmp_devices.inventory.hosts:
+        client = SnmpClient(timeout=1, retries=2)
+        result = await run_async(
+            snmp_devices,
+            snmp_interface_counters_task,
+            concurrency=100,
+            community="public",
+            max_repetitions=25,
+            client=client,
+        )
+        for host_name, host_result in result.items():
+            if host_result.failed:
+                logging.error(f"Result for {host_name}: {host_result.result}")
+                continue
+            logging.info(f"Result for {host_name}:")
+            for if_index, row in sorted(host_result.result.items()):
+                logging.info(
+                    f"  {if_index:>4} {row.get('ifName') or row.get('ifDescr')}: "
+                    f"in={row.get('ifHCInOctets')} out={row.get('ifHCOutOctets')} "
+                    f"errors={row.get('ifInErrors')}/{row.get('ifOutErrors')} "
+                    f"discards={row.get('ifInDiscards')}/{row.get('ifOutDiscards')}"
+                )
+        client.log_stats()
+        client.close()
+    else:
+        logging.warning(
+            "No Cisco IOL devices found in inventory for SNMP interface counters."
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
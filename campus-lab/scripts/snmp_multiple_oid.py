@@ -1,19 +1,17 @@
 """Retrieves multiple SNMP OIDs from network devices using Nornir and pysnmp."""
 
+import argparse
 import asyncio
 import logging
 
-from nornir import InitNornir
+import numpy as np
 from nornir.core.task import Result
-from pysnmp.hlapi.v3arch.asyncio import (
-    CommunityData,
-    ContextData,
-    ObjectIdentity,
-    ObjectType,
-    SnmpEngine,
-    UdpTransportTarget,
-    get_cmd,
-)
+
+from async_runner import run_async
+from lab_nornir import init_nornir
+from metrics import Metrics, span
+from snmp_client import SnmpClient, to_native
+from snmp_columns import to_columns, to_structured_array
 
 # Configure logging
 logging.basicConfig(
@@ -21,7 +19,9 @@ logging.basicConfig(
 )
 
 
-async def snmp_get_multiple_oids_task(task, oids, community="public"):
+async def snmp_get_multiple_oids_task(
+    task, oids, community="public", client=None, output="text", metrics=None
+):
     """
     Nornir task to perform an SNMP GET operation for multiple OIDs.
 
@@ -29,6 +29,11 @@ async def snmp_get_multiple_oids_task(task, oids, community="public"):
         task (nornir.core.task.Task): The Nornir task object.
         oids (list): A list of OID strings to retrieve (e.g., ["SNMPv2-MIB,sysDescr,0", "SNMPv2-MIB,sysName,0"]).
         community (str): The SNMP community string.
+        client (SnmpClient, optional): A shared SNMP client. If None, a client is
+                                       created for this call and closed afterwards.
+        output (str): "text" for newline-joined "oid = value" lines, or "typed" for a
+                      dict of OID string to native value (int, str or None).
+        metrics (Metrics, optional): Records the SNMP round trip as "snmp_get".
 
     Returns:
         nornir.core.task.Result: The result of the SNMP GET operation.
@@ -36,36 +41,19 @@ async def snmp_get_multiple_oids_task(task, oids, community="public"):
     logging.info(
         f"Attempting SNMP GET for multiple OIDs on {task.host.name} ({task.host.hostname})"
     )
-    snmp_engine = SnmpEngine()
+    own_client = client is None
+    if own_client:
+        client = SnmpClient()
 
     try:
-        transport = await UdpTransportTarget.create((task.host.hostname, 161))
-
-        object_types = []
-        for oid_str in oids:
-            oid_parts = oid_str.split(",")
-            if len(oid_parts) == 3:
-                object_types.append(
-                    ObjectType(
-                        ObjectIdentity(
-                            oid_parts[0].strip(),
-                            oid_parts[1].strip(),
-                            int(oid_parts[2].strip()),
-                        )
-                    )
-                )
-            else:
-                object_types.append(
-                    ObjectType(ObjectIdentity(oid_str))
-                )  # Assume it's a full OID string
-
-        result = await get_cmd(
-            snmp_engine,
-            CommunityData(community, mpModel=1),  # SNMP v2c
-            transport,
-            ContextData(),
-            *object_types,
-        )
+        # OIDs are resolved once per client, polls only reuse the numeric varbinds
+        with span(metrics, task.host.name, "snmp_get_multiple_oids_task", "snmp_get"):
+            result = await client.get(
+                task.host.hostname,
+                client.object_types(oids),
+                community=community,
+                lookup_mib=False,
+            )
 
         error_indication, error_status, error_index, var_binds = result
 
@@ -79,9 +67,13 @@ async def snmp_get_multiple_oids_task(task, oids, community="public"):
             )
             logging.error(f"❌ {task.host.name}: {error_message}")
             return Result(host=task.host, result=error_message, failed=True)
-        output = "\n".join([
-            " = ".join([x.prettyPrint() for x in var_bind]) for var_bind in var_binds
-        ])
+        if output == "typed":
+            output = {oid: to_native(value) for oid, (_, value) in zip(oids, var_binds)}
+        else:
+            output = "\n".join([
+                f"{client.label(oid)} = {value.prettyPrint()}"
+                for oid, (_, value) in zip(oids, var_binds)
+            ])
         logging.info(f"✅ {task.host.name}: SNMP GET successful for multiple OIDs.")
         return Result(host=task.host, result=output)
     except Exception as e:
@@ -89,31 +81,80 @@ async def snmp_get_multiple_oids_task(task, oids, community="public"):
         logging.error(f"❌ {task.host.name}: {error_message}")
         return Result(host=task.host, result=error_message, failed=True)
     finally:
-        snmp_engine.close_dispatcher()
+        if own_client:
+            client.close()
 
 
 async def main_async():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--output",
+        choices=("text", "typed", "columns"),
+        default="text",
+        help="Log each host's values as text, as typed values, or one column per "
+        "OID across hosts (default: text)",
+    )
+    parser.add_argument(
+        "--save",
+        metavar="FILE",
+        help="With --output columns, also write the columns to FILE as a NumPy "
+        "structured array (.npy)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PREFIX",
+        help="Write phase timings to PREFIX.prom and PREFIX.trace.json",
+    )
+    args = parser.parse_args()
+    if args.save and args.output != "columns":
+        parser.error("--save requires --output columns")
+
     logging.info("Starting SNMP GET Multiple OIDs Operation....")
     logging.info("=" * 40)
-    nr = InitNornir(config_file="config.yaml")
+    nr = init_nornir()
 
     # Filter to only run on devices where SNMP is expected to be enabled (e.g., Cisco IOL)
     snmp_devices = nr.filter(platform="cisco_iol")
 
     if snmp_devices.inventory.hosts:
+        # One engine and one transport per device, all hosts polled on one event loop
+        client = SnmpClient(timeout=1, retries=2)
+        metrics = Metrics() if args.metrics else None
         oids_to_get = [
             "SNMPv2-MIB,sysDescr,0",
             "SNMPv2-MIB,sysName,0",
             "SNMPv2-MIB,sysUpTime,0",
         ]
-        result = await snmp_devices.run(
-            task=snmp_get_multiple_oids_task, oids=oids_to_get, community="public"
+        result = await run_async(
+            snmp_devices,
+            snmp_get_multiple_oids_task,
+            oids=oids_to_get,
+            concurrency=100,
+            timeout=client.deadline(),
+            community="public",
+            client=client,
+            metrics=metrics,
+            # Columns are built from the typed values
+            output="text" if args.output == "text" else "typed",
         )
         for host_name, host_result in result.items():
             if host_result.failed:
                 logging.error(f"Result for {host_name}: {host_result.result}")
-            else:
+            elif args.output != "columns":
                 logging.info(f"Result for {host_name}:\n{host_result.result}")
+        if args.output == "columns":
+            columns = to_columns(result, oids_to_get)
+            logging.info(f"Hosts: {columns['host']}")
+            for oid in oids_to_get:
+                logging.info(f"{oid}: {columns[oid]}")
+            if args.save:
+                np.save(args.save, to_structured_array(columns))
+                logging.info(f"✅ Columns written to {args.save}")
+        client.log_stats()
+        client.close()
+        if metrics is not None:
+            metrics.log_summary()
+            metrics.write(args.metrics)
     else:
         logging.warning(
             "No Cisco IOL devices found in inventory for SNMP GET Multiple OIDs."
@@ -0,0 +1,233 @@
+"""Polls interface counters on a schedule and reports per-second rates."""
+
+import asyncio
+import logging
+
+import numpy as np
+from nornir.core.task import Result
+
+from async_runner import run_async
+from counter_rates import CounterRates
+from lab_nornir import init_nornir
+from snmp_client import SnmpClient
+from snmp_if_table import IF_TABLE_COLUMNS
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# Counters turned into rates, with their SNMP counter width
+RATE_COUNTERS = {
+    "ifHCInOctets": 64,
+    "ifHCOutOctets": 64,
+    "ifInErrors": 32,
+    "ifOutErrors": 32,
+    "ifInDiscards": 32,
+    "ifOutDiscards": 32,
+}
+
+# sysUpTime, fetched as a GETBULK non-repeater (sysUpTime.0) in every request of
+# the walk, so each row is stamped with the uptime of the response that carried it
+SYS_UPTIME = (1, 3, 6, 1, 2, 1, 1, 3)
+
+RATE_COLUMNS = {name: IF_TABLE_COLUMNS[name] for name in RATE_COUNTERS}
+
+
+async def snmp_counter_arrays_task(
+    task, community="public", max_repetitions=25, client=None
+):
+    """
+    Nornir task to walk the RATE_COUNTERS columns into arrays.
+
+    Args:
+        task (nornir.core.task.Task): The Nornir task object.
+        community (str): The SNMP community string.
+        max_repetitions (int): Rows requested per column in each GETBULK.
+        client (SnmpClient, optional): A shared SNMP client. If None, a client is
+                                       created for this call and closed afterwards.
+
+    Returns:
+        nornir.core.task.Result: A dict with "if_index" (sorted uint64 array),
+                                 "samples" (uint64 masked array of shape
+                                 (interfaces, len(RATE_COUNTERS)), masked where a
+                                 counter was not returned) and "uptimes" (uint64
+                                 sysUpTime of each row).
+    """
+    own_client = client is None
+    if own_client:
+        client = SnmpClient()
+
+    try:
+        error_indication, error_status, error_index, table = await client.bulk_walk(
+            task.host.hostname,
+            list(RATE_COLUMNS.values()),
+            community=community,
+            max_repetitions=max_repetitions,
+            non_repeaters=[SYS_UPTIME],
+        )
+        if error_indication:
+            error_message = f"Error: {error_indication}"
+            logging.error(f"❌ {task.host.name}: {error_message}")
+            return Result(host=task.host, result=error_message, failed=True)
+        if error_status:
+            error_message = (
+                f"SNMP Error: {error_status.prettyPrint()} at index {error_index}"
+            )
+            logging.error(f"❌ {task.host.name}: {error_message}")
+            return Result(host=task.host, result=error_message, failed=True)
+
+        def index_array(cells):
+            return np.fromiter(
+                (index[0] for index in cells), dtype=np.uint64, count=len(cells)
+            )
+
+        def value_array(cells):
+            return np.fromiter(
+                (int(value) for value in cells.values()),
+                dtype=np.uint64,
+                count=len(cells),
+            )
+
+        columns = [table[tuple(column)] for column in RATE_COLUMNS.values()]
+        if_index = np.unique(np.concatenate([index_array(cells) for cells in columns]))
+        samples = np.ma.masked_all((len(if_index), len(columns)), dtype=np.uint64)
+        for position, cells in enumerate(columns):
+            rows = np.searchsorted(if_index, index_array(cells))
+            samples[rows, position] = value_array(cells)
+
+        # Every row came with at least one counter, and so with a sysUpTime
+        stamps = table[SYS_UPTIME]
+        if len(stamps) < len(if_index):
+            error_message = "No sysUpTime returned"
+            logging.error(f"❌ {task.host.name}: {error_message}")
+            return Result(host=task.host, result=error_message, failed=True)
+        uptimes = np.empty(len(if_index), dtype=np.uint64)
+        uptimes[np.searchsorted(if_index, index_array(stamps))] = value_array(stamps)
+
+        logging.info(
+            f"✅ {task.host.name}: SNMP GETBULK successful for {len(if_index)} interfaces."
+        )
+        return Result(
+            host=task.host,
+            result={"if_index": if_index, "samples": samples, "uptimes": uptimes},
+        )
+    except Exception as e:
+        error_message = f"An unexpected error occurred: {e}"
+        logging.error(f"❌ {task.host.name}: {error_message}")
+        return Result(host=task.host, result=error_message, failed=True)
+    finally:
+        if own_client:
+            client.close()
+
+
+def poll_to_arrays(result):
+    """
+    Concatenates the per-host arrays of a poll cycle into the arrays CounterRates expects.
+
+    Args:
+        result (nornir.core.task.AggregatedResult): Results of snmp_counter_arrays_task.
+
+    Returns:
+        tuple: (hosts, if_indexes, samples, uptimes) covering every interface of every
+               host that answered; samples is masked where a counter was missing.
+    """
+    polled = [
+        (host_name, host_result.result)
+        for host_name, host_result in result.items()
+        if not host_result.failed
+    ]
+    if not polled:
+        return (
+            np.empty(0, dtype=object),
+            np.empty(0, dtype=np.uint64),
+            np.ma.masked_all((0, len(RATE_COUNTERS)), dtype=np.uint64),
+            np.empty(0, dtype=np.uint64),
+        )
+    return (
+        np.repeat(
+            np.array([host_name for host_name, _ in polled], dtype=object),
+            [len(arrays["if_index"]) for _, arrays in polled],
+        ),
+        np.concatenate([arrays["if_index"] for _, arrays in polled]),
+        np.ma.concatenate([arrays["samples"] for _, arrays in polled]),
+        np.concatenate([arrays["uptimes"] for _, arrays in polled]),
+    )
+
+
+async def poll_rates(nr, client, rates, community="public"):
+    """
+    Runs one poll cycle and returns the rates since the previous cycle.
+
+    Args:
+        nr (nornir.core.Nornir): The Nornir object to poll.
+        client (SnmpClient): The shared SNMP client.
+        rates (CounterRates): The store holding the previous samples.
+        community (str): The SNMP community string.
+
+    Returns:
+        tuple: (hosts, if_indexes, rate array) for the interfaces polled this cycle.
+    """
+    result = await run_async(
+        nr,
+        snmp_counter_arrays_task,
+        concurrency=100,
+        community=community,
+        client=client,
+    )
+    hosts, if_indexes, samples, uptimes = poll_to_arrays(result)
+    return hosts, if_indexes, rates.update(hosts, if_indexes, samples, uptimes)
+
+
+async def main_async(interval=60, cycles=None):
+    logging.info("Starting SNMP Interface Rate Polling....")
+    logging.info("=" * 40)
+    nr = init_nornir()
+
+    # Filter to only run on devices where SNMP is expected to be enabled (e.g., Cisco IOL)
+    snmp_devices = nr.filter(platform="cisco_iol")
+
+    if not snmp_devices.inventory.hosts:
+        logging.warning("No Cisco IOL devices found in inventory for SNMP rates.")
+        return
+
+    client = SnmpClient(timeout=1, retries=2)
+    rates = CounterRates(RATE_COUNTERS, widths=RATE_COUNTERS)
+    cycle = 0
+    try:
+        while cycles is None or cycle < cycles:
+            hosts, if_indexes, cycle_rates = await poll_rates(
+                snmp_devices, client, rates
+            )
+            cycle += 1
+            # Rows ranked by traffic need both octet rates, error counters may be missing
+            known = ~np.isnan(cycle_rates[:, :2]).any(axis=1)
+            if not known.any():
+                logging.info(
+                    f"Cycle {cycle}: stored {len(hosts)} interface samples, "
+                    f"rates available after the next poll."
+                )
+            else:
+                bits_per_second = (cycle_rates[:, 0] + cycle_rates[:, 1]) * 8
+                busiest = np.argsort(np.where(known, bits_per_second, -1))[::-1][:10]
+                logging.info(
+                    f"Cycle {cycle}: rates for {int(known.sum())}/{len(hosts)} interfaces"
+                )
+                for row in busiest:
+                    if not known[row]:
+                        break
+                    in_errors, out_errors = cycle_rates[row, 2], cycle_rates[row, 3]
+                    logging.info(
+                        f"  {hosts[row]} ifIndex {if_indexes[row]}: "
+                        f"{bits_per_second[row] / 1e6:.2f} Mbit/s, "
+                        f"errors {in_errors:.2f}/{out_errors:.2f} per s"
+                    )
+            if cycles is None or cycle < cycles:
+                await asyncio.sleep(interval)
+    finally:
+        client.log_stats()
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
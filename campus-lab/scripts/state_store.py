@@ -0,0 +1,109 @@
+"""Small JSON index remembering what was last pushed to and fetched from each host."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from config_diff import IGNORED_PREFIXES
+
+DEFAULT_STATE_FILE = ".config_state.json"
+
+
+def config_hash(text):
+    """
+    Returns a SHA-256 hash of a configuration, ignoring comments and volatile headers.
+
+    Lines such as "! Last configuration change at ..." or "Current configuration :
+    N bytes" change without any configuration change, so they do not count.
+    """
+    digest = hashlib.sha256()
+    for line in text.splitlines():
+        line = line.rstrip()
+        if line and not line.lstrip().startswith(IGNORED_PREFIXES):
+            digest.update(line.encode())
+            digest.update(b"\n")
+    return digest.hexdigest()
+
+
+class StateStore:
+    """
+    Per-host hashes of the last pushed intended config and last fetched running config.
+
+    Updates are kept in memory and written with save(), so many Nornir threads can
+    record state without rewriting the file for every host.
+
+    Args:
+        path (str): The JSON file holding the index.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self._hosts = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable state file {path}: {e}")
+
+    def get(self, host_name, key):
+        """Returns a recorded value for a host, or None."""
+        with self._lock:
+            return self._hosts.get(host_name, {}).get(key)
+
+    def update(self, host_name, **values):
+        """Records values for a host."""
+        with self._lock:
+            self._hosts.setdefault(host_name, {}).update(values)
+            self._dirty = True
+
+    def record_push(self, host_name, intended_hash):
+        """
+        Records a successful push.
+
+        The running config changed with the push, so the next fetched running config
+        becomes the new baseline to detect drift against.
+        """
+        self.update(host_name, pushed=intended_hash, running_baseline=None)
+
+    def record_fetch(self, host_name, running_hash):
+        """Records a fetched running config, adopting it as baseline after a push."""
+        with self._lock:
+            state = self._hosts.setdefault(host_name, {})
+            state["running"] = running_hash
+            if state.get("pushed") and state.get("running_baseline") is None:
+                state["running_baseline"] = running_hash
+            self._dirty = True
+
+    def in_sync(self, host_name, intended_hash):
+        """
+        Returns True if pushing the intended config to a host would change nothing.
+
+        That is the case when the intended config is the one last pushed and the last
+        fetched running config still matches the one fetched after that push.
+        """
+        with self._lock:
+            state = self._hosts.get(host_name, {})
+            return (
+                state.get("pushed") == intended_hash
+                and state.get("running") is not None
+                and state.get("running") == state.get("running_baseline")
+            )
+
+    def save(self):
+        """Writes the index to disk if anything changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_file = f"{self.path}.tmp"
+            try:
+                with open(tmp_file, "w") as f:
+                    json.dump(self._hosts, f, indent=2, sort_keys=True)
+                os.replace(tmp_file, self.path)
+                self._dirty = False
+            except OSError as e:
+                logging.warning(f"Could not write state file {self.path}: {e}")
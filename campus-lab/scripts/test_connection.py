@@ -1,59 +1,124 @@
 """Tests connectivity to ContainerLab devices and retrieves interface status."""
 
+import argparse
 import logging
-import os
+import re
 import sys
 
-from nornir import InitNornir
-from nornir_netmiko.tasks import netmiko_send_command
+from nornir.core.task import Result
 from nornir_utils.plugins.functions import print_result
 
+import cpu_pool
+from command_parser import parse_many, records
+from icmp_sweep import ping_sweep
+from lab_nornir import init_nornir
+from metrics import Metrics, connect, span
+from platforms import is_supported
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
 
-def test_icmp_reachability(nr):
-    """Tests ICMP connectivity to all hosts in the Nornir inventory."""
+def test_icmp_reachability(nr, workers=64, count=1, timeout=2):
+    """
+    Tests ICMP connectivity to all hosts in the Nornir inventory.
+
+    Hosts are pinged concurrently, so an unreachable inventory costs about one
+    timeout in total rather than one timeout per host.
+
+    Args:
+        nr (nornir.core.Nornir): The Nornir object whose hosts are pinged.
+        workers (int): Maximum number of hosts pinged at once.
+        count (int): Echo requests per host.
+        timeout (float): Seconds to wait for each reply.
+
+    Returns:
+        list: Names of the hosts that answered at least one echo request.
+    """
     logging.info("Testing ICMP connectivity to all hosts in inventory")
     reachable_hosts = []
 
-    for host in nr.inventory.hosts.values():
-        # Using os.system for ping for simplicity in a lab environment
-        response = os.system(f"ping -c 1 -W 2 {host.hostname} > /dev/null 2>&1")
+    hosts = list(nr.inventory.hosts.values())
+    results = ping_sweep(
+        [host.hostname for host in hosts], workers=workers, count=count, timeout=timeout
+    )
 
-        if response == 0:
+    for host in hosts:
+        result = results[host.hostname]
+        if result.reachable:
             reachable_hosts.append(host.name)
-            logging.info(f"{host.name} ({host.hostname}): Reachable")
+            logging.info(
+                f"{host.name} ({host.hostname}): Reachable "
+                f"(rtt {result.avg_rtt:.2f} ms, loss {result.loss:.0%})"
+            )
         else:
             logging.warning(f"{host.name} ({host.hostname}): Unreachable")
 
     return reachable_hosts
 
 
-def get_device_interface_status(task):
+def collect_commands(task, commands, use_textfsm=True, read_timeout=30, metrics=None):
+    """
+    Runs several show commands over one Netmiko session.
+
+    The prompt is read once and passed as expect_string, so each command returns as
+    soon as the prompt comes back instead of Netmiko looking the prompt up again
+    before every command.
+
+    Args:
+        task (nornir.core.task.Task): The Nornir task object.
+        commands (list): The show commands to run.
+        use_textfsm (bool): If True, parse outputs with the ntc-templates TextFSM
+                            templates (see command_parser.py).
+        read_timeout (float): Maximum seconds to wait for the output of one command.
+        metrics (Metrics, optional): Records connect, command and parse timings.
+
+    Returns:
+        Result: Each command mapped to its parsed records (list of dicts), or to the
+                raw output if it was not parsed.
+    """
+    connect(task, metrics=metrics)
+    connection = task.host.get_connection("netmiko", task.nornir.config)
+    platform = task.host.get_connection_parameters("netmiko").platform
+    prompt = re.escape(connection.find_prompt())
+
+    outputs = {}
+    for command in commands:
+        with span(
+            metrics, task.host.name, task.name, "command", command=command
+        ) as phase:
+            outputs[command] = connection.send_command(
+                command, expect_string=prompt, read_timeout=read_timeout
+            )
+            phase["bytes"] = len(outputs[command])
+    if use_textfsm:
+        # All outputs of the device go to a worker process in one submission
+        with span(metrics, task.host.name, task.name, "parse", commands=len(outputs)):
+            parsed = cpu_pool.run(parse_many, platform, list(outputs.items()))
+        for command, rows in zip(list(outputs), parsed):
+            if rows is not None:
+                outputs[command] = records(rows)
+    return Result(host=task.host, result=outputs)
+
+
+def get_device_interface_status(task, metrics=None):
     """Retrieves and prints interface status for a network device."""
-    # Containerlab → Netmiko platform mapping
-    platform_map = {"arista_ceos": "arista_eos", "cisco_iol": "cisco_ios"}
-    raw_platform = task.host.get("platform")
-
     # Skip unsupported platforms
-    if raw_platform not in platform_map:
+    if not is_supported(task.host):
         logging.warning(
-            f"[SKIPPED] {task.host.name}: Unsupported platform '{raw_platform}'"
+            f"[SKIPPED] {task.host.name}: Unsupported platform '{task.host.platform}'"
         )
         return
 
-    # Set platform to Netmiko-compatible value
-    task.host.platform = platform_map[raw_platform]
-
     logging.info(f"Retrieving interface status for {task.host.name}")
     try:
         result = task.run(
-            task=netmiko_send_command,
-            command_string="show ip interface brief",
+            task=collect_commands,
+            commands=["show ip interface brief"],
             use_textfsm=False,
+            metrics=metrics,
             severity_level=logging.DEBUG,  # Set severity for task results
         )
         print_result(result)
@@ -61,10 +126,53 @@ def get_device_interface_status(task):
         logging.error(f"Error retrieving interface status for {task.host.name}: {e}")
 
 
+def get_device_health(task, metrics=None):
+    """Collects and parses the platform's health check commands for a device."""
+    commands = task.host.get("health_commands")
+    if not commands:
+        logging.warning(
+            f"[SKIPPED] {task.host.name}: Unsupported platform '{task.host.platform}'"
+        )
+        return
+
+    logging.info(f"Collecting {len(commands)} health commands from {task.host.name}")
+    try:
+        result = task.run(
+            task=collect_commands,
+            commands=commands,
+            metrics=metrics,
+            severity_level=logging.DEBUG,
+        )
+        print_result(result)
+        return result[0].result
+    except Exception as e:
+        logging.error(f"Error collecting health data from {task.host.name}: {e}")
+
+
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--health",
+        action="store_true",
+        help="Collect and parse the full set of health check commands",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PREFIX",
+        help="Write phase timings to PREFIX.prom and PREFIX.trace.json",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Parse command output in this many worker processes (default: 0, inline)",
+    )
+    args = parser.parse_args()
+
     logging.info("Starting Connectivity Validation Test....")
     logging.info("=" * 40)
-    nr = InitNornir(config_file="config.yaml")
+    cpu_pool.start(args.processes)
+    nr = init_nornir()
 
     # test ICMP connectivity
     icmp_reachable_hosts = test_icmp_reachability(nr)
@@ -74,7 +182,14 @@ def main():
         # Filter Nornir inventory to only include reachable hosts for further tests
         nr_reachable = nr.filter(name=icmp_reachable_hosts)
         # test device management connectivity
-        nr_reachable.run(task=get_device_interface_status)
+        metrics = Metrics() if args.metrics else None
+        if args.health:
+            nr_reachable.run(task=get_device_health, metrics=metrics)
+        else:
+            nr_reachable.run(task=get_device_interface_status, metrics=metrics)
+        if metrics is not None:
+            metrics.log_summary()
+            metrics.write(args.metrics)
     else:
         logging.error("No devices reachable - check routing configuration")
         sys.exit(1)
@@ -0,0 +1,132 @@
+"""Runs test → push → enable SNMP → fetch over one set of pooled device connections."""
+
+import argparse
+import logging
+import time
+
+import cpu_pool
+from config_archive import ConfigArchive
+from enable_snmp import configure_snmp, render_snmp_configs
+from fetch_configs import gather_device_data
+from lab_nornir import init_nornir
+from metrics import Metrics
+from platforms import is_supported
+from push_configs import push_host_config
+from session_pool import SessionPool
+from state_store import StateStore
+from test_connection import get_device_interface_status, test_icmp_reachability
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+
+def run_workflow(nr, state=None, archive=None, metrics=None):
+    """
+    Runs the lab workflow once against every reachable, supported device.
+
+    Each step runs on the same Nornir object, so a device is logged into once per
+    connection type and the open sessions are reused by the following steps.
+
+    Args:
+        nr (nornir.core.Nornir): The Nornir object holding the pooled connections.
+        state (StateStore, optional): Skips pushes and file writes for unchanged configs.
+        archive (ConfigArchive, optional): Keeps a history of the fetched configs.
+        metrics (Metrics, optional): Records the phase timings of every step.
+    """
+    reachable_hosts = test_icmp_reachability(nr)
+    if not reachable_hosts:
+        logging.error("No devices reachable - check routing configuration")
+        return
+
+    supported_hosts = nr.filter(name=reachable_hosts).filter(filter_func=is_supported)
+    if not supported_hosts.inventory.hosts:
+        logging.warning("No supported devices reachable for the workflow.")
+        return
+
+    logging.info("Step 1/4: Interface status")
+    supported_hosts.run(task=get_device_interface_status, metrics=metrics)
+
+    logging.info("Step 2/4: Configuration push")
+    supported_hosts.run(
+        task=push_host_config, config_dir="configs", state=state, metrics=metrics
+    )
+
+    logging.info("Step 3/4: SNMP configuration")
+    snmp_configs = render_snmp_configs(supported_hosts)
+    supported_hosts.run(task=configure_snmp, snmp_configs=snmp_configs, metrics=metrics)
+
+    logging.info("Step 4/4: Configuration backup")
+    supported_hosts.run(
+        task=gather_device_data,
+        getters=["config"],
+        save_to_file=True,
+        output_dir="fetched_configs",
+        state=state,
+        archive=archive,
+        metrics=metrics,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0,
+        help="Seconds between workflow runs; 0 runs once and exits (default: 0)",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=300,
+        help="Close connections unused for this many seconds (default: 300)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PREFIX",
+        help="Write phase timings to PREFIX.prom and PREFIX.trace.json",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=0,
+        help="Worker processes for parsing, diffing and rendering (default: 0, inline)",
+    )
+    args = parser.parse_args()
+
+    logging.info("Starting Lab Workflow....")
+    logging.info("=" * 40)
+    cpu_pool.start(args.processes)
+    pool = SessionPool(idle_timeout=args.idle_timeout)
+    state = StateStore()
+    archive = ConfigArchive("config_archive")
+    nr = init_nornir().with_processors([pool])
+
+    try:
+        while True:
+            # A fresh Metrics per cycle, so a long-running loop does not keep
+            # every span it ever recorded
+            metrics = Metrics() if args.metrics else None
+            run_workflow(nr, state=state, archive=archive, metrics=metrics)
+            # Give hosts that failed a step another chance in the next cycle
+            nr.data.reset_failed_hosts()
+            state.save()
+            pool.log_stats(nr)
+            if metrics is not None:
+                # Rewritten every cycle with that cycle's timings
+                metrics.log_summary()
+                metrics.write(args.metrics)
+            if not args.interval:
+                break
+            time.sleep(args.interval)
+            pool.evict_idle(nr)
+    except KeyboardInterrupt:
+        logging.info("Stopping Lab Workflow....")
+    finally:
+        nr.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+from config_archive import ConfigArchive
+
+CONFIG = """\
+hostname RTR
+!
+interface Ethernet0/1
+ ip address 10.0.0.1 255.255.255.0
+!
+end
+"""
+
+
+def test_store_and_retrieve_round_trip(tmp_path):
+    archive = ConfigArchive(str(tmp_path))
+    snapshots = [
+        CONFIG,
+        CONFIG.replace("\n", "\r\n"),
+        CONFIG.rstrip("\n"),
+        CONFIG.replace("!\nend", " shutdown\n!\nend"),
+    ]
+    for timestamp, config in enumerate(snapshots):
+        assert archive.store("RTR", config, timestamp=timestamp)
+
+    # A new instance reads what the first one wrote from disk
+    reopened = ConfigArchive(str(tmp_path))
+    assert reopened.snapshots("RTR") == [0, 1, 2, 3]
+    for timestamp, config in enumerate(snapshots):
+        assert archive.retrieve("RTR", timestamp) == config
+        assert reopened.retrieve("RTR", timestamp + 0.5) == config
+
+
+def test_unchanged_config_is_not_recorded(tmp_path):
+    archive = ConfigArchive(str(tmp_path))
+
+    assert archive.store("RTR", CONFIG, timestamp=0)
+    assert not archive.store("RTR", CONFIG, timestamp=1)
+    assert archive.snapshots("RTR") == [0]
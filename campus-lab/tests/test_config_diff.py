@@ -0,0 +1,63 @@
+from config_diff import diff_config, diff_text, parse_config
+
+RUNNING = """\
+Building configuration...
+!
+hostname RTR
+!
+interface Ethernet0/1
+ description uplink
+ ip address 10.0.0.1 255.255.255.0
+!
+router bgp 65000
+ address-family ipv4
+  network 10.0.0.0 mask 255.255.255.0
+ exit-address-family
+!
+end
+"""
+
+
+def test_nested_stanza_gets_only_the_missing_child_with_its_parents():
+    intended = RUNNING.replace(
+        "  network 10.0.0.0 mask 255.255.255.0\n",
+        "  network 10.0.0.0 mask 255.255.255.0\n  network 10.1.0.0 mask 255.255.0.0\n",
+    )
+
+    assert diff_text(intended, RUNNING) == [
+        "router bgp 65000",
+        " address-family ipv4",
+        "  network 10.1.0.0 mask 255.255.0.0",
+    ]
+
+
+def test_flat_command_file_is_nested_by_mode():
+    # configs/*.ios style: no indentation, stanzas end at "!" or "exit"
+    intended = parse_config(
+        "hostname RTR\n"
+        "interface Ethernet0/1\n"
+        "description uplink\n"
+        "ip address 10.0.0.1 255.255.255.0\n"
+        "exit\n"
+    )
+
+    assert diff_config(intended, parse_config(RUNNING)) == []
+
+
+def test_implied_default_counts_as_present():
+    intended = RUNNING.replace(
+        " description uplink\n", " description uplink\n no shutdown\n"
+    )
+
+    assert diff_text(intended, RUNNING) == []
+
+
+def test_implied_default_is_pushed_when_its_opposite_is_running():
+    intended = RUNNING.replace(
+        " description uplink\n", " description uplink\n no shutdown\n"
+    )
+    running = RUNNING.replace(
+        " description uplink\n", " description uplink\n shutdown\n"
+    )
+
+    assert diff_text(intended, running) == ["interface Ethernet0/1", " no shutdown"]
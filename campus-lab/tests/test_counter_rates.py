@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from counter_rates import CounterRates
+
+
+def test_counter32_wrap():
+    rates = CounterRates(["in"], widths={"in": 32})
+    rates.update(["r1"], [1], [[2**32 - 100]], [100])
+    # 100 octets up to the wrap and 200 after it, one second later
+    assert rates.update(["r1"], [1], [[200]], [200])[0, 0] == 300
+
+
+def test_counter64_wrap():
+    rates = CounterRates(["in"])
+    rates.update(["r1"], [1], [[2**64 - 1000]], [100])
+    assert rates.update(["r1"], [1], [[1000]], [300])[0, 0] == 1000
+
+
+def test_uptime_decrease_is_a_reset():
+    rates = CounterRates(["in"])
+    rates.update(["r1"], [1], [[5000]], [10_000])
+    # The agent restarted, the counters start again from zero
+    assert np.isnan(rates.update(["r1"], [1], [[100]], [500])[0, 0])
+    assert rates.update(["r1"], [1], [[300]], [600])[0, 0] == 200
+
+
+@pytest.mark.parametrize("capacity", [0, 1, 3])
+def test_grows_from_any_capacity(capacity):
+    rates = CounterRates(["in"], capacity=capacity)
+    rates.update(["r1"] * 10, range(10), np.zeros((10, 1)), [100] * 10)
+    result = rates.update(["r1"] * 10, range(10), np.full((10, 1), 100), [200] * 10)
+    assert len(rates) == 10
+    assert (result == 100).all()
@@ -0,0 +1,116 @@
+import asyncio
+import ipaddress
+import shutil
+import socket
+import time
+
+import pytest
+
+import icmp_sweep
+
+# TEST-NET-1 (RFC 5737), never routed, so probes time out
+UNREACHABLE = "192.0.2.1"
+
+needs_ping = pytest.mark.skipif(
+    shutil.which("ping") is None, reason="no ping command installed"
+)
+
+
+def _icmp_sockets_permitted():
+    sock = icmp_sweep.open_icmp_socket()
+    if sock is None:
+        return False
+    sock.close()
+    return True
+
+
+needs_icmp_socket = pytest.mark.skipif(
+    not _icmp_sockets_permitted(), reason="ICMP sockets are not permitted"
+)
+
+
+def _in_test_net():
+    # Some containers number their own network, gateway included, from TEST-NET-1
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        try:
+            sock.connect((UNREACHABLE, 9))
+        except OSError:
+            return False
+        source = sock.getsockname()[0]
+    return ipaddress.ip_address(source) in ipaddress.ip_network("192.0.2.0/24")
+
+
+BACKENDS = [
+    pytest.param("subprocess", marks=needs_ping),
+    pytest.param("socket", marks=needs_icmp_socket),
+]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_loopback_is_reachable(backend):
+    result = icmp_sweep.ping_sweep(["127.0.0.1"], count=2, timeout=1, backend=backend)[
+        "127.0.0.1"
+    ]
+
+    assert result.reachable
+    assert result.sent == 2
+    assert result.loss == 0.0
+    assert result.avg_rtt is not None
+
+
+@pytest.mark.skipif(_in_test_net(), reason=f"{UNREACHABLE} is on this host's network")
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_unreachable_address_times_out(backend):
+    start = time.monotonic()
+    result = icmp_sweep.ping_sweep([UNREACHABLE], count=1, timeout=1, backend=backend)[
+        UNREACHABLE
+    ]
+
+    assert not result.reachable
+    assert result.loss == 1.0
+    assert result.avg_rtt is None
+    # One second to wait for the reply, plus the process start for ping
+    assert time.monotonic() - start < 3
+
+
+def test_socket_backend_falls_back_without_permission(monkeypatch, caplog):
+    pinged = []
+
+    async def ping_subprocess(address, count, timeout):
+        pinged.append(address)
+        return icmp_sweep.PingResult(address, sent=count, rtts=[0.1] * count)
+
+    monkeypatch.setattr(icmp_sweep, "open_icmp_socket", lambda: None)
+    monkeypatch.setattr(icmp_sweep, "_ping_subprocess", ping_subprocess)
+
+    results = icmp_sweep.ping_sweep(["127.0.0.1"], timeout=1, backend="socket")
+
+    assert pinged == ["127.0.0.1"]
+    assert results["127.0.0.1"].reachable
+    assert "ICMP sockets are not permitted" in caplog.text
+
+
+@needs_icmp_socket
+def test_concurrent_probes_of_one_address_match_their_own_replies(monkeypatch):
+    requests = []
+    echo_request = icmp_sweep._echo_request
+
+    def recording_echo_request(identifier, sequence):
+        requests.append((identifier, sequence))
+        return echo_request(identifier, sequence)
+
+    monkeypatch.setattr(icmp_sweep, "_echo_request", recording_echo_request)
+
+    async def sweep():
+        return await asyncio.gather(*[
+            icmp_sweep._ping_socket("127.0.0.1", 2, 1) for _ in range(20)
+        ])
+
+    results = asyncio.run(sweep())
+
+    assert all(result.received == result.sent == 2 for result in results)
+    with icmp_sweep.open_icmp_socket() as sock:
+        raw = sock.type == socket.SOCK_RAW
+    if raw:
+        # Raw sockets see every reply, so no two requests may look alike
+        assert len(set(requests)) == len(requests)
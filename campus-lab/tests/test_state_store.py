@@ -0,0 +1,25 @@
+from state_store import config_hash
+
+CONFIG = """\
+hostname RTR
+!
+interface Ethernet0/1
+ ip address 10.0.0.1 255.255.255.0
+"""
+
+
+def test_config_hash_ignores_volatile_lines():
+    fetched = (
+        "Building configuration...\n"
+        "\n"
+        "Current configuration : 1234 bytes\n"
+        "! Last configuration change at 12:00:00 UTC Mon Jan 1 2025\n"
+        "! NVRAM config last updated at 12:00:01 UTC Mon Jan 1 2025\n"
+        + CONFIG.replace("\n", "  \r\n")
+    )
+
+    assert config_hash(fetched) == config_hash(CONFIG)
+
+
+def test_config_hash_changes_with_a_command():
+    assert config_hash(CONFIG + " shutdown\n") != config_hash(CONFIG)